@@ -0,0 +1,166 @@
+# bench/adaptive_concurrency.py
+"""
+Adaptive browser concurrency against a simulated Glade with injected slowdowns.
+
+    python bench/adaptive_concurrency.py [--clients 12] [--jobs 10] [--capacity 4]
+                                         [--slowdown 3.0] [--slow-from 0.3] [--slow-to 0.6]
+                                         [--fixed 2,4,8] [--scale 0.01]
+
+No browser is started. MockGlade stands in for the site: every browser step (login, client
+search, checklist, upload) takes its base latency, stretched when more sessions are in flight
+than `capacity` and multiplied by `slowdown` while the run is between --slow-from and --slow-to
+(fractions of submitted jobs). A step slower than --step-timeout raises TimeoutError, as a
+Playwright wait would. --scale converts the simulated seconds into real sleeps.
+
+Jobs go through glade.scheduler.ClientScheduler exactly as server uploads do. The AIMD run
+attaches glade.adaptive.AimdController (timings reported through StepTimer); the --fixed runs
+use constant limits for comparison. Each run prints a timeline of target/active concurrency
+plus totals: successful sessions/min, timeouts (failed sessions), median and p95 job latency
+and the controller's increase/decrease counts.
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# simulated seconds for each step of one session (navigate once, upload once)
+STEPS = (("login", 3.0), ("client_search", 2.0), ("checklist", 1.5), ("upload", 4.0))
+
+
+class MockGlade:
+    def __init__(self, capacity: int, slowdown: float, scale: float, step_timeout: float, seed: int = 7):
+        self.capacity = capacity
+        self.slowdown = slowdown
+        self.scale = scale
+        self.step_timeout = step_timeout
+        self.slow = False
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._rand = random.Random(seed)
+
+    def step(self, base: float) -> None:
+        with self._lock:
+            load = max(1.0, self.in_flight / self.capacity)
+            jitter = self._rand.uniform(0.9, 1.1)
+        secs = base * load * (self.slowdown if self.slow else 1.0) * jitter
+        if secs > self.step_timeout:
+            time.sleep(self.step_timeout * self.scale)
+            raise TimeoutError(f"step exceeded {self.step_timeout:.0f}s")
+        time.sleep(secs * self.scale)
+
+    def session(self, observer=None) -> None:
+        from glade.adaptive import StepTimer
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            for name, base in STEPS:
+                with StepTimer(observer, name):
+                    self.step(base)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def run(label: str, args, limit: int = None) -> dict:
+    from glade.adaptive import AimdController
+    from glade.scheduler import ClientScheduler
+
+    glade = MockGlade(args.capacity, args.slowdown, args.scale, args.step_timeout)
+    scheduler = ClientScheduler(limit=limit or args.max)
+    controller = None
+    if limit is None:
+        controller = AimdController(scheduler, min_limit=1, max_limit=args.max, initial=2,
+                                    window=args.window, cooldown=args.cooldown * args.scale)
+    observer = controller.observe if controller else None
+
+    total = args.clients * args.jobs
+    done = {"n": 0, "timeouts": 0}
+    latencies: list = []
+    lock = threading.Lock()
+    timeline: list = []
+
+    def _job(client: str) -> None:
+        t0 = time.monotonic()
+        try:
+            scheduler.run(client, glade.session, observer)
+        except TimeoutError:
+            with lock:
+                done["timeouts"] += 1
+        with lock:
+            done["n"] += 1
+            latencies.append((time.monotonic() - t0) / args.scale)
+            glade.slow = args.slow_from * total <= done["n"] < args.slow_to * total
+
+    stop = threading.Event()
+
+    def _sample() -> None:
+        t0 = time.monotonic()
+        while not stop.wait(args.sample * args.scale):
+            st = scheduler.stats()
+            timeline.append(((time.monotonic() - t0) / args.scale, st["limit"], st["active"], done["n"], glade.slow))
+
+    sampler = threading.Thread(target=_sample, daemon=True)
+    sampler.start()
+    t0 = time.monotonic()
+    # every client submits its whole backlog at once; the scheduler serializes per client
+    threads = [threading.Thread(target=_job, args=(f"client{c}",)) for c in range(args.clients) for _ in range(args.jobs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = (time.monotonic() - t0) / args.scale
+    stop.set()
+    sampler.join()
+
+    lat = sorted(latencies)
+    result = {
+        "label": label,
+        "ok_per_min": 60 * (total - done["timeouts"]) / elapsed,
+        "timeouts": done["timeouts"],
+        "p95_s": lat[min(len(lat) - 1, int(0.95 * (len(lat) - 1)))],
+        "median_s": statistics.median(lat),
+        "changes": (controller.increases, controller.decreases) if controller else None,
+    }
+    if args.timeline:
+        print(f"\n{label}: t(s)  target active done")
+        for t, lim, act, n, slow in timeline:
+            print(f"  {t:7.0f} {lim:6d} {act:6d} {n:5d}{'  slow' if slow else ''}")
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, default=12)
+    ap.add_argument("--jobs", type=int, default=10, help="sessions per client")
+    ap.add_argument("--capacity", type=int, default=4, help="sessions Glade serves before slowing down")
+    ap.add_argument("--max", type=int, default=8, help="MAX_BROWSER_CONTEXTS for the AIMD run")
+    ap.add_argument("--slowdown", type=float, default=3.0, help="latency multiplier while slow")
+    ap.add_argument("--slow-from", type=float, default=0.3)
+    ap.add_argument("--slow-to", type=float, default=0.6)
+    ap.add_argument("--step-timeout", type=float, default=20.0, help="simulated seconds")
+    ap.add_argument("--window", type=int, default=12)
+    ap.add_argument("--cooldown", type=float, default=15.0, help="simulated seconds between decreases")
+    ap.add_argument("--fixed", default="2,4,8", help="comma-separated fixed limits to compare")
+    ap.add_argument("--scale", type=float, default=0.01, help="real seconds per simulated second")
+    ap.add_argument("--sample", type=float, default=10.0, help="timeline interval (simulated seconds)")
+    ap.add_argument("--timeline", action="store_true")
+    args = ap.parse_args()
+
+    results = [run("aimd", args)]
+    for n in [int(x) for x in args.fixed.split(",") if x.strip()]:
+        results.append(run(f"fixed={n}", args, limit=n))
+
+    print(f"\n{'run':<10} {'ok/min':>9} {'timeouts':>9} {'median s':>9} {'p95 s':>8}  +/-")
+    for r in results:
+        changes = f"{r['changes'][0]}/{r['changes'][1]}" if r["changes"] else ""
+        print(f"{r['label']:<10} {r['ok_per_min']:9.1f} {r['timeouts']:9d} {r['median_s']:9.0f} {r['p95_s']:8.0f}  {changes}")
+
+
+if __name__ == "__main__":
+    main()
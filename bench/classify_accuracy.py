@@ -0,0 +1,225 @@
+# bench/classify_accuracy.py
+"""
+Routing accuracy and throughput on the labeled corpus in bench/corpus/classification.jsonl.
+
+    python bench/classify_accuracy.py [--corpus FILE] [--model bucket_model.npz]
+                                      [--llm-latency-ms 150] [--concurrency 8]
+                                      [--json report.json] [--min-accuracy 0.9]
+
+Each corpus record has a `kind` ("title": a filename as the naming prompt produces it;
+"page": first-page text), the expected checklist `label` and, for pages, the expected
+`filename`.
+
+Classifiers are scored on every record: accuracy (overall and per kind), a confusion matrix
+and documents/second. Naming backends run the page records through glade.naming.NamingService
+with a stubbed local LLM (no network), then route the produced title with
+classify_for_checklist, reporting filename exact-match, routed accuracy and docs/second:
+
+    oracle      returns the corpus filename (measures routing of ideal titles + service overhead)
+    first-line  returns the first line of the page (a deliberately weak namer)
+
+--min-accuracy makes the run exit non-zero if any classifier falls below it.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus" / "classification.jsonl"
+
+
+def load_corpus(path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --------------------------
+# Stub LLM
+# --------------------------
+class StubLLM:
+    """Stands in for AsyncOpenAI: `client.chat.completions.create(...)` answers locally."""
+
+    def __init__(self, answer, latency_s: float = 0.0):
+        self._answer = answer
+        self.latency_s = latency_s
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, **kwargs):
+        self.calls += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        page = messages[-1]["content"].split("First page text:\n", 1)[-1].strip()
+        msg = SimpleNamespace(content=self._answer(page))
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+
+def _naming_backends(corpus: list[dict]) -> dict:
+    by_text = {r["text"]: r["filename"] for r in corpus if r["kind"] == "page"}
+    return {
+        "oracle": lambda page: by_text.get(page, "UnrecognizableDoc"),
+        "first-line": lambda page: page.splitlines()[0] if page else "",
+    }
+
+
+# --------------------------
+# Scoring
+# --------------------------
+def _classifiers(model_path):
+    from glade.classify import ENGINE, classify_for_checklist, classify_label
+
+    out = {
+        "engine": classify_label,
+        "classify_for_checklist": lambda t: classify_for_checklist(t)[1],
+    }
+    try:
+        from glade.documents import _infer_label_from_text
+        out["infer_label_from_text"] = lambda t: _infer_label_from_text(t) or "UnrecognizedDocs"
+    except ImportError as e:
+        print(f"(skipping infer_label_from_text: {e})")
+
+    if model_path:
+        from glade.bucketmodel import BucketModel
+        from glade.config import BUCKET_MODEL_MIN_CONFIDENCE
+
+        model = BucketModel.load(model_path)
+        out["model"] = lambda t: model.predict([t])[0][0] or "UnrecognizedDocs"
+
+        def model_then_rules(t):
+            label, conf = model.predict([t])[0]
+            if conf >= BUCKET_MODEL_MIN_CONFIDENCE and label != "UnrecognizedDocs":
+                return label
+            return ENGINE.classify(t) or "UnrecognizedDocs"
+
+        out["model+rules"] = model_then_rules
+    return out
+
+
+def _confusion(pairs) -> dict:
+    """{expected: {predicted: count}}"""
+    m: dict = {}
+    for expected, got in pairs:
+        m.setdefault(expected, Counter())[got] += 1
+    return {k: dict(v) for k, v in m.items()}
+
+
+def _print_confusion(matrix: dict, labels: list[str]) -> None:
+    """Rows/columns are numbered by position in `labels`; rows list the full label."""
+    print("     " + "".join(f"{i + 1:>4}" for i in range(len(labels))))
+    for i, lab in enumerate(labels):
+        row = matrix.get(lab)
+        if not row:
+            continue
+        cells = "".join(f"{row.get(c, 0) or '.':>4}" for c in labels)
+        print(f"{i + 1:>4} {cells}   {lab}")
+
+
+def score_classifier(name: str, fn, corpus: list[dict], repeat: int) -> dict:
+    texts = [r["text"] for r in corpus]
+    preds = [fn(t) for t in texts]
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    secs = (time.perf_counter() - t0) / repeat
+    result = {
+        "name": name,
+        "accuracy": sum(p == r["label"] for p, r in zip(preds, corpus)) / len(corpus),
+        "docs_per_sec": len(corpus) / max(secs, 1e-9),
+        "by_kind": {},
+        "confusion": _confusion((r["label"], p) for p, r in zip(preds, corpus)),
+        "errors": [{"id": r["id"], "expected": r["label"], "got": p}
+                   for p, r in zip(preds, corpus) if p != r["label"]],
+    }
+    for kind in sorted({r["kind"] for r in corpus}):
+        sub = [(p, r) for p, r in zip(preds, corpus) if r["kind"] == kind]
+        result["by_kind"][kind] = sum(p == r["label"] for p, r in sub) / len(sub)
+    return result
+
+
+def score_naming(name: str, answer, corpus: list[dict], latency_s: float, concurrency: int) -> dict:
+    from glade.classify import classify_for_checklist
+    from glade.naming import NamingService
+
+    pages = [r for r in corpus if r["kind"] == "page"]
+    stub = StubLLM(answer, latency_s)
+    service = NamingService(api_key="stub", model="stub", prompt="", rpm=1_000_000, tpm=1_000_000_000,
+                            max_in_flight=concurrency, client=stub)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        titles = list(pool.map(lambda r: service.name_sync(r["text"]), pages))
+    secs = time.perf_counter() - t0
+    routed = [classify_for_checklist(t)[1] for t in titles]
+    return {
+        "name": name,
+        "filename_exact": sum(t == r["filename"] for t, r in zip(titles, pages)) / len(pages),
+        "routed_accuracy": sum(lab == r["label"] for lab, r in zip(routed, pages)) / len(pages),
+        "docs_per_sec": len(pages) / max(secs, 1e-9),
+        "llm_calls": stub.calls,
+        "confusion": _confusion((r["label"], lab) for lab, r in zip(routed, pages)),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    ap.add_argument("--model", default=None, help="trained bucket model (.npz) to include")
+    ap.add_argument("--repeat", type=int, default=50, help="timing passes per classifier")
+    ap.add_argument("--llm-latency-ms", type=float, default=150.0, help="simulated stub LLM latency")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--confusion", action="store_true", help="print confusion matrices")
+    ap.add_argument("--json", dest="json_out", default=None, help="write the full report here")
+    ap.add_argument("--min-accuracy", type=float, default=None)
+    args = ap.parse_args()
+
+    from glade.classify import _ALLOWED_LABELS
+
+    corpus = load_corpus(args.corpus)
+    unknown = {r["label"] for r in corpus} - set(_ALLOWED_LABELS)
+    if unknown:
+        raise SystemExit(f"corpus uses labels outside _ALLOWED_LABELS: {sorted(unknown)}")
+    kinds = Counter(r["kind"] for r in corpus)
+    print(f"corpus: {len(corpus)} records ({', '.join(f'{n} {k}' for k, n in sorted(kinds.items()))})\n")
+
+    report = {"corpus": args.corpus, "classifiers": [], "naming": []}
+    print(f"{'classifier':<24} {'acc':>6} " + " ".join(f"{k:>6}" for k in sorted(kinds)) + f" {'docs/s':>10}")
+    for name, fn in _classifiers(args.model).items():
+        res = score_classifier(name, fn, corpus, args.repeat)
+        report["classifiers"].append(res)
+        per_kind = " ".join(f"{res['by_kind'][k]:6.3f}" for k in sorted(kinds))
+        print(f"{name:<24} {res['accuracy']:6.3f} {per_kind} {res['docs_per_sec']:10.0f}")
+
+    print(f"\n{'naming backend':<24} {'name=':>6} {'routed':>7} {'docs/s':>10}  (stub LLM {args.llm_latency_ms:.0f} ms, "
+          f"concurrency {args.concurrency})")
+    for name, answer in _naming_backends(corpus).items():
+        res = score_naming(name, answer, corpus, args.llm_latency_ms / 1000, args.concurrency)
+        report["naming"].append(res)
+        print(f"{name:<24} {res['filename_exact']:6.3f} {res['routed_accuracy']:7.3f} {res['docs_per_sec']:10.1f}")
+
+    for res in report["classifiers"]:
+        if res["errors"]:
+            print(f"\n{res['name']} misses: " + ", ".join(f"{e['id']} {e['expected']}->{e['got']}" for e in res["errors"]))
+        if args.confusion:
+            print(f"\nconfusion ({res['name']}; rows expected, columns predicted):")
+            _print_confusion(res["confusion"], _ALLOWED_LABELS)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.min_accuracy is not None:
+        low = [r["name"] for r in report["classifiers"] if r["accuracy"] < args.min_accuracy]
+        if low:
+            print(f"\nbelow --min-accuracy {args.min_accuracy}: {', '.join(low)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
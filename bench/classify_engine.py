@@ -0,0 +1,155 @@
+# bench/classify_engine.py
+"""
+Micro-benchmark and consistency check for the checklist classification engine.
+
+    python bench/classify_engine.py [--iterations 2000] [--check]
+
+Times the compiled single-pass engine against evaluating the same rule table one regex at a
+time, on short titles and on a ~3000-character first page. With --check, also verifies that
+every entry point (classify_for_checklist, documents._infer_label_from_text and
+normalize_to_allowed_label) returns the expected allowed label for each title and page-text
+sample and exits non-zero on any disagreement.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# (text, expected label) - one or more per bucket, in the formats the naming prompt produces
+SAMPLES = [
+    ("Chase-1234-01.01.24-01.31.24", "Bank Statements"),
+    ("Navy Federal-9876-02.01.24-02.29.24", "Bank Statements"),
+    ("Cash App-01.01.24-01.31.24", "Bank Statements"),
+    # provider names joined into one token, as the naming prompt usually writes them
+    ("CitizensBank-1234-01.01.24-01.31.24", "Bank Statements"),
+    ("PNCBank-5521-02.01.24-02.29.24", "Bank Statements"),
+    ("TruistBank-0042-01.01.24-01.31.24", "Bank Statements"),
+    ("RegionsBank-7788-03.01.24-03.31.24", "Bank Statements"),
+    ("SantanderBank-1111-04.01.24-04.30.24", "Bank Statements"),
+    ("NavyFederal-9876-02.01.24-02.29.24", "Bank Statements"),
+    ("FifthThirdBank-2222-01.01.24-01.31.24", "Bank Statements"),
+    ("HuntingtonBank-XXXX-05.01.24-05.31.24", "Bank Statements"),
+    ("AppleCash-01.01.24-01.31.24", "Bank Statements"),
+    ("GooglePay-02.01.24-02.29.24", "Bank Statements"),
+    ("2019 Honda - title", "Vehicle Info"),
+    ("2021 Ford - financial statement", "Vehicle Info"),
+    ("2018 Toyota - insurance card", "Vehicle Info"),
+    ("PayStub-01.01.24", "Income"),
+    ("2023 Benefit Letter", "Income"),
+    ("Social Security Benefit Letter", "Income"),
+    ("Profit & Loss - NoDate", "Income"),
+    ("2022 Tax Return", "Tax Returns"),
+    ("2023 Tax Liability Notice - 01.01.24", "Tax Returns"),
+    ("Smith v. Jones - Summons", "Lawsuits"),
+    ("Residential Lease", "Lease"),
+    ("Timeshare Agreement", "Lease"),
+    ("Synchrony-4321", "Credit Cards"),
+    ("Discover-XXXX", "Credit Cards"),
+    ("Duke Energy - Electric Bill", "Utility"),
+    ("Verizon - Phone Bill", "Utility"),
+    ("Certificate of Counseling - Doe", "Credit Counseling Certificate"),
+    ("Mortgage Statement", "Home/Rent Information"),
+    ("Rent Letter", "Home/Rent Information"),
+    ("DL", "Identification"),
+    ("DL & SS Selfie", "Identification"),
+    ("Fidelity (401k)", "Retirement & Insurance"),
+    ("MetLife (Life Insurance)", "Retirement & Insurance"),
+    ("City Hospital - 01.01.24", "Medical Bills"),
+    ("Client Information Worksheet", "Client Forms"),
+    ("Debtors 341 Questionnaire", "Client Forms"),
+    ("UnrecognizableDoc", "UnrecognizedDocs"),
+]
+
+# Page text where incidental keywords (merchants, deductions, "ID") must not beat the
+# words that say what the document is
+PAGE_SAMPLES = [
+    ("JPMorgan Chase Bank N.A. Chase Total Checking statement period 03/01/24 through 03/31/24 "
+     "beginning balance 1,204.11 Comcast phone payment 89.99 Shell gas station 41.20 ending balance 873.40",
+     "Bank Statements"),
+    ("Earnings Statement ACME Corp pay date 03/15/24 gross pay 2,400.00 net pay 1,812.55 "
+     "deductions 401(k) 120.00 Dental insurance 18.40 Medical 42.00 YTD 7,200.00",
+     "Income"),
+    ("Client ID 1234 bank statement checking account summary", "Bank Statements"),
+    ("Wells Fargo Everyday Checking account activity AT&T Wireless 85.00 Geico insurance 112.00 "
+     "Duke Energy 140.22 deposits and additions",
+     "Bank Statements"),
+]
+
+_FILLER = (
+    "Account summary for the period shown. Please review all transactions carefully and "
+    "contact customer service with any questions regarding your account. "
+)
+LONG_TEXT = (_FILLER * 20)[:2900] + " Wells Fargo Everyday Checking statement"
+
+
+def _sequential(rules):
+    """The pre-engine shape: one compiled regex per rule, each scanning the whole text."""
+    compiled = [(r, re.compile(rf"\b(?:{r.pattern})(?!\w)", re.I)) for r in sorted(rules, key=lambda r: -r.priority)]
+
+    def classify(text):
+        scores, prio = {}, {}
+        for rule, rx in compiled:
+            n = len(rx.findall(text))
+            if n:
+                scores[rule.label] = scores.get(rule.label, 0.0) + n * rule.weight
+                prio.setdefault(rule.label, rule.priority)
+        return max(scores, key=lambda lab: (scores[lab], prio[lab])) if scores else None
+
+    return classify
+
+
+def _time(fn, texts, iterations) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - t0) / (iterations * len(texts)) * 1e6
+
+
+def check() -> int:
+    from glade.classify import ENGINE, classify_for_checklist, normalize_to_allowed_label
+    from glade.documents import _infer_label_from_text
+
+    failures = 0
+    samples = SAMPLES + PAGE_SAMPLES
+    for text, expected in samples:
+        got = {
+            "engine": ENGINE.classify(text) or "UnrecognizedDocs",
+            "classify_for_checklist": classify_for_checklist(text)[1],
+            "infer_label_from_text": _infer_label_from_text(text) or "UnrecognizedDocs",
+            "normalize_to_allowed_label": normalize_to_allowed_label(text),
+        }
+        if set(got.values()) != {expected}:
+            failures += 1
+            print(f"MISMATCH {text[:60]!r}: expected {expected!r}, got {got}")
+    print(f"consistency: {len(samples) - failures}/{len(samples)} samples agree across all entry points")
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iterations", type=int, default=2000)
+    ap.add_argument("--check", action="store_true", help="verify all entry points agree (needs playwright importable)")
+    args = ap.parse_args()
+
+    from glade.classify import ENGINE, RULES
+
+    sequential = _sequential(RULES)
+    titles = [t for t, _ in SAMPLES]
+    for label, texts, iters in (("titles", titles, args.iterations), ("first page", [LONG_TEXT], max(1, args.iterations // 10))):
+        eng = _time(ENGINE.classify, texts, iters)
+        seq = _time(sequential, texts, iters)
+        print(f"{label:<11} engine {eng:8.1f} us/doc   per-rule regex {seq:8.1f} us/doc   ({seq / eng:.1f}x)")
+
+    disagreements = [t for t in titles + [LONG_TEXT] if ENGINE.classify(t) != sequential(t)]
+    print(f"engine vs per-rule disagreements: {len(disagreements)}")
+
+    if args.check and check():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
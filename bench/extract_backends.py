@@ -0,0 +1,107 @@
+# bench/extract_backends.py
+"""
+Compare PDF text extraction backends over a local corpus.
+
+    python bench/extract_backends.py path/to/pdfs [--backends pypdf2,pypdfium2] [--pages 1]
+
+Each backend runs in a fresh process so peak RSS is attributable to that engine alone.
+Reports characters extracted, ms per page and peak memory per backend.
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except Exception:
+        return float("nan")
+
+
+def _run_backend(name: str, paths: list[str], max_pages: int, out: mp.Queue) -> None:
+    from glade.extract import BACKENDS, _normalize
+    from glade.pdfdoc import PdfDocument
+
+    backend = BACKENDS[name]
+    chars = pages = errors = empty = 0
+    elapsed = 0.0
+    tracemalloc.start()
+    for path in paths:
+        doc = PdfDocument(path)
+        try:
+            t0 = time.perf_counter()
+            count = backend.page_count(doc)
+            n = count if max_pages <= 0 else min(count, max_pages)
+            for i in range(n):
+                text = _normalize(backend.extract(doc, i))
+                chars += len(text)
+                empty += 0 if text else 1
+                pages += 1
+            elapsed += time.perf_counter() - t0
+        except Exception as e:
+            errors += 1
+            print(f"  [{name}] {Path(path).name}: {e}", file=sys.stderr)
+        finally:
+            doc.close()
+    _, py_peak = tracemalloc.get_traced_memory()
+    out.put({
+        "backend": name,
+        "files": len(paths),
+        "pages": pages,
+        "empty_pages": empty,
+        "errors": errors,
+        "chars": chars,
+        "ms_per_page": (elapsed * 1000 / pages) if pages else float("nan"),
+        "peak_rss_mb": _peak_rss_mb(),
+        "py_peak_mb": py_peak / (1024 * 1024),
+    })
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("corpus", help="directory of sample PDFs (searched recursively)")
+    ap.add_argument("--backends", default="", help="comma-separated subset (default: all installed)")
+    ap.add_argument("--pages", type=int, default=0, help="pages per file (0 = all)")
+    args = ap.parse_args()
+
+    from glade.extract import BACKENDS
+
+    paths = sorted(str(p) for p in Path(args.corpus).rglob("*.pdf"))
+    if not paths:
+        raise SystemExit(f"No PDFs under {args.corpus}")
+    names = [n.strip() for n in args.backends.split(",") if n.strip()] or list(BACKENDS)
+
+    rows = []
+    for name in names:
+        backend = BACKENDS.get(name)
+        if backend is None or not backend.available():
+            print(f"skip {name}: not installed")
+            continue
+        q: mp.Queue = mp.Queue()
+        proc = mp.Process(target=_run_backend, args=(name, paths, args.pages, q))
+        proc.start()
+        rows.append(q.get())
+        proc.join()
+
+    print(f"\n{len(paths)} files from {args.corpus}")
+    header = f"{'backend':<10} {'pages':>6} {'empty':>6} {'errors':>6} {'chars':>10} {'ms/page':>9} {'rss MB':>8} {'py MB':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['backend']:<10} {r['pages']:>6} {r['empty_pages']:>6} {r['errors']:>6} {r['chars']:>10} "
+            f"{r['ms_per_page']:>9.1f} {r['peak_rss_mb']:>8.1f} {r['py_peak_mb']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# bench/office_warm_vs_cold.py
+"""
+Per-document Office -> PDF latency: cold `soffice --convert-to` per file vs a warm unoserver pool.
+
+    python bench/office_warm_vs_cold.py path/to/docs [--repeat 3] [--workers 1]
+
+Warm-up (starting the pool) is timed separately and excluded from per-document numbers.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _summary(label: str, samples: list[float]) -> str:
+    if not samples:
+        return f"{label:<6} (no successful conversions)"
+    s = sorted(samples)
+    p95 = s[min(len(s) - 1, int(round(0.95 * (len(s) - 1))))]
+    return (
+        f"{label:<6} n={len(s):<4} mean={statistics.mean(s):8.0f} ms  "
+        f"p50={statistics.median(s):8.0f} ms  p95={p95:8.0f} ms  max={s[-1]:8.0f} ms"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("corpus", help="directory of .doc/.docx/.xls/.xlsx files")
+    ap.add_argument("--repeat", type=int, default=1, help="passes over the corpus per mode")
+    ap.add_argument("--workers", type=int, default=1, help="warm pool size")
+    ap.add_argument("--skip-cold", action="store_true")
+    args = ap.parse_args()
+
+    from glade.office import OFFICE_EXTS, OfficeConverterPool, cold_convert
+
+    files = sorted(str(p) for p in Path(args.corpus).rglob("*") if p.suffix.lower() in OFFICE_EXTS)
+    if not files:
+        raise SystemExit(f"No Office documents under {args.corpus}")
+    outdir = tempfile.mkdtemp(prefix="office_bench_")
+
+    def _run(label: str, convert) -> list[float]:
+        samples = []
+        for r in range(args.repeat):
+            for i, src in enumerate(files):
+                out = os.path.join(outdir, f"{label}_{r}_{i}.pdf")
+                t0 = time.perf_counter()
+                try:
+                    convert(src, out)
+                    ms = (time.perf_counter() - t0) * 1000
+                    samples.append(ms)
+                    print(f"  {label:<5} {Path(src).name:<40} {ms:8.0f} ms")
+                except Exception as e:
+                    print(f"  {label:<5} {Path(src).name:<40} FAILED: {e}")
+        return samples
+
+    cold = [] if args.skip_cold else _run("cold", cold_convert)
+
+    pool = OfficeConverterPool(size=args.workers)
+    t0 = time.perf_counter()
+    pool.start()
+    startup_ms = (time.perf_counter() - t0) * 1000
+    try:
+        warm = _run("warm", pool.convert)
+    finally:
+        pool.stop()
+
+    print(f"\n{len(files)} documents x {args.repeat} pass(es); warm pool startup {startup_ms:.0f} ms (excluded)")
+    if not args.skip_cold:
+        print(_summary("cold", cold))
+    print(_summary("warm", warm))
+    if cold and warm:
+        print(f"speedup (mean): {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+# bulk_import.py
+"""
+Push a directory tree of historical documents into Glade.
+
+    python bulk_import.py DIR --map clients.csv [--manifest PATH] [--clients 4] [--batch 10]
+                          [--split] [--retry-failed] [--dry-run | --status]
+
+clients.csv has a header row with `path` and `client_email` columns (optional `client_name`,
+`doc_name`). `path` is relative to DIR and names a file or a folder; the longest matching row
+wins, so a folder row maps everything below it and a file row can override it.
+
+The manifest (default DIR/.glade-import.jsonl) is an append-only journal: one line per file
+when it is first seen, then one line per state change (pending -> prepared -> uploaded, or
+failed with the stage and error). Every change is flushed before the next step starts, so a
+crash or Ctrl-C resumes where it stopped when the same command is run again:
+
+  - prepared documents are not converted or named again; their PDFs wait in <manifest>.staging
+  - a batch interrupted mid-upload is retried (Glade may then show duplicates for that batch)
+  - failed documents are only retried with --retry-failed
+  - files added to DIR since the last run are picked up; rows for unmapped files are
+    re-resolved against the CSV, already mapped files keep their client
+
+Conversion and naming go through the same code as /process-batch (BATCH_PREPARE_WORKERS at
+once). Up to --clients clients are worked on in parallel; each client's documents are
+uploaded --batch at a time through the server's upload scheduler, so one browser session per
+client and at most MAX_BROWSER_CONTEXTS sessions overall. Throughput and ETA are printed
+every BULK_PROGRESS_SECONDS.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from glade.config import BATCH_PREPARE_WORKERS, BULK_CLIENTS_PARALLEL, BULK_PROGRESS_SECONDS, BULK_UPLOAD_BATCH
+
+PENDING = "pending"
+PREPARED = "prepared"
+UPLOADING = "uploading"
+UPLOADED = "uploaded"
+FAILED = "failed"
+UNMAPPED = "unmapped"
+
+
+class Manifest:
+    """Append-only JSONL journal of import entries, folded by id on load."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    self.entries.setdefault(rec["id"], {}).update(rec)
+        self._file = None
+
+    def open(self) -> None:
+        """Rewrite the journal compacted (one line per entry), then append from there."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def update(self, entry_id: str, **fields) -> None:
+        with self._lock:
+            self.entries.setdefault(entry_id, {"id": entry_id}).update(fields)
+            if self._file is not None:
+                self._file.write(json.dumps({"id": entry_id, **fields}) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def counts(self) -> dict:
+        out: dict = {}
+        for e in self.entries.values():
+            out[e["state"]] = out.get(e["state"], 0) + 1
+        return out
+
+
+def load_mapping(csv_path: str) -> dict:
+    """{relative path: row}; paths are normalized to forward slashes without a leading './'."""
+    mapping = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = {"path", "client_email"} - set(reader.fieldnames or ())
+        if missing:
+            raise SystemExit(f"{csv_path}: missing column(s) {', '.join(sorted(missing))}")
+        for row in reader:
+            key = _norm(row["path"])
+            if (row.get("client_email") or "").strip() or (row.get("client_name") or "").strip():
+                mapping[key] = {k: (v or "").strip() for k, v in row.items() if k}
+    return mapping
+
+
+def _norm(rel: str) -> str:
+    rel = rel.strip().replace("\\", "/").strip("/")
+    return rel[2:] if rel.startswith("./") else rel
+
+
+def _resolve(mapping: dict, rel: str) -> Optional[dict]:
+    parts = rel.split("/")
+    for n in range(len(parts), -1, -1):
+        row = mapping.get("/".join(parts[:n]))
+        if row is not None:
+            return row
+    return None
+
+
+def scan(manifest: Manifest, root: str, mapping: dict, skip: tuple = ()) -> int:
+    """Add files not yet in the manifest and re-map unmapped ones; returns how many were added."""
+    added = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if not d.startswith(".") and os.path.abspath(os.path.join(dirpath, d)) not in skip)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if name.startswith(".") or os.path.abspath(path) in skip:
+                continue
+            rel = _norm(os.path.relpath(path, root))
+            entry = manifest.entries.get(rel)
+            if entry is not None and entry["state"] != UNMAPPED:
+                continue
+            row = _resolve(mapping, rel)
+            if row is None:
+                if entry is None:
+                    manifest.update(rel, path=os.path.abspath(path), state=UNMAPPED)
+                    added += 1
+                continue
+            manifest.update(
+                rel,
+                path=os.path.abspath(path),
+                size=os.path.getsize(path),
+                client_email=row.get("client_email", ""),
+                client_name=row.get("client_name", ""),
+                doc_name=row.get("doc_name") or None,
+                state=PENDING,
+                attempts=0,
+            )
+            added += entry is None
+    return added
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.uploaded = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def done(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.uploaded += 1
+            else:
+                self.failed += 1
+
+    def line(self, scheduler_stats: Optional[dict] = None) -> str:
+        with self._lock:
+            finished = self.uploaded + self.failed
+            elapsed = time.monotonic() - self.started
+        rate = finished / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = self.total - finished
+        eta = _duration(remaining / rate * 60) if rate > 0 else "?"
+        out = (f"[bulk] {finished}/{self.total} done ({self.uploaded} uploaded, {self.failed} failed) | "
+               f"{rate:.1f} docs/min | elapsed {_duration(elapsed)} | ETA {eta}")
+        if scheduler_stats:
+            out += f" | browsers {scheduler_stats['active']}/{scheduler_stats['limit']}"
+        return out
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m" if h else f"{m}m{s:02d}s"
+
+
+class Importer:
+    def __init__(self, manifest: Manifest, staging: str, split: bool = False, batch: int = BULK_UPLOAD_BATCH,
+                 clients: int = BULK_CLIENTS_PARALLEL, progress_every: float = BULK_PROGRESS_SECONDS):
+        import server  # conversion, naming and the upload scheduler, exactly as the webhooks use them
+
+        self.server = server
+        self.manifest = manifest
+        self.staging = staging
+        self.split = split
+        self.batch = max(1, batch)
+        self.clients = max(1, clients)
+        self.progress_every = progress_every
+        self.progress: Optional[Progress] = None
+        self._prepare_pool = ThreadPoolExecutor(max_workers=max(1, BATCH_PREPARE_WORKERS))
+
+    # ---- prepare (convert + name + optimize; no browser) ----
+    def _prepare(self, entry: dict) -> None:
+        from glade.archive import archive_kind
+        from glade.handles import Workspace
+
+        srv = self.server
+        name = os.path.basename(entry["path"])
+        mime = mimetypes.guess_type(name)[0]
+        ws = Workspace(prefix="bulk_")
+        try:
+            if archive_kind(entry["path"], name, mime) is not None:
+                raise RuntimeError("archives are not expanded in bulk mode; extract it into the import directory")
+            local = ws.new_path(name)
+            shutil.copyfile(entry["path"], local)    # conversion renames its input in place
+            ws.check_quota()
+            prepared = srv._prepare_item({"ws": ws, "src": ws.handle(local, name=name, mime=mime), "in_name": name,
+                                          "in_mime": mime, "doc_name": entry.get("doc_name"), "split": self.split})
+            stem = hashlib.sha1(entry["id"].encode("utf-8")).hexdigest()[:16]
+            parts = []
+            for i, p in enumerate(prepared):
+                staged = os.path.join(self.staging, f"{stem}-{i}.pdf")
+                shutil.move(p["pdf_path"], staged)
+                parts.append({"pdf_path": staged, "proposed_title": p["proposed_title"],
+                              "checklist_title": p["checklist_title"], "pages": p.get("pages"), "uploaded": False})
+            self.manifest.update(entry["id"], state=PREPARED, parts=parts, error=None)
+        except Exception as e:
+            print(f"[ERROR] Prepare failed for {entry['id']}: {e}")
+            self.manifest.update(entry["id"], state=FAILED, stage="prepare", error=f"{type(e).__name__}: {e}",
+                                 attempts=entry.get("attempts", 0) + 1)
+            self.progress.done(False)
+        finally:
+            ws.cleanup()
+
+    def _prepare_all(self, entries: list) -> list:
+        return [self._prepare_pool.submit(self._prepare, e) for e in entries if e["state"] != PREPARED]
+
+    # ---- upload ----
+    def _upload(self, entries: list) -> None:
+        entries = [e for e in entries if e["state"] == PREPARED]
+        if not entries:
+            return
+        first = entries[0]
+        jobs, owners = [], []
+        for e in entries:
+            for i, part in enumerate(e["parts"]):
+                if not part["uploaded"]:
+                    jobs.append(self.server.UploadJob(doc_title=part["proposed_title"], upload_path=part["pdf_path"],
+                                                      job_id=self.server.new_job_id()))
+                    owners.append((e, i))
+        for e in entries:
+            self.manifest.update(e["id"], state=UPLOADING)
+        try:
+            outcomes = self.server.schedule_upload(first["client_email"], first["client_name"], jobs,
+                                                   group_by_bucket=True)
+        except Exception as e:
+            outcomes = [(False, f"{type(e).__name__}: {e}")] * len(jobs)
+
+        errors: dict = {}
+        for (e, i), job, (ok, err) in zip(owners, jobs, outcomes):
+            if ok:
+                e["parts"][i]["uploaded"] = True
+                try:
+                    os.remove(e["parts"][i]["pdf_path"])
+                except OSError:
+                    pass
+            else:
+                errors.setdefault(e["id"], f"{err or 'upload failed'} (job {job.job_id})")
+        for e in entries:
+            err = errors.get(e["id"])
+            self.manifest.update(e["id"], state=FAILED if err else UPLOADED, parts=e["parts"], stage="upload",
+                                 error=err, attempts=e.get("attempts", 0) + 1)
+            self.progress.done(err is None)
+
+    def _client(self, entries: list) -> None:
+        """Prepare and upload one client's documents, preparing the next batch during each upload."""
+        batches = [entries[i:i + self.batch] for i in range(0, len(entries), self.batch)]
+        pending = self._prepare_all(batches[0])
+        for n, batch in enumerate(batches):
+            for fut in pending:
+                fut.result()
+            pending = self._prepare_all(batches[n + 1]) if n + 1 < len(batches) else []
+            self._upload([self.manifest.entries[e["id"]] for e in batch])
+
+    # ---- run ----
+    def run(self, entries: list) -> Progress:
+        self.progress = Progress(len(entries))
+        by_client: dict = {}
+        for e in entries:
+            by_client.setdefault(self.server._client_key(e["client_email"], e["client_name"]), []).append(e)
+        print(f"[bulk] {len(entries)} document(s) for {len(by_client)} client(s); "
+              f"{self.clients} client(s) at once, {self.batch} per browser session")
+
+        stop = threading.Event()
+
+        def _report() -> None:
+            while not stop.wait(self.progress_every):
+                print(self.progress.line(self.server._upload_scheduler.stats()), flush=True)
+
+        reporter = threading.Thread(target=_report, daemon=True)
+        reporter.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.clients) as pool:
+                for fut in [pool.submit(self._client, group) for group in by_client.values()]:
+                    fut.result()
+        finally:
+            stop.set()
+            self._prepare_pool.shutdown(wait=True)
+            print(self.progress.line(), flush=True)
+        return self.progress
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Bulk import a directory of documents into Glade.")
+    ap.add_argument("root", help="directory holding the documents")
+    ap.add_argument("--map", dest="mapping", help="CSV with path,client_email[,client_name][,doc_name]")
+    ap.add_argument("--manifest", default=None, help="progress journal (default ROOT/.glade-import.jsonl)")
+    ap.add_argument("--clients", type=int, default=BULK_CLIENTS_PARALLEL, help="clients worked on at once")
+    ap.add_argument("--batch", type=int, default=BULK_UPLOAD_BATCH, help="documents per browser session")
+    ap.add_argument("--split", action="store_true", help="split bundled scans into one document per label")
+    ap.add_argument("--retry-failed", action="store_true", help="also retry documents that failed before")
+    ap.add_argument("--dry-run", action="store_true", help="update the manifest and show the plan only")
+    ap.add_argument("--status", action="store_true", help="show manifest progress and failures only")
+    args = ap.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    manifest_path = os.path.abspath(args.manifest or os.path.join(root, ".glade-import.jsonl"))
+    staging = manifest_path + ".staging"
+    manifest = Manifest(manifest_path)
+
+    if args.status:
+        print(json.dumps(manifest.counts()))
+        for e in manifest.entries.values():
+            if e["state"] in (FAILED, UNMAPPED):
+                print(f"{e['state']:<8} {e['id']}  {e.get('stage') or ''} {(e.get('error') or '')[:120]}")
+        return
+    if not args.mapping:
+        ap.error("--map is required unless --status is given")
+
+    os.makedirs(staging, exist_ok=True)
+    manifest.open()
+    try:
+        interrupted = [e for e in manifest.entries.values() if e["state"] == UPLOADING]
+        for e in interrupted:
+            manifest.update(e["id"], state=PREPARED)
+        if interrupted:
+            print(f"[WARN] {len(interrupted)} document(s) were mid-upload when the last run stopped; "
+                  f"retrying them (check Glade for duplicates)")
+        added = scan(manifest, root, load_mapping(args.mapping),
+                     skip=(manifest_path, staging, os.path.abspath(args.mapping)))
+        counts = manifest.counts()
+        print(f"[bulk] manifest {manifest_path}: {added} new file(s); " + json.dumps(counts))
+        if counts.get(UNMAPPED):
+            print(f"[WARN] {counts[UNMAPPED]} file(s) have no client in {args.mapping} (see --status)")
+
+        todo_states = {PENDING, PREPARED} | ({FAILED} if args.retry_failed else set())
+        todo = [e for e in manifest.entries.values() if e["state"] in todo_states]
+        if args.dry_run:
+            plan: dict = {}
+            for e in todo:
+                who = e["client_email"] or e["client_name"]
+                plan[who] = plan.get(who, 0) + 1
+            for who, n in sorted(plan.items()):
+                print(f"  {n:5d}  {who}")
+            return
+        if not todo:
+            print("[bulk] nothing to do")
+            return
+        for e in todo:
+            if e["state"] == FAILED:
+                # upload failures keep their staged PDFs; prepare failures start over
+                manifest.update(e["id"], state=PREPARED if e.get("parts") else PENDING)
+        progress = Importer(manifest, staging, split=args.split, batch=args.batch, clients=args.clients).run(todo)
+    finally:
+        manifest.close()
+    if progress.failed:
+        print(f"[bulk] {progress.failed} document(s) failed; fix and rerun with --retry-failed (see --status)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
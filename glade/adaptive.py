@@ -0,0 +1,188 @@
+# glade/adaptive.py
+import statistics
+import threading
+import time
+from typing import Callable, Optional
+
+from .config import (
+    ADAPTIVE_COOLDOWN_SECONDS,
+    ADAPTIVE_INITIAL_CONTEXTS,
+    ADAPTIVE_LATENCY_FACTOR,
+    ADAPTIVE_MAX_ERROR_RATE,
+    ADAPTIVE_MIN_CONTEXTS,
+    ADAPTIVE_WINDOW,
+    MAX_BROWSER_CONTEXTS,
+)
+from .log import _log
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """Playwright and builtin timeouts both surface as a class named TimeoutError."""
+    return isinstance(exc, TimeoutError) or type(exc).__name__ == "TimeoutError"
+
+
+class AimdController:
+    """
+    Additive-increase / multiplicative-decrease of the scheduler's browser-context limit.
+
+    Browser steps (login, client search, checklist, upload, ...) report their latency and
+    outcome through observe(). Every `window` observations the controller compares each step's
+    median latency with that step's baseline (the best median seen, allowed to drift up slowly
+    so a permanently slower Glade becomes the new normal):
+
+      - any timeout, error rate above `max_error_rate`, or a step slower than
+        `latency_factor` x its baseline: limit = limit * `decrease` (at most once per
+        `cooldown` seconds, since jobs already in flight report the same congestion)
+      - otherwise, if the scheduler was saturated (every slot busy or jobs queued): limit + 1
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        min_limit: int = ADAPTIVE_MIN_CONTEXTS,
+        max_limit: int = MAX_BROWSER_CONTEXTS,
+        initial: int = ADAPTIVE_INITIAL_CONTEXTS,
+        window: int = ADAPTIVE_WINDOW,
+        latency_factor: float = ADAPTIVE_LATENCY_FACTOR,
+        max_error_rate: float = ADAPTIVE_MAX_ERROR_RATE,
+        decrease: float = 0.5,
+        cooldown: float = ADAPTIVE_COOLDOWN_SECONDS,
+        baseline_drift: float = 0.1,
+        clock=time.monotonic,
+    ):
+        self.scheduler = scheduler
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.window = max(1, window)
+        self.latency_factor = latency_factor
+        self.max_error_rate = max_error_rate
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.baseline_drift = baseline_drift
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._samples: list = []                 # (step, seconds, ok, timeout)
+        self._baseline: dict[str, float] = {}
+        self._saturated = False
+        self._last_decrease = float("-inf")
+        self.increases = 0
+        self.decreases = 0
+        self.last_reason = "initial"
+        self.last_error_rate = 0.0
+        self.last_latency_ratio = 0.0
+        self.limit = min(self.max_limit, max(self.min_limit, initial))
+        scheduler.set_limit(self.limit)
+
+    def observe(self, step: str, seconds: float, ok: bool = True, timeout: bool = False) -> None:
+        with self._lock:
+            self._samples.append((step, seconds, ok, timeout))
+            stats = self.scheduler.stats()
+            if stats["active"] >= stats["limit"] or stats["queued"]:
+                self._saturated = True
+            if timeout and self.clock() - self._last_decrease >= self.cooldown:
+                # don't wait for the window to fill: timeouts are the clearest overload signal
+                self._adjust()
+            elif len(self._samples) >= self.window:
+                self._adjust()
+
+    def _adjust(self) -> None:
+        # caller holds self._lock
+        samples, self._samples = self._samples, []
+        saturated, self._saturated = self._saturated, False
+
+        errors = sum(1 for _s, _t, ok, _to in samples if not ok)
+        timeouts = sum(1 for *_rest, to in samples if to)
+        self.last_error_rate = errors / len(samples)
+
+        by_step: dict = {}
+        for step, secs, ok, _to in samples:
+            if ok:
+                by_step.setdefault(step, []).append(secs)
+        ratio = 0.0
+        for step, values in by_step.items():
+            median = statistics.median(values)
+            base = self._baseline.get(step)
+            if base is None:
+                base = median
+            ratio = max(ratio, median / base if base > 0 else 1.0)
+            self._baseline[step] = min(base * (1 + self.baseline_drift), median)
+        self.last_latency_ratio = ratio
+
+        if timeouts or self.last_error_rate > self.max_error_rate or ratio > self.latency_factor:
+            reason = (f"{timeouts} timeout(s)" if timeouts else
+                      f"error rate {self.last_error_rate:.0%}" if self.last_error_rate > self.max_error_rate else
+                      f"step latency {ratio:.1f}x baseline")
+            now = self.clock()
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                self._set(max(self.min_limit, int(self.limit * self.decrease)), f"decrease: {reason}")
+        elif saturated and self.limit < self.max_limit:
+            self._set(self.limit + 1, "increase: healthy and saturated")
+
+    def _set(self, limit: int, reason: str) -> None:
+        if limit > self.limit:
+            self.increases += 1
+        elif limit < self.limit:
+            self.decreases += 1
+        else:
+            return
+        _log(f"browser concurrency {self.limit} -> {limit} ({reason})")
+        self.limit = limit
+        self.last_reason = reason
+        self.scheduler.set_limit(limit)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sched = self.scheduler.stats()
+            return {
+                "current": sched["active"],
+                "target": self.limit,
+                "min": self.min_limit,
+                "max": self.max_limit,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "last_reason": self.last_reason,
+                "error_rate": round(self.last_error_rate, 3),
+                "latency_ratio": round(self.last_latency_ratio, 2),
+                "baseline_s": {k: round(v, 3) for k, v in self._baseline.items()},
+            }
+
+
+class StepTimer:
+    """
+    `with StepTimer(observer, "login"):` reports the step's latency and outcome to `observer`.
+
+    `queued` returns this thread's running total of seconds spent waiting locally (rate-limit
+    tokens); what accrues during the step is subtracted, so only the remote side's latency
+    reaches the controller.
+    """
+
+    def __init__(self, observer: Optional[Callable], step: str, ignore: tuple = (),
+                 queued: Optional[Callable[[], float]] = None):
+        self.observer = observer
+        self.step = step
+        self.ignore = ignore
+        self.queued = queued
+        self._t0 = 0.0
+        self._q0 = 0.0
+
+    def _queued(self) -> float:
+        try:
+            return self.queued() if self.queued is not None else 0.0
+        except Exception:
+            return 0.0
+
+    def __enter__(self) -> "StepTimer":
+        self._q0 = self._queued()
+        self._t0 = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.observer is not None and not (exc is not None and isinstance(exc, self.ignore)):
+            try:
+                elapsed = time.monotonic() - self._t0 - (self._queued() - self._q0)
+                self.observer(self.step, max(0.0, elapsed), exc is None,
+                              exc is not None and is_timeout(exc))
+            except Exception:
+                pass
+        return False
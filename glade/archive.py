@@ -0,0 +1,131 @@
+# glade/archive.py
+import os
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+
+from .config import ARCHIVE_MAX_MEMBERS, ARCHIVE_MAX_MEMBER_MB, ARCHIVE_MAX_TOTAL_MB, ARCHIVE_MAX_RATIO
+from .handles import safe_filename
+
+ARCHIVE_EXTS = (".zip", ".tar", ".tgz", ".tar.gz")
+
+_CHUNK = 1 << 20
+_JUNK = ("__MACOSX/", ".DS_Store", "Thumbs.db", "desktop.ini")
+
+# OOXML / ODF packages are ZIPs too; these are documents, not archives
+_ODF_MIMETYPES = {
+    b"application/vnd.oasis.opendocument.text": ".odt",
+    b"application/vnd.oasis.opendocument.spreadsheet": ".ods",
+}
+
+
+class ArchiveRejected(RuntimeError):
+    pass
+
+
+@dataclass
+class ArchiveMember:
+    name: str       # path inside the archive
+    size: int       # declared uncompressed size
+
+
+def zip_document_ext(path: str) -> Optional[str]:
+    """'.docx'/'.xlsx'/'.odt'/'.ods' for Office packages, None for a plain ZIP archive."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            names = set(zf.namelist())
+            if "[Content_Types].xml" in names:
+                if any(n.startswith("word/") for n in names):
+                    return ".docx"
+                if any(n.startswith("xl/") for n in names):
+                    return ".xlsx"
+            if "mimetype" in names:
+                return _ODF_MIMETYPES.get(zf.read("mimetype").strip())
+    except zipfile.BadZipFile:
+        return None
+    return None
+
+
+def archive_kind(path: str, filename: str = "", mime: Optional[str] = None) -> Optional[str]:
+    """'zip' or 'tar' when the file is a real archive (Office packages excluded), else None."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head[:2] == b"PK":
+        return "zip" if zip_document_ext(path) is None and zipfile.is_zipfile(path) else None
+    lower = (filename or "").lower()
+    if lower.endswith((".tar", ".tgz", ".tar.gz")) or (mime or "").split(";")[0].strip() in (
+        "application/x-tar", "application/gzip", "application/x-gzip",
+    ):
+        try:
+            return "tar" if tarfile.is_tarfile(path) else None
+        except OSError:
+            return None
+    return None
+
+
+def _skip(name: str) -> bool:
+    base = os.path.basename(name.rstrip("/"))
+    return name.endswith("/") or not base or base.startswith(".") or any(j in name for j in _JUNK)
+
+
+def _iter_members(path: str, kind: str) -> Iterator[Tuple[ArchiveMember, Callable[[], BinaryIO], int]]:
+    """(member, opener, compressed size) for every regular file entry."""
+    if kind == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or _skip(info.filename):
+                    continue
+                yield ArchiveMember(info.filename, info.file_size), (lambda i=info: zf.open(i)), info.compress_size
+    else:
+        with tarfile.open(path, "r:*") as tf:
+            for ti in tf:
+                if not ti.isfile() or _skip(ti.name):
+                    continue
+                yield ArchiveMember(ti.name, ti.size), (lambda t=ti: tf.extractfile(t)), ti.size
+
+
+def extract_members(
+    path: str,
+    kind: str,
+    target: Callable[[ArchiveMember, str], str],
+    max_members: int = ARCHIVE_MAX_MEMBERS,
+    max_member_bytes: int = ARCHIVE_MAX_MEMBER_MB * 1024 * 1024,
+    max_total_bytes: int = ARCHIVE_MAX_TOTAL_MB * 1024 * 1024,
+    max_ratio: float = ARCHIVE_MAX_RATIO,
+) -> list:
+    """
+    Stream every member to `target(member, safe_name)` (which returns the path to write) without
+    holding it in memory. Limits are checked against declared sizes up front and against the
+    bytes actually decompressed while copying, so lying headers and zip bombs stop early.
+    Nested archives are extracted as files and left for the caller to reject or convert.
+    Returns [(member, written_path)].
+    """
+    out = []
+    total = 0
+    seen: set = set()
+    for member, opener, packed in _iter_members(path, kind):
+        if len(out) >= max_members:
+            raise ArchiveRejected(f"archive has more than {max_members} files")
+        if member.size > max_member_bytes:
+            raise ArchiveRejected(f"'{member.name}' is larger than {max_member_bytes} bytes")
+        if packed and member.size / packed > max_ratio:
+            raise ArchiveRejected(f"'{member.name}' compression ratio exceeds {max_ratio:.0f}:1")
+
+        name = safe_filename(os.path.basename(member.name), default=f"member_{len(out) + 1}")
+        if name.lower() in seen:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}_{len(out) + 1}{ext}"
+        seen.add(name.lower())
+
+        dest = target(member, name)
+        written = 0
+        with opener() as src, open(dest, "wb") as f:
+            for chunk in iter(lambda: src.read(_CHUNK), b""):
+                written += len(chunk)
+                total += len(chunk)
+                if written > max_member_bytes or total > max_total_bytes:
+                    raise ArchiveRejected("archive expands beyond the configured size limits")
+                f.write(chunk)
+        out.append((member, dest))
+    return out
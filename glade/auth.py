@@ -2,8 +2,10 @@ import re
 from playwright.sync_api import Page, TimeoutError as PWTimeout
 from .config import START_AT_HOME, HOME_URL, LOGIN_URL, USERNAME, PASSWORD
 from .helpers import _log
+from .ratelimit import throttle
 
 def fast_login(page: Page) -> None:
+    throttle("login")
     page.set_default_timeout(6000)
 
     if START_AT_HOME:
@@ -0,0 +1,112 @@
+# glade/breaker.py
+import threading
+import time
+from typing import Optional
+
+from .config import BREAKER_FAILURES, BREAKER_OPEN_SECONDS, BREAKER_SLOW_CALLS
+from .log import _log
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Trips after `failures` consecutive failed calls or `slow_calls` consecutive calls slower than
+    `slow_seconds`. While open, acquire() refuses callers (optionally parking them for a while);
+    after `open_seconds` a single caller is let through as a probe. Its outcome closes the
+    breaker or re-opens it for another `open_seconds`.
+
+    Every acquire() that returns True must be followed by exactly one record().
+    """
+
+    def __init__(self, name: str, slow_seconds: Optional[float] = None, failures: int = BREAKER_FAILURES,
+                 slow_calls: int = BREAKER_SLOW_CALLS, open_seconds: float = BREAKER_OPEN_SECONDS,
+                 clock=time.monotonic):
+        self.name = name
+        self.slow_seconds = slow_seconds
+        self.failures = max(1, failures)
+        self.slow_calls = max(1, slow_calls)
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self._cond = threading.Condition()
+        self._consecutive_failures = 0
+        self._consecutive_slow = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+        self.last_reason = ""
+
+    def _try_enter(self) -> bool:
+        # caller holds self._cond
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            _log(f"{self.name} circuit half-open; sending a probe")
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def acquire(self, wait: float = 0.0) -> bool:
+        """True if the call may go ahead; waits up to `wait` seconds for the circuit to allow it."""
+        deadline = self.clock() + wait
+        with self._cond:
+            while not self._try_enter():
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self.rejected += 1
+                    return False
+                # wake up for the probe window even if nobody records in the meantime
+                until_probe = self._opened_at + self.open_seconds - self.clock() if self.state == OPEN else remaining
+                self._cond.wait(max(0.05, min(remaining, until_probe)))
+            return True
+
+    def record(self, ok: bool, seconds: float = 0.0, reason: str = "") -> None:
+        slow = self.slow_seconds is not None and seconds > self.slow_seconds
+        with self._cond:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and not slow:
+                    self._close()
+                else:
+                    self._trip(reason or ("slow probe" if ok else "probe failed"))
+            elif self.state == CLOSED:
+                self._consecutive_failures = 0 if ok else self._consecutive_failures + 1
+                self._consecutive_slow = self._consecutive_slow + 1 if ok and slow else 0
+                if self._consecutive_failures >= self.failures:
+                    self._trip(reason or f"{self._consecutive_failures} consecutive failures")
+                elif self._consecutive_slow >= self.slow_calls:
+                    self._trip(f"{self._consecutive_slow} consecutive calls over {self.slow_seconds:.0f}s")
+            self._cond.notify_all()
+
+    def _trip(self, reason: str) -> None:
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._consecutive_failures = self._consecutive_slow = 0
+        self.trips += 1
+        self.last_reason = reason
+        _log(f"{self.name} circuit OPEN for {self.open_seconds:.0f}s: {reason}")
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._consecutive_failures = self._consecutive_slow = 0
+        _log(f"{self.name} circuit closed; probe succeeded")
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = {
+                "state": self.state,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "consecutive_failures": self._consecutive_failures,
+                "consecutive_slow": self._consecutive_slow,
+                "last_reason": self.last_reason,
+            }
+            if self.state == OPEN:
+                out["retry_in_s"] = round(max(0.0, self._opened_at + self.open_seconds - self.clock()), 1)
+            return out
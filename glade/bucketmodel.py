@@ -0,0 +1,362 @@
+# glade/bucketmodel.py
+"""
+Local checklist-bucket classifier: TF-IDF features + nearest centroid (cosine), NumPy only.
+
+Trained from (title or first-page text, bucket) examples in CLASSIFY_HISTORY_PATH. Only
+operator corrections (the `correct` command) are appended there. Uploads never record
+anything: even the item Glade's 'Add an item' fallback creates is named after the
+classifier's own bucket, so the model would only learn to copy itself. Used in front of the rule
+engine in glade.classify: a prediction is taken only when its confidence clears
+BUCKET_MODEL_MIN_CONFIDENCE.
+
+The softmax only ranks the buckets seen in training, so on its own it is confident about
+anything. The model abstains (confidence 0) when the text is not at least
+BUCKET_MODEL_MIN_SIMILARITY (cosine) close to any centroid. Buckets with fewer than
+BUCKET_MODEL_MIN_EXAMPLES examples are left out of training, and a model covering fewer
+than BUCKET_MODEL_MIN_LABELS buckets is neither saved nor loaded, so a handful of
+corrections can't take over routing.
+
+    python -m glade.bucketmodel train [--data history.jsonl ...] [--out model.npz] [--holdout 0.2]
+    python -m glade.bucketmodel eval  [--data history.jsonl ...] [--model model.npz]
+    python -m glade.bucketmodel predict "Chase-1234-01.01.24-01.31.24" ...
+    python -m glade.bucketmodel correct "Fidelity 401k Quarterly Statement" "Retirement & Insurance"
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Iterable, Optional, Sequence
+
+from .config import (
+    BUCKET_MODEL_MIN_CONFIDENCE, BUCKET_MODEL_MIN_EXAMPLES, BUCKET_MODEL_MIN_LABELS, BUCKET_MODEL_MIN_SIMILARITY,
+    BUCKET_MODEL_PATH, BUCKET_MODEL_TEMPERATURE, CLASSIFY_HISTORY_PATH,
+)
+
+_WORD = re.compile(r"[a-z0-9]+(?:&[a-z0-9]+)?")
+_DIGITS = re.compile(r"\d")
+
+
+def _features(text: str) -> list[str]:
+    """
+    Word unigrams/bigrams plus character trigrams per word (so 'paystub' ~ 'pay stub').
+    Numbers get no trigrams: every date, year and account number would share '<00'/'000'
+    and look alike across buckets.
+    """
+    words = [_DIGITS.sub("0", w) for w in _WORD.findall((text or "").lower()[:4000])]
+    feats = [f"w:{w}" for w in words]
+    feats += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        if not w.strip("0"):
+            continue
+        padded = f"<{w}>"
+        feats += [f"c:{padded[i:i + 3]}" for i in range(max(1, len(padded) - 2))]
+    return feats
+
+
+def numpy_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def _coverage_problem(counts: dict) -> Optional[str]:
+    """Why a model trained on `counts` (label -> examples) is too thin to route with, or None."""
+    thin = sorted(lab for lab, n in counts.items() if n < BUCKET_MODEL_MIN_EXAMPLES)
+    if thin:
+        return f"fewer than {BUCKET_MODEL_MIN_EXAMPLES} examples for: {', '.join(thin)}"
+    if len(counts) < BUCKET_MODEL_MIN_LABELS:
+        return f"covers {len(counts)} bucket(s), need at least {BUCKET_MODEL_MIN_LABELS}"
+    return None
+
+
+class BucketModel:
+    def __init__(self, vocab: dict, idf, centroids, labels: Sequence[str], temperature: float = BUCKET_MODEL_TEMPERATURE,
+                 counts: Optional[Sequence[int]] = None, min_similarity: float = BUCKET_MODEL_MIN_SIMILARITY):
+        self.vocab = vocab
+        self.idf = idf
+        self.centroids = centroids
+        self.labels = list(labels)
+        self.temperature = temperature
+        self.counts = dict(zip(self.labels, counts or []))   # training examples per label
+        self.min_similarity = min_similarity
+
+    # ---- training ----
+    @classmethod
+    def fit(cls, texts: Sequence[str], labels: Sequence[str], min_df: int = 1,
+            temperature: float = BUCKET_MODEL_TEMPERATURE) -> "BucketModel":
+        import numpy as np
+
+        if not texts:
+            raise ValueError("no training examples")
+        docs = [set(_features(t)) for t in texts]
+        df = Counter(f for d in docs for f in d)
+        vocab = {f: i for i, f in enumerate(sorted(f for f, c in df.items() if c >= min_df))}
+        n = len(texts)
+        idf = np.zeros(len(vocab), dtype=np.float32)
+        for f, i in vocab.items():
+            idf[i] = np.log((1 + n) / (1 + df[f])) + 1.0
+
+        per_label = Counter(labels)
+        model = cls(vocab, idf, None, sorted(per_label), temperature)
+        model.counts = {lab: per_label[lab] for lab in model.labels}
+        X = model.transform(texts)
+        y = np.array([model.labels.index(lab) for lab in labels])
+        centroids = np.zeros((len(model.labels), len(vocab)), dtype=np.float32)
+        for k in range(len(model.labels)):
+            centroids[k] = X[y == k].mean(axis=0)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        model.centroids = centroids / np.maximum(norms, 1e-12)
+        return model
+
+    # ---- scoring ----
+    def transform(self, texts: Sequence[str]):
+        """L2-normalized TF-IDF matrix, one row per text."""
+        import numpy as np
+
+        X = np.zeros((len(texts), len(self.vocab)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for f, c in Counter(_features(text)).items():
+                col = self.vocab.get(f)
+                if col is not None:
+                    X[row, col] = c
+        X *= self.idf
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        return X / np.maximum(norms, 1e-12)
+
+    def predict_proba(self, texts: Sequence[str]):
+        """(n_texts, n_labels) probabilities: softmax over cosine similarity to each centroid."""
+        import numpy as np
+
+        sims = self.transform(texts) @ self.centroids.T
+        z = sims / self.temperature
+        z -= z.max(axis=1, keepdims=True)
+        p = np.exp(z)
+        p /= p.sum(axis=1, keepdims=True)
+        # Not close to anything seen in training (or no known feature at all): abstain rather
+        # than pick the least unlikely of the trained buckets
+        p[sims.max(axis=1) < max(self.min_similarity, 1e-9)] = 0.0
+        return p
+
+    def predict(self, texts: Sequence[str]) -> list[tuple[Optional[str], float]]:
+        """[(label, confidence)] for a batch, scored in one matrix product; (None, 0.0) = abstained."""
+        if not texts:
+            return []
+        p = self.predict_proba(texts)
+        best = p.argmax(axis=1)
+        return [(self.labels[k], float(p[i, k])) if p[i, k] > 0 else (None, 0.0) for i, k in enumerate(best)]
+
+    # ---- persistence ----
+    def save(self, path: str) -> None:
+        import numpy as np
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        vocab = np.array(sorted(self.vocab, key=self.vocab.get))
+        with open(path, "wb") as f:
+            np.savez_compressed(f, vocab=vocab, idf=self.idf, centroids=self.centroids,
+                                labels=np.array(self.labels), temperature=np.array(self.temperature),
+                                counts=np.array([self.counts.get(lab, 0) for lab in self.labels]))
+
+    @classmethod
+    def load(cls, path: str) -> "BucketModel":
+        """Load a saved model; raises ValueError for models too thin to route with (or without counts)."""
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as z:
+            if "counts" not in z.files:
+                raise ValueError(f"{path} has no per-bucket example counts; retrain it")
+            vocab = {str(f): i for i, f in enumerate(z["vocab"])}
+            model = cls(vocab, z["idf"], z["centroids"], [str(x) for x in z["labels"]], float(z["temperature"]),
+                        counts=[int(n) for n in z["counts"]])
+        problem = _coverage_problem(model.counts)
+        if problem:
+            raise ValueError(f"{path}: {problem}")
+        return model
+
+
+# --------------------------
+# Shared instance + history
+# --------------------------
+_model: Optional[BucketModel] = None
+_model_mtime: Optional[float] = None
+_model_lock = threading.Lock()
+_history_lock = threading.Lock()
+
+
+def get_bucket_model() -> Optional[BucketModel]:
+    """The trained model at BUCKET_MODEL_PATH (reloaded when the file changes), or None."""
+    global _model, _model_mtime
+    if not BUCKET_MODEL_PATH:
+        return None
+    try:
+        mtime = os.path.getmtime(BUCKET_MODEL_PATH)
+    except OSError:
+        return None
+    if mtime != _model_mtime:
+        with _model_lock:
+            if mtime != _model_mtime:
+                try:
+                    _model = BucketModel.load(BUCKET_MODEL_PATH) if numpy_available() else None
+                except Exception:
+                    _model = None
+                _model_mtime = mtime
+    return _model
+
+
+def record_outcome(text: str, label: str, source: str, path: str = CLASSIFY_HISTORY_PATH) -> None:
+    """
+    Append one verified (text, bucket) training example; best-effort. `source` says how the
+    bucket was verified (e.g. "operator"). UnrecognizedDocs is never a label.
+    """
+    from .classify import _ALLOWED_LABELS, DEFAULT_LABEL
+
+    if not path or not text or label not in _ALLOWED_LABELS or label == DEFAULT_LABEL:
+        return
+    line = json.dumps({"ts": int(time.time()), "text": text[:3000], "label": label, "source": source},
+                      ensure_ascii=False)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with _history_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
+
+
+def load_examples(paths: Iterable[str]) -> tuple[list[str], list[str]]:
+    """
+    Read JSONL ({"text","label"}) or TSV (text<TAB>label) files; last label wins per text.
+    History lines without a "source" or with source "new_item" (older builds logged the
+    classifier's own buckets) and UnrecognizedDocs labels are skipped.
+    """
+    examples: dict = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("{"):
+                    rec = json.loads(line)
+                    if "ts" in rec and rec.get("source", "new_item") == "new_item":
+                        continue
+                    text, label = rec.get("text"), rec.get("label")
+                else:
+                    text, _, label = line.rpartition("\t")
+                if text and label and label != "UnrecognizedDocs":
+                    examples[text] = label
+    return list(examples), list(examples.values())
+
+
+# --------------------------
+# CLI
+# --------------------------
+def _split(texts, labels, holdout: float, seed: int):
+    idx = list(range(len(texts)))
+    random.Random(seed).shuffle(idx)
+    cut = int(len(idx) * (1 - holdout))
+    pick = lambda ids: ([texts[i] for i in ids], [labels[i] for i in ids])  # noqa: E731
+    return pick(idx[:cut]), pick(idx[cut:])
+
+
+def _report(model: BucketModel, texts, labels, min_confidence: float) -> None:
+    from .classify import classify_label
+
+    threshold = BUCKET_MODEL_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    t0 = time.perf_counter()
+    preds = model.predict(texts)
+    secs = time.perf_counter() - t0
+    n = len(texts)
+    correct = sum(p == y for (p, _), y in zip(preds, labels))
+    confident = [(p, y) for (p, c), y in zip(preds, labels) if c >= threshold]
+    combined = sum(
+        (p if c >= threshold else classify_label(t)) == y for t, (p, c), y in zip(texts, preds, labels)
+    )
+    rules = sum(classify_label(t) == y for t, y in zip(texts, labels))
+    print(f"examples: {n}   scored in {secs * 1000:.1f} ms ({n / max(secs, 1e-9):.0f} docs/s)")
+    print(f"model accuracy:            {correct / n:.3f}")
+    print(f"confident (>= {threshold:.2f}):     {len(confident) / n:.3f} of docs, "
+          f"accuracy {sum(p == y for p, y in confident) / max(1, len(confident)):.3f}")
+    print(f"rules only accuracy:       {rules / n:.3f}")
+    print(f"model + rules fallback:    {combined / n:.3f}")
+
+
+def _load_or_exit(path: str) -> BucketModel:
+    try:
+        return BucketModel.load(path)
+    except ValueError as e:
+        raise SystemExit(f"unusable model: {e}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m glade.bucketmodel", description="Train/evaluate the local bucket classifier.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("train", "eval"):
+        sp = sub.add_parser(name)
+        sp.add_argument("--data", nargs="+", default=[CLASSIFY_HISTORY_PATH], help="JSONL/TSV example files")
+        sp.add_argument("--min-confidence", type=float, default=None)
+    train = sub.choices["train"]
+    train.add_argument("--out", default=BUCKET_MODEL_PATH)
+    train.add_argument("--holdout", type=float, default=0.2, help="fraction held out for the report (0 = none)")
+    train.add_argument("--seed", type=int, default=0)
+    train.add_argument("--min-df", type=int, default=1)
+    sub.choices["eval"].add_argument("--model", default=BUCKET_MODEL_PATH)
+    pred = sub.add_parser("predict")
+    pred.add_argument("texts", nargs="+")
+    pred.add_argument("--model", default=BUCKET_MODEL_PATH)
+    corr = sub.add_parser("correct", help="record the right bucket for a misrouted document")
+    corr.add_argument("text", help="title or first-page text of the document")
+    corr.add_argument("label", help="checklist bucket it belongs in")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "correct":
+        from .classify import _ALLOWED_LABELS, DEFAULT_LABEL
+
+        label = next((lab for lab in _ALLOWED_LABELS if lab.lower() == args.label.strip().lower()), None)
+        if label is None or label == DEFAULT_LABEL:
+            raise SystemExit(f"unknown bucket {args.label!r}; one of: "
+                             + ", ".join(lab for lab in _ALLOWED_LABELS if lab != DEFAULT_LABEL))
+        record_outcome(args.text, label, source="operator")
+        print(f"recorded {label!r} for {args.text[:80]!r} in {CLASSIFY_HISTORY_PATH}")
+        return
+
+    if args.cmd == "predict":
+        model = _load_or_exit(args.model)
+        for text, (label, conf) in zip(args.texts, model.predict(args.texts)):
+            print(f"{conf:5.2f}  {label or '(abstain)':<30} {text}")
+        return
+
+    texts, labels = load_examples(args.data)
+    if not texts:
+        raise SystemExit("no examples found")
+
+    if args.cmd == "eval":
+        _report(_load_or_exit(args.model), texts, labels, args.min_confidence)
+        return
+
+    counts = Counter(labels)
+    thin = {lab for lab, n in counts.items() if n < BUCKET_MODEL_MIN_EXAMPLES}
+    if thin:
+        print(f"leaving out {len(thin)} bucket(s) with fewer than {BUCKET_MODEL_MIN_EXAMPLES} examples: "
+              + ", ".join(f"{lab} ({counts[lab]})" for lab in sorted(thin)))
+        kept = [(t, y) for t, y in zip(texts, labels) if y not in thin]
+        texts, labels = [t for t, _ in kept], [y for _, y in kept]
+    problem = _coverage_problem(Counter(labels))
+    if problem:
+        raise SystemExit(f"not training a model: {problem}")
+
+    if 0 < args.holdout < 1 and len(texts) >= 10:
+        (tr_x, tr_y), (te_x, te_y) = _split(texts, labels, args.holdout, args.seed)
+        print(f"held-out evaluation ({len(te_x)} of {len(texts)}):")
+        _report(BucketModel.fit(tr_x, tr_y, min_df=args.min_df), te_x, te_y, args.min_confidence)
+    model = BucketModel.fit(texts, labels, min_df=args.min_df)
+    model.save(args.out)
+    print(f"trained on {len(texts)} examples, {len(model.vocab)} features, {len(model.labels)} buckets -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
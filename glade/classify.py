@@ -1,59 +1,269 @@
 # glade/classify.py
 import re
+from typing import NamedTuple, Optional, Sequence
 
-_BANK_PROVIDERS = r"(chase|wells|wellsfargo|bofa|bank of america|citibank|citi|pnc|usaa|capital ?one|discover|fifth ?third|truist|td|huntington|ally|synchrony|comenity|navy federal|nfcu|credit union)"
-_CARD_HINTS      = r"(credit\s*card|visa|mastercard|amex|american express|discover|capital ?one|synchrony|comenity)"
-_VEHICLE_HINTS   = r"(vehicle|auto|vin|title|registration|insurance\s*card)"
-_UTILITY_HINTS   = r"(utility|electric|water|internet|phone|gas|sewer|trash|cable|bill)"
-_LEASE_HINTS     = r"(lease|rental|rent|timeshare)"
-_LAWSUIT_HINTS   = r"(lawsuit|summons|complaint|garnish|judgment|v\.\s|vs\.\s)"
-_MORTGAGE_HINTS  = r"(mortgage|hoa|homeowner|home owners|association)"
-_INCOME_HINTS    = r"(pay\s*stub|paystub|payroll|wage|income)"
-_TAX_HINTS       = r"(tax\s*return|return\s*transcript|\b20\d{2}\s+tax|\btax liability)"
+from .bucketmodel import get_bucket_model
+from .config import BUCKET_MODEL_MIN_CONFIDENCE
 
-def classify_for_checklist(ai_name: str) -> tuple[str, str]:
+# Checklist buckets as they appear in Glade; every classifier returns one of these.
+_ALLOWED_LABELS = [
+    "Bank Statements",
+    "Vehicle Info",
+    "Income",
+    "Tax Returns",
+    "Lawsuits",
+    "Lease",
+    "Credit Cards",
+    "Utility",
+    "Credit Counseling Certificate",
+    "Home/Rent Information",
+    "Identification",
+    "Retirement & Insurance",
+    "Medical Bills",
+    "Client Forms",
+    "UnrecognizedDocs",
+]
+
+DEFAULT_LABEL = "UnrecognizedDocs"
+
+
+class Rule(NamedTuple):
+    name: str
+    label: str
+    priority: int      # breaks ties between labels with the same score
+    pattern: str       # regex fragment; use (?:...) groups only
+    weight: float = 1.0  # added to the label's score per hit; low for words that show up incidentally
+
+
+# Multi-word names also match joined ("NavyFederal", "AppleCash"), the way the naming
+# prompt writes them in titles
+_BANK_PROVIDERS = (
+    r"chase|wells\s*fargo|wells|bofa|bank\s*of\s*america|citibank|citi|pnc|usaa|capital\s*one|"
+    r"fifth\s*third|truist|td\s*bank|huntington|ally|navy\s*federal|nfcu|credit\s*union|u\.?\s?s\.?\s*bank|"
+    r"regions|cash\s*app|paypal|venmo|chime|apple\s*cash|google\s*pay"
+)
+
+# Table of all bucket rules (titles produced by the naming prompt, raw first-page text,
+# file names on checklist cards, and labels from older classifiers all go through this).
+# Words that say what the document *is* (checking, earnings, pay date) weigh more than
+# merchant names and generic words a statement or pay stub lists as line items
+# (Comcast, phone, gas, insurance, ID).
+RULES: tuple[Rule, ...] = (
+    Rule("unrecognized", "UnrecognizedDocs", 100, r"unrecogni[sz]e?able\w*|unrecogni[sz]ed\s*docs?"),
+    Rule("counseling", "Credit Counseling Certificate", 95,
+         r"credit\s+counseling|certificate\s+of\s+counseling|counseling\s+certificate"),
+    Rule("client_forms", "Client Forms", 95,
+         r"client\s+information\s+worksheet|client\s+forms?|questionnaire|rights\s*(?:&|and)\s*responsibilities|"
+         r"lf90|debtors?\s+341"),
+    Rule("lawsuit", "Lawsuits", 90,
+         r"lawsuits?|summons|complaint|garnish\w*|judgment|subpoena|plaintiff|v\.(?=\s)|vs\.?(?=\s)"),
+    Rule("benefit_letter", "Income", 88,
+         r"(?:benefit|disability)\s+letter|benefit\s+statement|pension\s+statement|letter\s+of\s+financial\s+support|"
+         r"social\s+security\s+benefit|benefit\s+amount", 2.0),
+    Rule("vehicle_doc", "Vehicle Info", 86,
+         r"(?:19|20)\d{2}\s+[\w-]+\s*-\s*(?:title|registration|insurance\s+card|financial\s+statement)|"
+         r"vehicle\w*|vin|insurance\s+card|auto\s+(?:loan|insurance)|car\s+title"),
+    Rule("retirement", "Retirement & Insurance", 85,
+         r"401\s*\(?k\)?|ira|annuity|life\s+insurance|pension|retirement(?:\s+savings)?"),
+    Rule("insurance", "Retirement & Insurance", 84, r"insurance", 0.5),
+    Rule("tax", "Tax Returns", 80,
+         r"tax\s+returns?|return\s+transcript|(?:19|20)\d{2}\s+tax|tax\s+liability|income\s+tax|irs|1040|1099|k-?1|"
+         r"schedule\s+[ac]", 2.0),
+    Rule("pay_stub", "Income", 80,
+         r"pay\s*stubs?|payroll|earnings|profit\s*(?:&|and)\s*loss|(?:gross|net)\s+pay|pay\s+(?:date|period)|ytd", 2.0),
+    Rule("income", "Income", 79, r"w-?2|wages?|income"),
+    Rule("vehicle_word", "Vehicle Info", 78, r"title|registration|auto"),
+    Rule("lease", "Lease", 76, r"lease|rental\s+agreement|timeshare"),
+    Rule("home", "Home/Rent Information", 75,
+         r"mortgage|deed|escrow|hoa|home\s*owners?|association|landlord|rent(?:al)?|home/rent"),
+    Rule("medical", "Medical Bills", 70,
+         r"medical|hospital|clinic|doctor|dental|physician|emergency|urgent\s+care|radiology|ambulance"),
+    Rule("utility", "Utility", 65,
+         r"utility|utilities|electric\w*|water|internet|cable|sewer|trash"),
+    Rule("utility_vendor", "Utility", 64,
+         r"gas|phone|xfinity|comcast|spectrum|verizon|t-mobile|at&t|duke\s+energy", 0.5),
+    Rule("identification", "Identification", 60,
+         r"passport|driver'?s?(?:\s+licen[cs]e)?|licen[cs]e|social\s+security\s+card|ss\s+card|id\s+card|selfie|"
+         r"identification|personal\s+info"),
+    Rule("id_abbrev", "Identification", 59, r"dl|ss|ssn|id", 0.5),
+    Rule("credit_card", "Credit Cards", 58,
+         r"credit\s*cards?|visa|mastercard|amex|american\s+express|discover|synchrony|comenity"),
+    Rule("card_statement", "Credit Cards", 57,
+         r"minimum\s+payment(?:\s+due)?|new\s+balance|credit\s+limit|(?:statement\s+)?closing\s+date", 2.0),
+    # "bank" anywhere in a token, so joined names ("CitizensBank", "FifthThirdBank") count
+    Rule("bank", "Bank Statements", 55, _BANK_PROVIDERS + r"|\w*bank\w*|checking|savings", 2.0),
+    Rule("statement", "Bank Statements", 45, r"statements?"),
+    Rule("bill", "Utility", 40, r"bill"),
+    Rule("masked_account", "Credit Cards", 30, r"(?:(?<=-)|(?<=-\s))(?:\d{4}|x{4})"),
+)
+
+
+def _split_alternatives(pattern: str) -> list[str]:
+    """Split a regex fragment on its top-level '|' (ignoring groups, classes and escapes)."""
+    parts, cur, depth, in_class, i = [], [], 0, False, 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            cur.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            parts.append("".join(cur))
+            cur = []
+            i += 1
+            continue
+        cur.append(c)
+        i += 1
+    parts.append("".join(cur))
+    return parts
+
+
+_WORD_START = re.compile(r"\b\w")
+
+
+class Scored(NamedTuple):
+    label: str
+    score: float       # summed weight of the label's hits
+    margin: float      # score minus the runner-up label's score
+    rule: Rule         # the label's highest-priority rule that matched
+
+
+class ClassificationEngine:
     """
-    Returns (checklist, title)
-      checklist ∈ {"initial","additional"}
-      title     ∈ {"Personal Info","Bank statements",...}
+    Table-driven bucket classifier, compiled once.
+
+    Every rule alternative is filed under its first character (alternatives that start with a
+    group or lookbehind go under every character). Per character, the alternatives are
+    combined into one anchored regex of named groups in priority order, so classifying is a
+    single pass over word starts with one dict lookup and at most one match() per word.
+
+    Each hit adds its rule's weight to the rule's label; the label with the highest score
+    wins and priority only breaks ties. A keyword that merely appears somewhere on a page
+    (a utility payment on a bank statement, a 401(k) deduction on a pay stub) no longer
+    outranks the words that say what the document is.
     """
-    s = ai_name or ""
-    s_lower = s.lower()
 
-    # --- Initial checklist (ID/DL/SS/Passport) ---
-    if re.search(r"\b(id|dl|ss|passport|pass\s*port)\b", s_lower):
-        return "initial", "Personal Info"
+    def __init__(self, rules: Sequence[Rule]):
+        unknown = {r.label for r in rules} - set(_ALLOWED_LABELS)
+        if unknown:
+            raise ValueError(f"rules reference labels outside _ALLOWED_LABELS: {sorted(unknown)}")
+        self.rules = sorted(rules, key=lambda r: -r.priority)
+        self._by_group = {f"r{i}": r for i, r in enumerate(self.rules)}
+
+        by_char: dict[str, list[tuple[int, str]]] = {}
+        anywhere: list[tuple[int, str]] = []
+        for i, rule in enumerate(self.rules):
+            for alt in _split_alternatives(rule.pattern):
+                first = alt[:1].lower()
+                if first.isalnum():
+                    by_char.setdefault(first, []).append((i, alt))
+                else:
+                    anywhere.append((i, alt))
+        self._dispatch = {c: self._compile(alts + anywhere) for c, alts in by_char.items()}
+        self._fallback = self._compile(anywhere)
+
+    @staticmethod
+    def _compile(alts: list[tuple[int, str]]) -> re.Pattern:
+        grouped: dict[int, list[str]] = {}
+        for i, alt in sorted(alts):
+            grouped.setdefault(i, []).append(alt)
+        body = "|".join(f"(?P<r{i}>(?:{'|'.join(a)}))" for i, a in grouped.items())
+        return re.compile(rf"(?:{body or '(?!)'})(?!\w)", re.I)
+
+    def matches(self, text: str) -> list[tuple[Rule, int]]:
+        """All (rule, position) hits, at most one per word start; words inside a hit are not re-read."""
+        text = text or ""
+        hits = []
+        end = 0
+        for w in _WORD_START.finditer(text):
+            pos = w.start()
+            if pos < end:
+                continue
+            m = self._dispatch.get(text[pos].lower(), self._fallback).match(text, pos)
+            if m:
+                hits.append((self._by_group[m.lastgroup], pos))
+                end = m.end()
+        return hits
+
+    def rank(self, text: str) -> list[Scored]:
+        """Every label with at least one hit, best first (margins relative to the next label)."""
+        scores: dict[str, float] = {}
+        top_rule: dict[str, Rule] = {}
+        for rule, _pos in self.matches(text):
+            scores[rule.label] = scores.get(rule.label, 0.0) + rule.weight
+            if rule.label not in top_rule or rule.priority > top_rule[rule.label].priority:
+                top_rule[rule.label] = rule
+        order = sorted(scores, key=lambda lab: (-scores[lab], -top_rule[lab].priority))
+        return [
+            Scored(lab, scores[lab], scores[lab] - (scores[order[i + 1]] if i + 1 < len(order) else 0.0), top_rule[lab])
+            for i, lab in enumerate(order)
+        ]
+
+    def score(self, text: str) -> Optional[Scored]:
+        ranked = self.rank(text)
+        return ranked[0] if ranked else None
+
+    def classify(self, text: str) -> Optional[str]:
+        scored = self.score(text)
+        return scored.label if scored else None
 
-    # --- Additional checklist buckets ---
-    if re.search(_BANK_PROVIDERS, s_lower) or "statement" in s_lower or "bank" in s_lower:
-        return "additional", "Bank statements"
 
-    if re.search(_VEHICLE_HINTS, s_lower):
-        return "additional", "Vehicle information"
+ENGINE = ClassificationEngine(RULES)
 
-    if re.search(_INCOME_HINTS, s_lower):
-        return "additional", "Income"
 
-    if re.search(_TAX_HINTS, s_lower) or "tax return" in s_lower:
-        return "additional", "Tax returns"
+def classify_label(text: str, default: Optional[str] = DEFAULT_LABEL) -> Optional[str]:
+    """Bucket (one of _ALLOWED_LABELS) for a title, filename or page text."""
+    return ENGINE.classify(text) or default
 
-    if re.search(_LAWSUIT_HINTS, s_lower):
-        return "additional", "Lawsuits"
 
-    if re.search(_LEASE_HINTS, s_lower):
-        return "additional", "Lease"
+def normalize_to_allowed_label(raw_label: str) -> str:
+    """Map any label (exact allowed label, legacy label, or free text) to an allowed label."""
+    if not raw_label:
+        return DEFAULT_LABEL
+    rl = raw_label.strip().lower()
+    for lab in _ALLOWED_LABELS:
+        if rl == lab.lower():
+            return lab
+    return classify_label(raw_label)
 
-    if re.search(_CARD_HINTS, s_lower) or re.search(r"-\d{4}\b", s_lower):
-        return "additional", "Credit Card"
 
-    if re.search(_UTILITY_HINTS, s_lower) or "utility" in s_lower:
-        return "additional", "Utility"
+class Classification(NamedTuple):
+    label: str
+    confidence: float  # model probability, or the rules' margin over the runner-up as a share of the score
+    source: str        # "model" | "rules"
 
-    if "credit counseling" in s_lower or "certificate of counseling" in s_lower:
-        return "additional", "Credit Counseling"
 
-    if re.search(_MORTGAGE_HINTS, s_lower):
-        return "additional", "Mortgage/HOA"
+def classify_many(texts: Sequence[str]) -> list[Classification]:
+    """
+    Buckets for a batch of titles/page texts. The local model (if trained) scores the whole
+    batch in one call; anything it is not confident about goes through the rule engine.
+    """
+    model = get_bucket_model()
+    preds = model.predict(list(texts)) if model is not None else [(None, 0.0)] * len(texts)
+    results = []
+    for text, (label, conf) in zip(texts, preds):
+        if label in _ALLOWED_LABELS and label != DEFAULT_LABEL and conf >= BUCKET_MODEL_MIN_CONFIDENCE:
+            results.append(Classification(label, conf, "model"))
+            continue
+        scored = ENGINE.score(text)
+        results.append(Classification(scored.label, scored.margin / scored.score, "rules") if scored
+                       else Classification(DEFAULT_LABEL, 0.0, "rules"))
+    return results
 
-    # Default bucket when we can't tell—still goes to Additional
-    return "additional", "UnrecognizableDoc"
+
+def classify_for_checklist(ai_name: str) -> tuple[str, str]:
+    """
+    Returns (checklist, title)
+      checklist ∈ {"initial","additional"}
+      title     ∈ _ALLOWED_LABELS
+    """
+    label = classify_many([ai_name])[0].label
+    return ("initial" if label == "Identification" else "additional"), label
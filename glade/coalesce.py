@@ -0,0 +1,157 @@
+# glade/coalesce.py
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .config import UPLOAD_BATCH_WINDOW_SECONDS, UPLOAD_BATCH_MAX
+from .log import _log
+
+
+class _Batch:
+    def __init__(self, key: str, owner: Any, opened: float):
+        self.key = key
+        self.owner = owner          # e.g. (client_email, client_name) of the first job
+        self.opened = opened
+        self.members = 0            # slots reserved
+        self.jobs: dict = {}        # slot index -> job, once that slot is ready
+        self.cancelled = 0
+        self.closed = False         # no new slots once the window is over (or the batch is full)
+        self.running = False
+        self.results: dict = {}
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def ready(self) -> bool:
+        return len(self.jobs) + self.cancelled == self.members
+
+
+class UploadSlot:
+    """A place in a client's next batch, reserved when the request arrives."""
+
+    def __init__(self, batcher: "ClientBatcher", owner: Any, batch: Optional[_Batch] = None, index: int = 0):
+        self._batcher = batcher
+        self._owner = owner
+        self._batch = batch
+        self._index = index
+        self._used = False
+
+    def submit(self, job: Any) -> Any:
+        """Hand over the prepared job and block until the batch it joined has run."""
+        self._used = True
+        if self._batch is None:                 # batching disabled
+            return self._batcher.runner(self._owner, [job])[0]
+        return self._batcher._submit(self._batch, self._index, job)
+
+    def cancel(self) -> None:
+        """Give the slot up (preparation failed, or the job went another way); no-op once used."""
+        if not self._used:
+            self._used = True
+            self._batcher._cancel(self._batch)
+
+
+class ClientBatcher:
+    """
+    Merges jobs for the same key (client) that arrive within `window` seconds into one call
+    of `runner(owner, jobs) -> results`.
+
+    Requests reserve() a slot as soon as they arrive and prepare their job (conversion,
+    naming) while holding it, so the window counts from arrival rather than from the end
+    of preparation: attachments that arrive together share a session even if naming
+    finishes seconds apart, and a lone request only waits for whatever part of the window
+    its own preparation did not already cover. The batch closes to newcomers when the
+    window ends (or `max_batch` slots are taken) and runs once every slot in it is ready or
+    cancelled, on the thread of whichever member finds it complete. The others block until
+    their individual result is published.
+    """
+
+    def __init__(self, runner: Callable[[Any, list], list], window: float = UPLOAD_BATCH_WINDOW_SECONDS,
+                 max_batch: int = UPLOAD_BATCH_MAX):
+        self.runner = runner
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._open: dict[str, _Batch] = {}
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.merged_jobs = 0
+
+    def reserve(self, key: str, owner: Any) -> UploadSlot:
+        if self.window <= 0:
+            return UploadSlot(self, owner)
+        with self._cond:
+            now = time.monotonic()
+            batch = self._open.get(key)
+            if batch is not None and now >= batch.opened + self.window:
+                self._close(batch)              # nobody was waiting to close it on time
+                batch = None
+            if batch is None:
+                batch = self._open[key] = _Batch(key, owner, now)
+            index = batch.members
+            batch.members += 1
+            if batch.members >= self.max_batch:
+                self._close(batch)
+            return UploadSlot(self, owner, batch, index)
+
+    def submit(self, key: str, owner: Any, job: Any) -> Any:
+        """Reserve and submit in one go, for jobs that are ready on arrival."""
+        return self.reserve(key, owner).submit(job)
+
+    def _submit(self, batch: _Batch, index: int, job: Any) -> Any:
+        with self._cond:
+            batch.jobs[index] = job
+            self._cond.notify_all()
+            while not batch.done.is_set():
+                if not batch.closed and time.monotonic() >= batch.opened + self.window:
+                    self._close(batch)
+                if batch.closed and batch.ready() and not batch.running:
+                    batch.running = True
+                    break
+                remaining = None if batch.closed else batch.opened + self.window - time.monotonic()
+                self._cond.wait(remaining)
+            else:
+                return self._result(batch, index)
+        self._run(batch)
+        return self._result(batch, index)
+
+    def _cancel(self, batch: Optional[_Batch]) -> None:
+        if batch is None:
+            return
+        with self._cond:
+            batch.cancelled += 1
+            self._cond.notify_all()
+
+    def _run(self, batch: _Batch) -> None:
+        order = sorted(batch.jobs)
+        jobs = [batch.jobs[i] for i in order]
+        with self._cond:
+            self.batches += 1
+            self.merged_jobs += len(jobs) - 1
+        if len(jobs) > 1:
+            _log(f"running {len(jobs)} coalesced jobs for {batch.key} in one session")
+        try:
+            batch.results = dict(zip(order, self.runner(batch.owner, jobs)))
+        except BaseException as e:
+            batch.error = e
+        finally:
+            with self._cond:
+                batch.done.set()
+                self._cond.notify_all()
+
+    @staticmethod
+    def _result(batch: _Batch, index: int) -> Any:
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+    def _close(self, batch: _Batch) -> None:
+        # caller holds self._cond
+        if not batch.closed:
+            batch.closed = True
+            if self._open.get(batch.key) is batch:
+                del self._open[batch.key]
+
+    def stats(self) -> dict:
+        with self._cond:
+            reserved = sum(b.members - b.cancelled for b in self._open.values())
+            ready = sum(len(b.jobs) for b in self._open.values())
+        return {"window_s": self.window, "open_batches": len(self._open), "reserved_slots": reserved,
+                "ready_jobs": ready, "batches": self.batches, "merged_jobs": self.merged_jobs}
@@ -13,3 +13,137 @@ HOME_URL     = "https://www.glade.ai/"
 LOGIN_URL    = "https://app.glade.ai/creator/sign-in"
 WORKFLOW_URL = "https://app.glade.ai/dashboard/workflows/user-workflow"
 
+# PDF text extraction: engines tried in order (missing ones are skipped); escalate when shorter than MIN_CHARS
+PDF_TEXT_BACKENDS  = [b.strip() for b in os.getenv("PDF_TEXT_BACKENDS", "pypdfium2,pypdf2,pdfminer").split(",") if b.strip()]
+PDF_TEXT_MIN_CHARS = int(os.getenv("PDF_TEXT_MIN_CHARS", "40"))
+
+# Local OCR for image-only pages (needs pytesseract + tesseract binary; silently off otherwise)
+OCR_ENABLED   = os.getenv("OCR_ENABLED", "true").lower() == "true"
+OCR_MAX_DIM   = int(os.getenv("OCR_MAX_DIM", "2500"))   # long edge in px (~300 DPI for Letter)
+OCR_LANG      = os.getenv("OCR_LANG", "eng")
+OCR_TIMEOUT   = float(os.getenv("OCR_TIMEOUT", "90"))
+MIN_NAMING_CHARS = int(os.getenv("MIN_NAMING_CHARS", "20"))  # below this, skip the LLM call
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "")               # optional on-disk page text cache
+
+# Image -> PDF conversion. "lean": embed JPEGs as-is when possible, otherwise downscale + re-encode.
+IMAGE_PDF_MODE     = os.getenv("IMAGE_PDF_MODE", "lean").lower()   # lean|legacy
+IMAGE_PDF_DPI      = float(os.getenv("IMAGE_PDF_DPI", "200"))
+IMAGE_MAX_DIM      = int(os.getenv("IMAGE_MAX_DIM", "0"))          # px on long edge; 0 = DPI x 11in
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+
+# CPU-bound conversion/extraction pool (0 workers = run inline on the request thread)
+CONVERT_WORKERS         = int(os.getenv("CONVERT_WORKERS", str(min(4, os.cpu_count() or 1))))
+CONVERT_TASKS_PER_CHILD = int(os.getenv("CONVERT_TASKS_PER_CHILD", "50"))  # recycle workers to bound memory
+CONVERT_TIMEOUT         = float(os.getenv("CONVERT_TIMEOUT", "180"))
+
+# DOC/DOCX/XLS(X) -> PDF. auto: docx2pdf on Windows, warm unoserver pool if installed, else cold soffice
+OFFICE_CONVERTER      = os.getenv("OFFICE_CONVERTER", "auto").lower()   # auto|warm|cold|docx2pdf
+OFFICE_WORKERS        = int(os.getenv("OFFICE_WORKERS", "1"))
+OFFICE_BASE_PORT      = int(os.getenv("OFFICE_BASE_PORT", "2003"))
+OFFICE_TIMEOUT        = float(os.getenv("OFFICE_TIMEOUT", "120"))
+OFFICE_START_TIMEOUT  = float(os.getenv("OFFICE_START_TIMEOUT", "60"))
+OFFICE_QUEUE_TIMEOUT  = float(os.getenv("OFFICE_QUEUE_TIMEOUT", "300"))
+OFFICE_JOBS_PER_INSTANCE = int(os.getenv("OFFICE_JOBS_PER_INSTANCE", "200"))
+SOFFICE_BIN           = os.getenv("SOFFICE_BIN", "soffice")
+UNOSERVER_BIN         = os.getenv("UNOSERVER_BIN", "unoserver")
+
+# Pre-upload PDF optimization (pikepdf). Kept only if it saves at least MIN_SAVINGS of the file.
+PDF_OPTIMIZE             = os.getenv("PDF_OPTIMIZE", "true").lower() == "true"
+PDF_OPTIMIZE_MAX_DPI     = float(os.getenv("PDF_OPTIMIZE_MAX_DPI", "200"))
+PDF_OPTIMIZE_MIN_SAVINGS = float(os.getenv("PDF_OPTIMIZE_MIN_SAVINGS", "0.10"))
+PDF_OPTIMIZE_MIN_BYTES   = int(os.getenv("PDF_OPTIMIZE_MIN_BYTES", str(256 * 1024)))
+
+# Per-request workspaces (default: tmpfs at /dev/shm when present). Quota is per workspace.
+WORKSPACE_ROOT          = os.getenv("WORKSPACE_ROOT", "")
+WORKSPACE_QUOTA_MB      = int(os.getenv("WORKSPACE_QUOTA_MB", "512"))
+WORKSPACE_MIN_FREE_MB   = int(os.getenv("WORKSPACE_MIN_FREE_MB", "256"))
+WORKSPACE_STALE_SECONDS = int(os.getenv("WORKSPACE_STALE_SECONDS", "3600"))
+
+# Local bucket classifier (python -m glade.bucketmodel train); used ahead of the keyword rules
+BUCKET_MODEL_PATH           = os.getenv("BUCKET_MODEL_PATH", "data/bucket_model.npz")
+BUCKET_MODEL_MIN_CONFIDENCE = float(os.getenv("BUCKET_MODEL_MIN_CONFIDENCE", "0.6"))
+BUCKET_MODEL_TEMPERATURE    = float(os.getenv("BUCKET_MODEL_TEMPERATURE", "0.1"))
+BUCKET_MODEL_MIN_SIMILARITY = float(os.getenv("BUCKET_MODEL_MIN_SIMILARITY", "0.3"))  # cosine to the best centroid, else abstain
+BUCKET_MODEL_MIN_EXAMPLES   = int(os.getenv("BUCKET_MODEL_MIN_EXAMPLES", "5"))    # per bucket; thinner buckets are left out
+BUCKET_MODEL_MIN_LABELS     = int(os.getenv("BUCKET_MODEL_MIN_LABELS", "4"))      # buckets a model must cover to be used
+CLASSIFY_HISTORY_PATH       = os.getenv("CLASSIFY_HISTORY_PATH", "data/classify_history.jsonl")  # training examples
+
+# Webhook retries: Idempotency-Key header (or a derived key) attaches/replays instead of re-running
+IDEMPOTENCY_TTL_SECONDS     = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))   # replay window
+IDEMPOTENCY_WAIT_SECONDS    = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "900"))   # duplicate waits this long
+IDEMPOTENCY_REPLAY_FAILURES = os.getenv("IDEMPOTENCY_REPLAY_FAILURES", "false").lower() == "true"
+
+# /process-doc calls for the same client within the window share one browser session (0 = off)
+UPLOAD_BATCH_WINDOW_SECONDS = float(os.getenv("UPLOAD_BATCH_WINDOW_SECONDS", "3"))
+UPLOAD_BATCH_MAX            = int(os.getenv("UPLOAD_BATCH_MAX", "10"))
+
+# Browser sessions: one at a time per client, clients served round-robin up to this many at once
+MAX_BROWSER_CONTEXTS = int(os.getenv("MAX_BROWSER_CONTEXTS", "4"))
+
+# Outbound Glade UI actions per minute, shared by all browser contexts (0 = unlimited).
+# With GLADE_RATE_STATE_DIR the buckets are files shared by every process on the host.
+GLADE_RATE_LOGIN_PER_MIN    = float(os.getenv("GLADE_RATE_LOGIN_PER_MIN", "10"))
+GLADE_RATE_SEARCH_PER_MIN   = float(os.getenv("GLADE_RATE_SEARCH_PER_MIN", "30"))
+GLADE_RATE_NAVIGATE_PER_MIN = float(os.getenv("GLADE_RATE_NAVIGATE_PER_MIN", "60"))
+GLADE_RATE_UPLOAD_PER_MIN   = float(os.getenv("GLADE_RATE_UPLOAD_PER_MIN", "30"))
+GLADE_RATE_STATE_DIR        = os.getenv("GLADE_RATE_STATE_DIR", "")
+
+# Failed session steps/uploads are retried this many times in the same browser context,
+# resuming from the last checkpoint (client page once known) instead of a fresh login
+SESSION_STEP_RETRIES = int(os.getenv("SESSION_STEP_RETRIES", "2"))
+
+# Flight recorder: per-job trace/console/network ring buffer, written to FLIGHT_ARTIFACT_DIR/<job id>
+# only when a job fails (or for a FLIGHT_SAMPLE_SUCCESS fraction of successes); served at /jobs/{id}/artifacts
+FLIGHT_RECORDER        = os.getenv("FLIGHT_RECORDER", "true").lower() == "true"
+FLIGHT_TRACE           = os.getenv("FLIGHT_TRACE", "true").lower() == "true"     # Playwright trace (rolls per step)
+FLIGHT_ARTIFACT_DIR    = os.getenv("FLIGHT_ARTIFACT_DIR", "data/artifacts")
+FLIGHT_MAX_EVENTS      = int(os.getenv("FLIGHT_MAX_EVENTS", "500"))
+FLIGHT_SAMPLE_SUCCESS  = float(os.getenv("FLIGHT_SAMPLE_SUCCESS", "0"))
+FLIGHT_RETENTION_HOURS = float(os.getenv("FLIGHT_RETENTION_HOURS", "72"))
+FLIGHT_MAX_JOBS        = int(os.getenv("FLIGHT_MAX_JOBS", "500"))
+
+# Uploads that fail after conversion/naming keep their PDF here for `python -m glade.deadletter replay`
+DEADLETTER_ENABLED         = os.getenv("DEADLETTER_ENABLED", "true").lower() == "true"
+DEADLETTER_DIR             = os.getenv("DEADLETTER_DIR", "data/deadletter")
+DEADLETTER_REPLAY_PARALLEL = int(os.getenv("DEADLETTER_REPLAY_PARALLEL", "4"))
+
+# Circuit breakers (Glade session open, OpenAI naming): trip after N consecutive failures or
+# slow calls, fail fast while open, probe with a single call after BREAKER_OPEN_SECONDS
+BREAKER_FAILURES            = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_SLOW_CALLS          = int(os.getenv("BREAKER_SLOW_CALLS", "3"))
+BREAKER_OPEN_SECONDS        = float(os.getenv("BREAKER_OPEN_SECONDS", "60"))
+GLADE_BREAKER_SLOW_SECONDS  = float(os.getenv("GLADE_BREAKER_SLOW_SECONDS", "90"))   # login -> checklist
+GLADE_BREAKER_PARK_SECONDS  = float(os.getenv("GLADE_BREAKER_PARK_SECONDS", "0"))    # >0: jobs wait this long
+OPENAI_BREAKER_SLOW_SECONDS = float(os.getenv("OPENAI_BREAKER_SLOW_SECONDS", "30"))
+
+# Adaptive (AIMD) browser concurrency between ADAPTIVE_MIN_CONTEXTS and MAX_BROWSER_CONTEXTS
+ADAPTIVE_CONCURRENCY      = os.getenv("ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+ADAPTIVE_MIN_CONTEXTS     = int(os.getenv("ADAPTIVE_MIN_CONTEXTS", "1"))
+ADAPTIVE_INITIAL_CONTEXTS = int(os.getenv("ADAPTIVE_INITIAL_CONTEXTS", "2"))
+ADAPTIVE_WINDOW           = int(os.getenv("ADAPTIVE_WINDOW", "20"))              # step observations per decision
+ADAPTIVE_LATENCY_FACTOR   = float(os.getenv("ADAPTIVE_LATENCY_FACTOR", "2.0"))   # median step vs baseline
+ADAPTIVE_MAX_ERROR_RATE   = float(os.getenv("ADAPTIVE_MAX_ERROR_RATE", "0.2"))
+ADAPTIVE_COOLDOWN_SECONDS = float(os.getenv("ADAPTIVE_COOLDOWN_SECONDS", "30"))  # min gap between decreases
+
+# /process-batch: documents converted/named concurrently before the single browser session
+BATCH_PREPARE_WORKERS = int(os.getenv("BATCH_PREPARE_WORKERS", "4"))
+BATCH_MAX_FILES       = int(os.getenv("BATCH_MAX_FILES", "50"))
+
+# ZIP/TAR ingestion: members fan out as separate documents (limits guard against zip bombs)
+ARCHIVE_MAX_MEMBERS   = int(os.getenv("ARCHIVE_MAX_MEMBERS", "50"))
+ARCHIVE_MAX_MEMBER_MB = int(os.getenv("ARCHIVE_MAX_MEMBER_MB", "100"))
+ARCHIVE_MAX_TOTAL_MB  = int(os.getenv("ARCHIVE_MAX_TOTAL_MB", "400"))
+ARCHIVE_MAX_RATIO     = float(os.getenv("ARCHIVE_MAX_RATIO", "200"))
+
+# Split mode: classify every page and upload runs of same-label pages as separate documents
+SPLIT_MODE           = os.getenv("SPLIT_MODE", "false").lower() == "true"   # default for requests without `split`
+SPLIT_PAGES_PER_TASK = int(os.getenv("SPLIT_PAGES_PER_TASK", "8"))          # pages per text-extraction task
+SPLIT_OCR_WORKERS    = int(os.getenv("SPLIT_OCR_WORKERS", "4"))             # concurrent OCR pages (pool-bounded)
+SPLIT_MIN_SCORE      = float(os.getenv("SPLIT_MIN_SCORE", "1.0"))           # page rule score needed to cut...
+SPLIT_MIN_MARGIN     = float(os.getenv("SPLIT_MIN_MARGIN", "1.0"))          # ...and its lead over the runner-up
+
+# Bulk offline import (python bulk_import.py DIR --map clients.csv): clients prepared/uploaded at once,
+# documents per browser session (progress is checkpointed to the manifest after each session)
+BULK_CLIENTS_PARALLEL = int(os.getenv("BULK_CLIENTS_PARALLEL", str(MAX_BROWSER_CONTEXTS)))
+BULK_UPLOAD_BATCH     = int(os.getenv("BULK_UPLOAD_BATCH", "10"))
+BULK_PROGRESS_SECONDS = float(os.getenv("BULK_PROGRESS_SECONDS", "15"))
@@ -0,0 +1,142 @@
+# glade/convert.py
+import os
+import time
+from typing import Optional
+
+from .config import IMAGE_PDF_MODE, IMAGE_PDF_DPI, IMAGE_MAX_DIM, IMAGE_JPEG_QUALITY
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".heic", ".heif", ".tif", ".tiff", ".gif", ".bmp", ".webp")
+
+# EXIF orientation -> page /Rotate for the cases a PDF viewer can express without re-encoding
+_EXIF_ROTATE = {1: 0, 3: 180, 6: 90, 8: 270}
+
+
+def _register_heif() -> None:
+    try:
+        import pillow_heif
+        pillow_heif.register_heif_opener()
+    except Exception:
+        pass
+
+
+def _max_dim(dpi: float, max_dim: int) -> int:
+    # Default cap: the long edge of a Letter page (11in) at the target DPI
+    return max_dim if max_dim > 0 else int(dpi * 11)
+
+
+def _write_jpeg_pdf(jpeg_path: str, out_pdf: str, width: int, height: int, gray: bool, dpi: float, rotate: int) -> None:
+    """Single-page PDF wrapping the JPEG bytes untouched (/DCTDecode)."""
+    with open(jpeg_path, "rb") as f:
+        data = f.read()
+    pw = round(width * 72.0 / dpi, 2)
+    ph = round(height * 72.0 / dpi, 2)
+    content = f"q {pw} 0 0 {ph} 0 0 cm /Im0 Do Q".encode("ascii")
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {pw} {ph}] /Rotate {rotate} "
+            f"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>"
+        ).encode("ascii"),
+        (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /{'DeviceGray' if gray else 'DeviceRGB'} /BitsPerComponent 8 "
+            f"/Filter /DCTDecode /Length {len(data)} >>\nstream\n"
+        ).encode("ascii") + data + b"\nendstream",
+        f"<< /Length {len(content)} >>\nstream\n".encode("ascii") + content + b"\nendstream",
+    ]
+    with open(out_pdf, "wb") as out:
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for i, body in enumerate(objs, start=1):
+            offsets.append(out.tell())
+            out.write(f"{i} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+        xref = out.tell()
+        out.write(f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode("ascii"))
+        for off in offsets:
+            out.write(f"{off:010d} 00000 n \n".encode("ascii"))
+        out.write(f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+
+
+def image_to_pdf(
+    src_path: str,
+    out_pdf: str,
+    mode: Optional[str] = None,
+    dpi: Optional[float] = None,
+    max_dim: Optional[int] = None,
+    quality: Optional[int] = None,
+) -> dict:
+    """
+    Convert an image file to PDF and return conversion stats
+    (strategy, pages, src_bytes, pdf_bytes, ms).
+
+    lean (default):
+      - single-frame RGB/gray JPEG within the size cap -> embedded losslessly, no decode;
+        EXIF rotations become the page /Rotate
+      - everything else -> EXIF-transposed, downscaled to the cap, re-encoded as JPEG
+      - multi-frame TIFF/HEIC/GIF -> one PDF page per frame
+    legacy: the original decode -> RGB -> PDF at 200 DPI, first frame only.
+    """
+    from PIL import Image, ImageOps, ImageSequence
+    _register_heif()
+
+    mode = (mode or IMAGE_PDF_MODE).lower()
+    dpi = float(dpi or IMAGE_PDF_DPI)
+    cap = _max_dim(dpi, IMAGE_MAX_DIM if max_dim is None else max_dim)
+    quality = int(quality or IMAGE_JPEG_QUALITY)
+
+    t0 = time.perf_counter()
+    src_bytes = os.path.getsize(src_path)
+    pages = 1
+
+    with Image.open(src_path) as img:
+        if mode == "legacy":
+            strategy = "legacy"
+            img.convert("RGB").save(out_pdf, "PDF", resolution=200.0)
+        else:
+            n_frames = getattr(img, "n_frames", 1)
+            orientation = 1
+            try:
+                orientation = img.getexif().get(0x0112, 1) or 1
+            except Exception:
+                pass
+
+            if (
+                img.format == "JPEG"
+                and n_frames == 1
+                and img.mode in ("RGB", "L")
+                and max(img.size) <= cap
+                and orientation in _EXIF_ROTATE
+            ):
+                strategy = "passthrough"
+                _write_jpeg_pdf(
+                    src_path, out_pdf, img.size[0], img.size[1],
+                    gray=(img.mode == "L"), dpi=dpi, rotate=_EXIF_ROTATE[orientation],
+                )
+            else:
+                strategy = "reencode"
+                frames = []
+                for i, frame in enumerate(ImageSequence.Iterator(img)):
+                    fr = ImageOps.exif_transpose(frame) if i == 0 else frame.copy()
+                    fr = fr.convert("L" if fr.mode in ("1", "L", "LA", "I;16") else "RGB")
+                    if max(fr.size) > cap:
+                        fr.thumbnail((cap, cap), Image.LANCZOS)
+                    frames.append(fr)
+                pages = len(frames)
+                frames[0].save(
+                    out_pdf, "PDF", resolution=dpi, quality=quality,
+                    save_all=pages > 1, append_images=frames[1:],
+                )
+
+    stats = {
+        "strategy": strategy,
+        "pages": pages,
+        "src_bytes": src_bytes,
+        "pdf_bytes": os.path.getsize(out_pdf),
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    print(
+        f"[DEBUG] image->PDF {strategy}: {stats['src_bytes']} -> {stats['pdf_bytes']} bytes, "
+        f"{pages} page(s), {stats['ms']} ms"
+    )
+    return stats
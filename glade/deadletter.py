@@ -0,0 +1,228 @@
+# glade/deadletter.py
+"""
+Dead-letter store for uploads that failed after conversion and naming.
+
+Each entry is a folder under DEADLETTER_DIR holding the normalized PDF and entry.json (client,
+proposed title, bucket, error, stage timings, attempts). Replaying only needs the browser:
+the stored PDF and title are reused, so nothing is converted or named again. Each replay runs
+as its own flight-recorder job (<original job>-replay<n>), so the original failure's trace and
+screenshots are kept.
+
+    python -m glade.deadletter list [--status pending]
+    python -m glade.deadletter replay [--parallel 4] [--client EMAIL] [--limit N] [--dry-run]
+    python -m glade.deadletter purge [--older-than-days 7] [--status replayed]
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence
+
+from .config import DEADLETTER_DIR, DEADLETTER_REPLAY_PARALLEL
+from .flightrec import new_job_id
+from .log import _log
+
+PENDING = "pending"
+REPLAYED = "replayed"
+
+
+class DeadLetterStore:
+    def __init__(self, root: str = DEADLETTER_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _entry_path(self, entry_id: str) -> str:
+        return os.path.join(self.root, entry_id, "entry.json")
+
+    def put(self, client_email: str, client_name: str, pdf_path: str, proposed_title: str, error: str,
+            bucket: Optional[str] = None, stage: str = "upload", timings: Optional[dict] = None,
+            source: Optional[str] = None, job_id: Optional[str] = None) -> str:
+        """Keep a copy of the PDF (hard link when possible) plus what is needed to upload it later."""
+        entry_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+        folder = os.path.join(self.root, entry_id)
+        os.makedirs(folder, exist_ok=True)
+        dest = os.path.join(folder, "document.pdf")
+        try:
+            os.link(pdf_path, dest)
+        except OSError:
+            shutil.copyfile(pdf_path, dest)
+        self._write(entry_id, {
+            "id": entry_id,
+            "status": PENDING,
+            "client_email": client_email or "",
+            "client_name": client_name or "",
+            "proposed_title": proposed_title,
+            "bucket": bucket,
+            "stage": stage,
+            "error": error,
+            "timings": timings or {},
+            "source": source,
+            "job_id": job_id,               # latest attempt's flight-recorder job
+            "original_job_id": job_id,      # the failure this entry was kept for
+            "created": time.time(),
+            "attempts": 0,
+            "history": [],
+        })
+        _log(f"dead-lettered '{proposed_title}' for {client_email or client_name} as {entry_id}")
+        return entry_id
+
+    def _write(self, entry_id: str, entry: dict) -> None:
+        path = self._entry_path(entry_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, path)
+
+    def get(self, entry_id: str) -> dict:
+        with open(self._entry_path(entry_id), encoding="utf-8") as f:
+            return json.load(f)
+
+    def pdf_path(self, entry_id: str) -> str:
+        return os.path.join(self.root, entry_id, "document.pdf")
+
+    def entries(self, status: Optional[str] = None) -> list[dict]:
+        out = []
+        try:
+            names = sorted(os.listdir(self.root))
+        except FileNotFoundError:
+            return out
+        for name in names:
+            try:
+                entry = self.get(name)
+            except (OSError, ValueError):
+                continue
+            if status is None or entry.get("status") == status:
+                out.append(entry)
+        return out
+
+    def record_attempt(self, entry_id: str, ok: bool, error: Optional[str] = None,
+                       job_id: Optional[str] = None) -> dict:
+        """Count a replay; a success marks the entry replayed and drops its PDF."""
+        with self._lock:
+            entry = self.get(entry_id)
+            entry["attempts"] += 1
+            entry["history"].append({"at": time.time(), "ok": ok, "error": error, "job_id": job_id})
+            entry.setdefault("original_job_id", entry.get("job_id"))
+            if job_id:
+                entry["job_id"] = job_id
+            if ok:
+                entry["status"] = REPLAYED
+                try:
+                    os.remove(self.pdf_path(entry_id))
+                except OSError:
+                    pass
+            else:
+                entry["error"] = error
+            self._write(entry_id, entry)
+            return entry
+
+    def purge(self, older_than_days: float, status: Optional[str] = REPLAYED) -> int:
+        cutoff = time.time() - older_than_days * 86400
+        n = 0
+        for entry in self.entries(status):
+            if entry.get("created", 0) < cutoff:
+                shutil.rmtree(os.path.join(self.root, entry["id"]), ignore_errors=True)
+                n += 1
+        return n
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        return {"pending": sum(1 for e in entries if e["status"] == PENDING),
+                "replayed": sum(1 for e in entries if e["status"] == REPLAYED)}
+
+
+def _replay_job_id(entry: dict) -> str:
+    """A fresh flight-recorder job per replay, so a failed replay can't overwrite the original's trace."""
+    original = entry.get("original_job_id", entry.get("job_id"))
+    if not original:
+        return new_job_id()
+    return f"{original}-replay{entry.get('attempts', 0) + 1}"
+
+
+def replay(store: DeadLetterStore, entries: list[dict], parallel: int = DEADLETTER_REPLAY_PARALLEL,
+           dry_run: bool = False) -> tuple[int, int]:
+    """
+    Upload pending entries again, one browser session per client (same-bucket documents share
+    a file chooser) and up to `parallel` clients at once. Returns (succeeded, failed).
+    """
+    from .session import UploadJob, upload_documents
+
+    by_client: dict = {}
+    for e in entries:
+        key = (e["client_email"] or e["client_name"]).strip().lower()
+        by_client.setdefault(key, []).append(e)
+
+    done = {"ok": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def _client(group: list[dict]) -> None:
+        first = group[0]
+        jobs = [UploadJob(doc_title=e["proposed_title"], upload_path=store.pdf_path(e["id"]), job_id=_replay_job_id(e))
+                for e in group]
+        if dry_run:
+            for e in group:
+                print(f"would upload {e['id']} '{e['proposed_title']}' -> {e.get('bucket')} for "
+                      f"{first['client_email'] or first['client_name']}")
+            return
+        outcomes = upload_documents(first["client_email"], first["client_name"], jobs, group_by_bucket=True)
+        for e, job, (ok, err) in zip(group, jobs, outcomes):
+            store.record_attempt(e["id"], ok, err, job_id=job.job_id)
+            with lock:
+                done["ok" if ok else "failed"] += 1
+            print(f"{'ok    ' if ok else 'FAILED'} {e['id']} '{e['proposed_title']}'" + ("" if ok else f": {err}"))
+
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        list(pool.map(_client, by_client.values()))
+    if not dry_run:
+        secs = time.monotonic() - t0
+        print(f"replayed {done['ok']} ok, {done['failed']} failed across {len(by_client)} client(s) in {secs:.0f}s")
+    return done["ok"], done["failed"]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m glade.deadletter", description="Inspect and replay failed uploads.")
+    ap.add_argument("--dir", default=DEADLETTER_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ls = sub.add_parser("list")
+    ls.add_argument("--status", default=None, choices=[PENDING, REPLAYED])
+    rp = sub.add_parser("replay")
+    rp.add_argument("--parallel", type=int, default=DEADLETTER_REPLAY_PARALLEL, help="clients replayed at once")
+    rp.add_argument("--client", default=None, help="only this client email/name")
+    rp.add_argument("--limit", type=int, default=0, help="at most this many entries (0 = all)")
+    rp.add_argument("--dry-run", action="store_true")
+    pg = sub.add_parser("purge")
+    pg.add_argument("--older-than-days", type=float, default=7.0)
+    pg.add_argument("--status", default=REPLAYED, choices=[PENDING, REPLAYED])
+    args = ap.parse_args(argv)
+
+    store = DeadLetterStore(args.dir)
+    if args.cmd == "list":
+        for e in store.entries(args.status):
+            print(f"{e['id']}  {e['status']:<8} x{e['attempts']}  {e['client_email'] or e['client_name']:<30} "
+                  f"{e['proposed_title']!r} -> {e.get('bucket')}  [{e['stage']}] {(e.get('error') or '')[:80]}")
+        return
+    if args.cmd == "purge":
+        print(f"purged {store.purge(args.older_than_days, args.status)} entries")
+        return
+
+    entries = store.entries(PENDING)
+    if args.client:
+        want = args.client.strip().lower()
+        entries = [e for e in entries if want in (e["client_email"].lower(), e["client_name"].lower())]
+    if args.limit:
+        entries = entries[:args.limit]
+    if not entries:
+        print("nothing to replay")
+        return
+    _ok, failed = replay(store, entries, parallel=args.parallel, dry_run=args.dry_run)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,9 @@ from pathlib import Path
 from typing import Union, Optional
 
 from playwright.sync_api import Page, TimeoutError as PWTimeout
+from .classify import _ALLOWED_LABELS, classify_label
 from .helpers import _log
+from .ratelimit import throttle
 from .uploads import ensure_sample_pdf, wait_for_upload_processing_complete
 
 
@@ -100,6 +102,7 @@ def open_initial_documents_checklist(page: Page) -> None:
     """
     Click the 'Initial Document(s) Checklist' tab.
     """
+    throttle("navigate")
     for sel in (
         'text="Initial Document Checklist"',
         'text="Initial Documents Checklist"',
@@ -122,23 +125,25 @@ def open_initial_documents_checklist(page: Page) -> None:
 # --------------------------
 # Helpers for checklist flow
 # --------------------------
-_ALLOWED_LABELS = [
-    "Bank Statements",
-    "Vehicle Info",
-    "Income",
-    "Tax Returns",
-    "Lawsuits",
-    "Lease",
-    "Credit Cards",
-    "Utility",
-    "Credit Counseling Certificate",
-    "Home/Rent Information",
-    "Identification",
-    "Retirement & Insurance",
-    "Medical Bills",
-    "Client Forms",
-    "UnrecognizedDocs",
-]
+def _upload_display_name(upload: Union[str, Path, dict, list]) -> str:
+    """File name to wait for after set_files(); for a list, the last file chosen."""
+    if isinstance(upload, (list, tuple)):
+        upload = upload[-1]
+    if isinstance(upload, dict) and "name" in upload:
+        return upload["name"]
+    return Path(str(upload)).name
+
+
+def files_on_page(page: Page, names: list) -> set:
+    """Which of these file names the current page shows (checklist file cards); best-effort."""
+    present = set()
+    for name in names:
+        try:
+            if page.get_by_text(name, exact=True).count():
+                present.add(name)
+        except Exception:
+            pass
+    return present
 
 
 def _match_label_regex(label: str) -> re.Pattern:
@@ -151,42 +156,9 @@ def _match_label_regex(label: str) -> re.Pattern:
 def _infer_label_from_text(text: str) -> Optional[str]:
     """
     Guess a checklist bucket from a filename or line of text.
-    Mirrors the synonyms used elsewhere so we can match 'similar category' items.
+    Uses the shared classification engine so we can match 'similar category' items.
     """
-    t = (text or "").lower()
-
-    def has(*words):
-        return any(w in t for w in words)
-
-    if has("mortgage", "deed", "escrow", "landlord", "rent", "rental", "lease"):
-        return "Home/Rent Information" if "mortgage" in t else ("Lease" if "lease" in t else "Home/Rent Information")
-    if has("pay stub", "paystub", "payroll", "earnings", "w-2", "w2"):
-        return "Income"
-    if has("tax return", "return transcript", "1040", "irs", "1099", "k-1", "k1", "schedule a", "schedule c"):
-        return "Tax Returns"
-    if has("bank of", "chase", "wells", "boa", "bofa", "usbank", "nfcu", "statement") and not has("credit card", "mortgage", "lease", "rent"):
-        return "Bank Statements"
-    if has("credit card", "visa", "mastercard", "discover", "american express", "amex"):
-        return "Credit Cards"
-    if has("electric", "water", "gas", "internet", "phone", "cable", "utility", "xfinity", "verizon", "t-mobile", "spectrum", "comcast", "att", "at&t"):
-        return "Utility"
-    if has("title", "registration", "vin", "insurance card") and has("insurance"):
-        return "Vehicle Info"
-    if has("401k", "401(k)", "ira", "annuity", "life insurance", "pension", "retirement"):
-        return "Retirement & Insurance"
-    if has("driver", "license", "dl") or has("social security", "ssn", "ss card", "passport", "id card"):
-        return "Identification"
-    if has("medical", "hospital", "clinic", "er", "emergency", "doctor", "dental") and has("bill", "invoice", "statement"):
-        return "Medical Bills"
-    if has("complaint", "summons", "subpoena", "plaintiff v.", "vs.", "v. "):
-        return "Lawsuits"
-    if has("client information worksheet", "questionnaire", "rights & responsibilities", "lf90", "debtors 341", "341 questionnaire"):
-        return "Client Forms"
-    if has("credit counseling", "certificate of counseling"):
-        return "Credit Counseling Certificate"
-
-    # When in doubt, return None (caller decides).
-    return None
+    return classify_label(text, default=None)
 
 
 def _focus_label_then_tab_to_button_and_open(page: Page, label: str, tabs: int = 8, total_wait_ms: int = 15000) -> bool:
@@ -684,7 +656,7 @@ def _open_menu_and_select_upload_more(page: Page, container) -> bool:
     except Exception:
         return False
 
-def _try_upload_via_similar_category(page: Page, target_label: str, upload: Union[str, Path, dict]) -> bool:
+def _try_upload_via_similar_category(page: Page, target_label: str, upload: Union[str, Path, dict, list]) -> bool:
     """
     Scan visible file cards; if a file's text implies the same checklist category as `target_label`,
     open that section's small menu (TAB×2 flow), choose 'Upload more', and upload the file.
@@ -717,13 +689,10 @@ def _try_upload_via_similar_category(page: Page, target_label: str, upload: Unio
             try:
                 chooser = _open_menu_and_select_upload_more(page, container)
                 if chooser:
+                    throttle("upload")
                     chooser.set_files(upload)
                     try:
-                        if isinstance(upload, dict) and "name" in upload:
-                            fname = upload["name"]
-                        else:
-                            fname = Path(str(upload)).name
-                        wait_for_upload_processing_complete(page, filename=fname)
+                        wait_for_upload_processing_complete(page, filename=_upload_display_name(upload))
                     except Exception:
                         pass
                     _log(f'Uploaded file into matched section via existing item "{txt}" for bucket "{target_label}".')
@@ -736,7 +705,7 @@ def _try_upload_via_similar_category(page: Page, target_label: str, upload: Unio
     return False
 
 
-def _fallback_add_item_and_upload(page: Page, item_title: str, upload: Union[str, Path, dict]) -> None:
+def _fallback_add_item_and_upload(page: Page, item_title: str, upload: Union[str, Path, dict, list]) -> None:
     """
     Fallback when we can't find/open a labeled checklist section:
       - Click "Add an item"
@@ -889,19 +858,17 @@ def _fallback_add_item_and_upload(page: Page, item_title: str, upload: Union[str
             if up.count():
                 up.click()
         chooser = fc.value
+        throttle("upload")
         chooser.set_files(upload)
     except PWTimeout:
         file_input = page.locator('input[type="file"]').first
         if not file_input.count():
             raise RuntimeError("Upload file chooser did not appear and no direct file input was found.")
+        throttle("upload")
         file_input.set_input_files(upload)
 
     try:
-        if isinstance(upload, dict) and "name" in upload:
-            fname = upload["name"]
-        else:
-            fname = Path(str(upload)).name
-        wait_for_upload_processing_complete(page, filename=fname)
+        wait_for_upload_processing_complete(page, filename=_upload_display_name(upload))
     except Exception:
         pass
 
@@ -911,7 +878,7 @@ def _fallback_add_item_and_upload(page: Page, item_title: str, upload: Union[str
 def add_document_and_upload(
     page: Page,
     doc_title: str,           # Here, this is the *checklist label* to target.
-    upload: Union[str, Path, dict],
+    upload: Union[str, Path, dict, list],
 ) -> None:
     """
     Preferred flow:
@@ -935,13 +902,10 @@ def add_document_and_upload(
             with page.expect_file_chooser(timeout=6000) as fc:
                 _click_upload_more_files(page)
             chooser = fc.value
+            throttle("upload")
             chooser.set_files(upload)
             try:
-                if isinstance(upload, dict) and "name" in upload:
-                    fname = upload["name"]
-                else:
-                    fname = Path(str(upload)).name
-                wait_for_upload_processing_complete(page, filename=fname)
+                wait_for_upload_processing_complete(page, filename=_upload_display_name(upload))
             except Exception:
                 pass
             _log(f'Uploaded file into checklist bucket "{checklist_label}" via Upload button.')
@@ -0,0 +1,128 @@
+# glade/extract.py
+import importlib.util
+import re
+from typing import Optional, Sequence
+
+from .config import PDF_TEXT_BACKENDS, PDF_TEXT_MIN_CHARS
+from .log import _log
+
+
+class TextBackend:
+    """
+    One PDF text engine. extract() receives a PdfDocument so engines can keep their parsed
+    handle on it (see PdfDocument.handle) and parse each source at most once.
+    """
+    name = ""
+    module = ""
+
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    def page_count(self, doc) -> int:
+        return doc.page_count
+
+    def extract(self, doc, index: int) -> str:
+        raise NotImplementedError
+
+
+class PyPDF2Backend(TextBackend):
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def extract(self, doc, index: int) -> str:
+        return doc.reader.pages[index].extract_text() or ""
+
+
+class PdfiumBackend(TextBackend):
+    """pypdfium2 (PDFium): much faster than PyPDF2 and better on multi-column statements."""
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def _open(self, doc):
+        import pypdfium2 as pdfium
+        return doc.handle(self.name, lambda: pdfium.PdfDocument(doc.path))
+
+    def page_count(self, doc) -> int:
+        return len(self._open(doc))
+
+    def extract(self, doc, index: int) -> str:
+        page = self._open(doc)[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range() or ""
+        finally:
+            textpage.close()
+            page.close()
+
+
+class PyMuPDFBackend(TextBackend):
+    name = "pymupdf"
+    module = "fitz"
+
+    def _open(self, doc):
+        import fitz
+        return doc.handle(self.name, lambda: fitz.open(doc.path))
+
+    def page_count(self, doc) -> int:
+        return self._open(doc).page_count
+
+    def extract(self, doc, index: int) -> str:
+        return self._open(doc)[index].get_text() or ""
+
+
+class PdfminerBackend(TextBackend):
+    """pdfminer.six: slowest, but recovers text from awkward layouts the others miss."""
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def extract(self, doc, index: int) -> str:
+        from pdfminer.high_level import extract_text
+        return extract_text(doc.path, page_numbers=[index]) or ""
+
+
+BACKENDS: dict[str, TextBackend] = {
+    b.name: b for b in (PdfiumBackend(), PyMuPDFBackend(), PyPDF2Backend(), PdfminerBackend())
+}
+
+
+def available_backends(names: Optional[Sequence[str]] = None) -> list[TextBackend]:
+    """Installed backends, in the requested order (default: PDF_TEXT_BACKENDS)."""
+    out = []
+    for n in (names or PDF_TEXT_BACKENDS):
+        b = BACKENDS.get(n.strip().lower())
+        if b is not None and b.available():
+            out.append(b)
+    if not out:
+        out.append(BACKENDS["pypdf2"])
+    return out
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def extract_page_text(
+    doc,
+    index: int = 0,
+    backends: Optional[Sequence[str]] = None,
+    min_chars: int = PDF_TEXT_MIN_CHARS,
+) -> tuple[str, Optional[str]]:
+    """
+    Return (normalized_text, backend_name) for one page.
+
+    Backends are tried in order; the first result with at least `min_chars` characters wins.
+    If none reaches the threshold the longest result is returned. A backend that raises is
+    skipped so one broken engine never fails the document.
+    """
+    best, best_name = "", None
+    for backend in available_backends(backends):
+        try:
+            text = _normalize(backend.extract(doc, index))
+        except Exception as e:
+            _log(f"text backend {backend.name} failed on page {index + 1}: {e}")
+            continue
+        if len(text) >= min_chars:
+            return text, backend.name
+        if len(text) > len(best) or best_name is None:
+            best, best_name = text, backend.name
+    return best, best_name
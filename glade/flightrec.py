@@ -0,0 +1,201 @@
+# glade/flightrec.py
+import json
+import os
+import random
+import re
+import shutil
+import time
+import uuid
+from collections import deque
+from typing import Optional
+
+from .config import (
+    FLIGHT_ARTIFACT_DIR,
+    FLIGHT_MAX_EVENTS,
+    FLIGHT_MAX_JOBS,
+    FLIGHT_RETENTION_HOURS,
+    FLIGHT_SAMPLE_SUCCESS,
+    FLIGHT_TRACE,
+)
+from .log import _log
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class FlightRecorder:
+    """
+    Per-job black box for one browser context.
+
+    Console messages, network responses/failures and step marks go into a bounded ring buffer
+    (`max_events`). The Playwright trace is recorded in chunks that roll over at every mark(),
+    so at most the current step's trace is held. Nothing touches the disk unless finish() is
+    called with ok=False (or the job is picked by `sample_success`); then trace.zip, a
+    screenshot, events.jsonl and meta.json are written to <root>/<job_id>/.
+    """
+
+    def __init__(self, job_id: Optional[str] = None, aliases: tuple = (), root: str = FLIGHT_ARTIFACT_DIR,
+                 max_events: int = FLIGHT_MAX_EVENTS, sample_success: float = FLIGHT_SAMPLE_SUCCESS,
+                 trace: bool = FLIGHT_TRACE):
+        self.job_id = job_id or new_job_id()
+        self.aliases = tuple(a for a in aliases if a and a != self.job_id)
+        self.root = root
+        self.sample_success = sample_success
+        self.trace = trace
+        self.events: deque = deque(maxlen=max(1, max_events))
+        self.started = time.time()
+        self._context = None
+        self._tracing = False
+        self._page = None
+
+    # ---- capture ----
+    def attach(self, context) -> None:
+        self._context = context
+        try:
+            context.on("page", self._watch_page)
+            context.on("response", self._on_response)
+            context.on("requestfailed", self._on_request_failed)
+            for page in context.pages:
+                self._watch_page(page)
+        except Exception as e:
+            _log(f"flight recorder: could not subscribe to events: {e}")
+        if self.trace:
+            try:
+                context.tracing.start(screenshots=True, snapshots=True)
+                context.tracing.start_chunk(title="start")
+                self._tracing = True
+            except Exception as e:
+                _log(f"flight recorder: tracing unavailable: {e}")
+
+    def _watch_page(self, page) -> None:
+        self._page = page
+        page.on("console", lambda msg: self.note("console", type=msg.type, text=msg.text[:2000]))
+        page.on("pageerror", lambda err: self.note("pageerror", text=str(err)[:2000]))
+
+    def _on_response(self, response) -> None:
+        try:
+            self.note("response", status=response.status, method=response.request.method, url=response.url[:500])
+        except Exception:
+            pass
+
+    def _on_request_failed(self, request) -> None:
+        try:
+            self.note("requestfailed", method=request.method, url=request.url[:500], error=request.failure)
+        except Exception:
+            pass
+
+    def note(self, kind: str, **data) -> None:
+        self.events.append({"t": round(time.time() - self.started, 3), "kind": kind, **data})
+
+    def mark(self, step: str, **info) -> None:
+        """Record a step boundary; the trace chunk of the previous step is dropped."""
+        self.note("step", step=step, **info)
+        if self._tracing:
+            try:
+                self._context.tracing.stop_chunk()
+                self._context.tracing.start_chunk(title=step)
+            except Exception:
+                pass
+
+    # ---- persist ----
+    def finish(self, ok: bool, error: Optional[str] = None, page=None, meta: Optional[dict] = None) -> Optional[str]:
+        """Persist artifacts on failure (or sampled success); returns the artifact folder if written."""
+        keep = not ok or (self.sample_success > 0 and random.random() < self.sample_success)
+        if not keep:
+            self._stop_trace(None)
+            return None
+        folder = os.path.join(self.root, self.job_id)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            self._stop_trace(os.path.join(folder, "trace.zip"))
+            page = page or self._page
+            if page is not None and not ok:
+                try:
+                    page.screenshot(path=os.path.join(folder, "failure.png"), timeout=5000)
+                except Exception:
+                    pass
+            with open(os.path.join(folder, "events.jsonl"), "w", encoding="utf-8") as f:
+                for ev in self.events:
+                    f.write(json.dumps(ev, default=str) + "\n")
+            with open(os.path.join(folder, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"job_id": self.job_id, "aliases": list(self.aliases), "ok": ok, "error": error,
+                           "started": self.started, "finished": time.time(), **(meta or {})},
+                          f, indent=2, default=str)
+            for alias in self.aliases:
+                with open(os.path.join(self.root, f"{alias}.ref"), "w", encoding="utf-8") as f:
+                    f.write(self.job_id)
+            _log(f"flight recorder: saved artifacts for job {self.job_id} ({'ok' if ok else 'failed'})")
+        except Exception as e:
+            _log(f"flight recorder: could not persist artifacts: {e}")
+            return None
+        prune(self.root)
+        return folder
+
+    def _stop_trace(self, path: Optional[str]) -> None:
+        if not self._tracing:
+            return
+        self._tracing = False
+        try:
+            if path:
+                self._context.tracing.stop_chunk(path=path)
+            self._context.tracing.stop()
+        except Exception:
+            pass
+
+
+def artifact_dir(job_id: str, root: str = FLIGHT_ARTIFACT_DIR) -> Optional[str]:
+    """Folder holding a job's artifacts (following aliases of batched jobs), or None."""
+    if not _JOB_ID.match(job_id or ""):
+        return None
+    folder = os.path.join(root, job_id)
+    if os.path.isdir(folder):
+        return folder
+    try:
+        with open(os.path.join(root, f"{job_id}.ref"), encoding="utf-8") as f:
+            target = f.read().strip()
+    except OSError:
+        return None
+    return artifact_dir(target, root) if target != job_id else None
+
+
+def list_artifacts(job_id: str, root: str = FLIGHT_ARTIFACT_DIR) -> list[dict]:
+    folder = artifact_dir(job_id, root)
+    if folder is None:
+        return []
+    return [{"name": n, "bytes": os.path.getsize(os.path.join(folder, n))} for n in sorted(os.listdir(folder))]
+
+
+def prune(root: str = FLIGHT_ARTIFACT_DIR, retention_hours: float = FLIGHT_RETENTION_HOURS,
+          max_jobs: int = FLIGHT_MAX_JOBS) -> int:
+    """Drop artifact folders older than `retention_hours`, then the oldest beyond `max_jobs`."""
+    try:
+        entries = [(e.stat().st_mtime, e.path, e.is_dir()) for e in os.scandir(root)]
+    except OSError:
+        return 0
+    cutoff = time.time() - retention_hours * 3600
+    folders = sorted((m, p) for m, p, d in entries if d)
+    doomed = [p for m, p in folders if m < cutoff]
+    live = [p for m, p in folders if m >= cutoff]
+    if max_jobs > 0 and len(live) > max_jobs:
+        doomed += live[:len(live) - max_jobs]
+    for path in doomed:
+        shutil.rmtree(path, ignore_errors=True)
+    # aliases pointing at removed folders
+    for m, path, d in entries:
+        if not d and path.endswith(".ref") and (m < cutoff or not _ref_alive(path, root)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return len(doomed)
+
+
+def _ref_alive(path: str, root: str) -> bool:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return os.path.isdir(os.path.join(root, f.read().strip()))
+    except OSError:
+        return False
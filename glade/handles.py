@@ -0,0 +1,235 @@
+# glade/handles.py
+import atexit
+import hashlib
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import BinaryIO, Optional, Tuple
+
+from .config import WORKSPACE_ROOT, WORKSPACE_QUOTA_MB, WORKSPACE_MIN_FREE_MB, WORKSPACE_STALE_SECONDS
+
+_CHUNK = 1 << 20
+
+
+class WorkspaceQuotaExceeded(RuntimeError):
+    pass
+
+
+def _default_root() -> str:
+    if WORKSPACE_ROOT:
+        return WORKSPACE_ROOT
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return os.path.join(shm, "glade")
+    return os.path.join(tempfile.gettempdir(), "glade")
+
+
+def safe_filename(name: str, default: str = "upload.bin") -> str:
+    name = os.path.basename((name or "").replace("\\", "/"))
+    name = re.sub(r'[\x00-\x1f\\/:*?"<>|]+', "", name).strip(" .")
+    return name[:180] or default
+
+
+class DocumentHandle:
+    """
+    A document as a path on disk plus a lazily mmap'd read-only view.
+
+    The handle is what flows from ingestion through conversion, naming and the browser upload
+    (which is given the path), so the bytes are never held as Python objects in between.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None, mime: Optional[str] = None):
+        self.path = os.path.abspath(path)
+        self.name = name or os.path.basename(path)
+        self.mime = mime
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._sha256: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"DocumentHandle({self.path!r})"
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    @property
+    def view(self) -> memoryview:
+        """Read-only memoryview over the file (mapped on first access)."""
+        if self.size == 0:
+            return memoryview(b"")      # mmap can't map an empty file; nothing to open
+        if self._mmap is None:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def head(self, n: int = 16) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read(n)
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            h = hashlib.sha256()
+            view = self.view
+            for i in range(0, len(view), _CHUNK):
+                h.update(view[i:i + _CHUNK])
+            view.release()
+            self._sha256 = h.hexdigest()
+        return self._sha256
+
+    def link_as(self, filename: str, directory: Optional[str] = None) -> "DocumentHandle":
+        """Same bytes under another name (hard link; copy across filesystems)."""
+        directory = directory or os.path.join(os.path.dirname(self.path), f"as_{uuid.uuid4().hex[:8]}")
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, safe_filename(filename))
+        try:
+            os.link(self.path, target)
+        except OSError:
+            shutil.copyfile(self.path, target)
+        return DocumentHandle(target, name=os.path.basename(target), mime=self.mime)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # a caller still holds a view; the map closes when it is released
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Workspace:
+    """
+    Per-request temp directory, on tmpfs when available, with a byte quota and guaranteed
+    cleanup (context manager, atexit, and a startup sweep of directories left by crashed
+    processes).
+    """
+
+    _live: "set[str]" = set()
+    _live_lock = threading.Lock()
+
+    def __init__(self, prefix: str = "ingest_", quota_bytes: Optional[int] = None, root: Optional[str] = None):
+        self.root = root or _default_root()
+        os.makedirs(self.root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=prefix, dir=self.root)
+        self.quota_bytes = quota_bytes if quota_bytes is not None else WORKSPACE_QUOTA_MB * 1024 * 1024
+        self._handles: list = []
+        with Workspace._live_lock:
+            Workspace._live.add(self.path)
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+    # ---- accounting ----
+    def used_bytes(self) -> int:
+        total = 0
+        for dirpath, _, files in os.walk(self.path):
+            for f in files:
+                try:
+                    total += os.lstat(os.path.join(dirpath, f)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def check_quota(self, extra: int = 0) -> None:
+        used = self.used_bytes() + extra
+        if used > self.quota_bytes:
+            raise WorkspaceQuotaExceeded(f"workspace quota exceeded ({used} > {self.quota_bytes} bytes)")
+        free = shutil.disk_usage(self.root).free
+        if free - extra < WORKSPACE_MIN_FREE_MB * 1024 * 1024:
+            raise WorkspaceQuotaExceeded(f"workspace filesystem low on space ({free} bytes free)")
+
+    # ---- files ----
+    def new_path(self, name: str) -> str:
+        return os.path.join(self.path, safe_filename(name))
+
+    def _track(self, handle: DocumentHandle) -> DocumentHandle:
+        self._handles.append(handle)
+        return handle
+
+    def handle(self, path: str, name: Optional[str] = None, mime: Optional[str] = None) -> DocumentHandle:
+        return self._track(DocumentHandle(path, name=name, mime=mime))
+
+    def write_stream(self, name: str, src: BinaryIO, mime: Optional[str] = None) -> DocumentHandle:
+        """Copy a file-like object into the workspace in chunks, enforcing the quota as it goes."""
+        path = self.new_path(name)
+        budget = self.quota_bytes - self.used_bytes()
+        written = 0
+        with open(path, "wb") as out:
+            for chunk in iter(lambda: src.read(_CHUNK), b""):
+                written += len(chunk)
+                if written > budget:
+                    raise WorkspaceQuotaExceeded(f"input exceeds workspace quota ({self.quota_bytes} bytes)")
+                out.write(chunk)
+        return self.handle(path, name=name, mime=mime)
+
+    def download(self, url: str, name: str, timeout: int = 60) -> Tuple[DocumentHandle, Optional[str]]:
+        """Stream a URL straight to disk; returns (handle, content-type)."""
+        import httpx
+
+        path = self.new_path(name)
+        budget = self.quota_bytes - self.used_bytes()
+        written = 0
+        with httpx.Client(follow_redirects=True, timeout=timeout) as client:
+            with client.stream("GET", url) as r:
+                r.raise_for_status()
+                ctype = r.headers.get("content-type")
+                declared = int(r.headers.get("content-length") or 0)
+                if declared > budget:
+                    raise WorkspaceQuotaExceeded(f"download exceeds workspace quota ({declared} bytes)")
+                with open(path, "wb") as out:
+                    for chunk in r.iter_bytes(_CHUNK):
+                        written += len(chunk)
+                        if written > budget:
+                            raise WorkspaceQuotaExceeded(f"download exceeds workspace quota ({self.quota_bytes} bytes)")
+                        out.write(chunk)
+        return self.handle(path, name=name, mime=ctype), ctype
+
+    def cleanup(self) -> None:
+        for h in self._handles:
+            try:
+                h.close()
+            except Exception:
+                pass
+        self._handles.clear()
+        shutil.rmtree(self.path, ignore_errors=True)
+        with Workspace._live_lock:
+            Workspace._live.discard(self.path)
+
+
+def sweep_stale_workspaces(root: Optional[str] = None, max_age: int = WORKSPACE_STALE_SECONDS) -> int:
+    """Remove workspace dirs older than `max_age` that no live Workspace owns."""
+    root = root or _default_root()
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age
+    with Workspace._live_lock:
+        live = set(Workspace._live)
+    for entry in os.scandir(root):
+        try:
+            if entry.is_dir() and entry.path not in live and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+@atexit.register
+def _cleanup_live_workspaces() -> None:
+    with Workspace._live_lock:
+        paths = list(Workspace._live)
+    for p in paths:
+        shutil.rmtree(p, ignore_errors=True)
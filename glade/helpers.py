@@ -2,8 +2,7 @@ import re
 import time
 from playwright.sync_api import Page, TimeoutError as PWTimeout
 
-def _log(msg: str) -> None:
-    print(f"[glade] {msg}")
+from .log import _log  # noqa: F401  (re-exported for the browser-side modules)
 
 def _try_click_first_match(page: Page, name_pat: re.Pattern) -> bool:
     candidates = [
@@ -0,0 +1,79 @@
+# glade/idempotency.py
+import hashlib
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from .config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_REPLAY_FAILURES
+
+
+def derive_key(*parts: Optional[str]) -> str:
+    """Stable key from request identity, e.g. (client_email, file sha256 or URL, doc_name)."""
+    norm = [(p or "").strip().lower() for p in parts]
+    return "derived:" + hashlib.sha256("\0".join(norm).encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("done", "result", "expires")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.expires = 0.0
+
+
+class IdempotencyStore:
+    """
+    In-process idempotency table for webhook retries.
+
+    The first request for a key owns the job; concurrent duplicates block on its Event and get
+    the same result. Completed results are replayed for `ttl` seconds. Unsuccessful results
+    are handed to waiting duplicates but not kept (unless replay_failures), so a later retry
+    runs the job again.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, replay_failures: bool = IDEMPOTENCY_REPLAY_FAILURES):
+        self.ttl = ttl
+        self.replay_failures = replay_failures
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.replayed = 0
+        self.attached = 0
+
+    def _purge(self, now: float) -> None:
+        for k in [k for k, e in self._entries.items() if e.done.is_set() and e.expires <= now]:
+            del self._entries[k]
+
+    def begin(self, key: str) -> Tuple[_Entry, bool]:
+        """(entry, owner). Non-owners should wait() on the entry instead of running the job."""
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.done.is_set():
+                    self.replayed += 1
+                else:
+                    self.attached += 1
+                return entry, False
+            entry = self._entries[key] = _Entry()
+            return entry, True
+
+    def complete(self, key: str, entry: _Entry, result: Any, ok: bool = True) -> None:
+        with self._lock:
+            entry.result = result
+            entry.expires = time.time() + self.ttl
+            if not ok and not self.replay_failures and self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    @staticmethod
+    def wait(entry: _Entry, timeout: Optional[float] = None) -> Optional[Any]:
+        """The owner's result, or None if it did not finish within `timeout`."""
+        return entry.result if entry.done.wait(timeout) else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = sum(1 for e in self._entries.values() if not e.done.is_set())
+            return {"keys": len(self._entries), "in_flight": in_flight,
+                    "replayed": self.replayed, "attached": self.attached}
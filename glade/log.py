@@ -0,0 +1,7 @@
+# glade/log.py
+# Dependency-free logging, so pool workers and other non-browser modules can log
+# without importing Playwright through glade.helpers.
+
+
+def _log(msg: str) -> None:
+    print(f"[glade] {msg}")
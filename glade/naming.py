@@ -0,0 +1,145 @@
+# glade/naming.py
+import asyncio
+import hashlib
+import re
+import threading
+from typing import Optional
+
+from .log import _log
+from .ratelimit import TokenBucket
+
+FALLBACK_TITLE = "UnrecognizableDoc"
+
+
+def _clean_title(raw: str) -> str:
+    title = re.sub(r"[\r\n]+", " ", (raw or "").strip()).strip()
+    title = re.sub(r"[.:\-;,\s]+$", "", title).strip()
+    return title[:120] or FALLBACK_TITLE
+
+
+class NamingService:
+    """
+    Async document naming against OpenAI.
+
+    One AsyncOpenAI client is shared by every caller. Calls are paced by a requests-per-minute
+    and a tokens-per-minute bucket, capped at `max_in_flight` concurrent requests, and identical
+    concurrent requests (same model + text) are coalesced onto a single API call.
+
+    Sync callers (FastAPI's threadpool, CLIs) use name_sync(), which runs the coroutine on a
+    private event loop thread owned by the service.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        prompt: str,
+        rpm: int = 500,
+        tpm: int = 200_000,
+        max_in_flight: int = 8,
+        max_completion_tokens: int = 2000,
+        timeout: float = 60.0,
+        client=None,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.prompt = prompt
+        self.max_completion_tokens = max_completion_tokens
+        self.timeout = timeout
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.requests = TokenBucket.per_minute(rpm)
+        self.tokens = TokenBucket.per_minute(tpm)
+
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self.in_flight = 0
+        self.coalesced = 0
+
+    # ---- client / loop ----
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import AsyncOpenAI
+                    self._client = AsyncOpenAI(api_key=self.api_key, timeout=self.timeout)
+        return self._client
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    t = threading.Thread(target=loop.run_forever, name="naming-loop", daemon=True)
+                    t.start()
+                    self._loop = loop
+        return self._loop
+
+    def _estimate_tokens(self, text: str) -> int:
+        # OpenAI counts prompt tokens plus the completion budget against TPM; ~4 chars per token.
+        return (len(self.prompt) + len(text)) // 4 + self.max_completion_tokens
+
+    # ---- naming ----
+    async def name(self, text: str) -> str:
+        """Return a proposed filename for `text`; identical concurrent requests share one call."""
+        key = hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+        fut = self._pending.get(key)
+        if fut is not None:
+            self.coalesced += 1
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[key] = fut
+        try:
+            title = await self._call(text)
+            fut.set_result(title)
+        except BaseException as e:
+            fut.set_exception(e)
+            # Mark retrieved so an exception with no coalesced waiters isn't logged as unhandled.
+            fut.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+        return title
+
+    async def _call(self, text: str) -> str:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_in_flight)
+        async with self._sem:
+            waited = await self.requests.acquire_async(1)
+            waited += await self.tokens.acquire_async(self._estimate_tokens(text))
+            if waited > 0.05:
+                _log(f"naming throttled {waited:.2f}s by rate limits")
+            self.in_flight += 1
+            try:
+                # Newer models require max_completion_tokens instead of max_tokens
+                resp = await self._get_client().chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "You name legal intake documents succinctly."},
+                        {"role": "user", "content": f"{self.prompt}\n\nFirst page text:\n{text}\n"},
+                    ],
+                    temperature=1.0,
+                    max_completion_tokens=self.max_completion_tokens,
+                )
+            finally:
+                self.in_flight -= 1
+        return _clean_title(resp.choices[0].message.content or "")
+
+    def name_sync(self, text: str, timeout: Optional[float] = None) -> str:
+        """Blocking wrapper for threads that are not running an event loop."""
+        fut = asyncio.run_coroutine_threadsafe(self.name(text), self._get_loop())
+        return fut.result(timeout=timeout if timeout is not None else self.timeout * 2)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "pending_keys": len(self._pending),
+            "coalesced": self.coalesced,
+            "request_tokens_available": round(self.requests.available(), 2),
+            "tpm_tokens_available": round(self.tokens.available(), 2),
+        }
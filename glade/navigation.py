@@ -3,9 +3,11 @@ import re, time
 from playwright.sync_api import Page
 from .config import WORKFLOW_URL
 from .helpers import _log, _scroll_list
+from .ratelimit import throttle
 
 
 def open_workflows(page: Page) -> None:
+    throttle("navigate")
     page.goto(WORKFLOW_URL, wait_until="domcontentloaded")
     try:
         page.wait_for_load_state("networkidle", timeout=5000)
@@ -58,6 +60,7 @@ def _type_in_search(page: Page, text: str, delay: int = 12):
             break
     if not search:
         return None
+    throttle("search")
     try:
         search.click()
         try:
@@ -260,6 +263,7 @@ def open_documents_and_discussion_then_documents(page: Page) -> None:
     No selector scanning; this matches the requested interaction.
     """
     _wait_for_client_view(page, timeout_ms=9000)
+    throttle("navigate")
 
     # Ensure the document area has focusable context
     try:
@@ -0,0 +1,105 @@
+# glade/ocr.py
+import importlib.util
+import io
+from typing import Optional
+
+from .config import OCR_ENABLED, OCR_MAX_DIM, OCR_LANG, OCR_TIMEOUT, PAGE_CACHE_DIR
+from .log import _log
+from .pagecache import PageTextCache, file_sha256, page_key
+from .workers import run_in_pool
+
+page_cache = PageTextCache(directory=PAGE_CACHE_DIR or None)
+
+
+def ocr_available() -> bool:
+    return (
+        OCR_ENABLED
+        and importlib.util.find_spec("pytesseract") is not None
+        and importlib.util.find_spec("PIL") is not None
+    )
+
+
+def _page_image(pdf_path: str, index: int, max_dim: int):
+    """
+    Page `index` as a PIL image no larger than `max_dim` on its long edge.
+    Renders with pypdfium2 when installed, else pulls the largest embedded image via PyPDF2
+    (enough for scans and our own image->PDF conversions).
+    """
+    from PIL import Image
+
+    img = None
+    if importlib.util.find_spec("pypdfium2") is not None:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page = pdf[index]
+            w, h = page.get_size()  # points
+            scale = min(300 / 72.0, max_dim / max(w, h, 1))
+            img = page.render(scale=scale, grayscale=True).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+    else:
+        from PyPDF2 import PdfReader
+        page = PdfReader(pdf_path).pages[index]
+        best = None
+        for im in page.images:
+            if best is None or len(im.data) > len(best.data):
+                best = im
+        if best is not None:
+            img = Image.open(io.BytesIO(best.data))
+
+    if img is None:
+        return None
+    img = img.convert("L")
+    if max(img.size) > max_dim:
+        img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+    return img
+
+
+def _ocr_pdf_page(pdf_path: str, index: int, max_dim: int, lang: str) -> str:
+    """Worker-process entry point: render/downscale one page and OCR it."""
+    import pytesseract
+
+    img = _page_image(pdf_path, index, max_dim)
+    if img is None:
+        return ""
+    return pytesseract.image_to_string(img, lang=lang) or ""
+
+
+def ocr_page_text(pdf_path: str, index: int = 0, content_hash: Optional[str] = None) -> str:
+    """
+    OCR one page in the shared conversion pool. Results are cached by (file content hash, page),
+    so re-processing the same scan never re-runs tesseract.
+    """
+    if not ocr_available():
+        return ""
+    key = page_key(content_hash or file_sha256(pdf_path), index, kind="ocr")
+    cached = page_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        raw = run_in_pool(_ocr_pdf_page, pdf_path, index, OCR_MAX_DIM, OCR_LANG, timeout=OCR_TIMEOUT)
+    except Exception as e:
+        _log(f"OCR failed on page {index + 1}: {e}")
+        return ""
+    from .extract import _normalize
+    text = _normalize(raw)
+    page_cache.put(key, text)
+    _log(f"OCR extracted {len(text)} chars from page {index + 1}")
+    return text
+
+
+def ensure_page_text(doc, index: int = 0, min_chars: int = 20, content_hash: Optional[str] = None) -> str:
+    """
+    Page text from the text layer, falling back to OCR when the layer is shorter than
+    `min_chars`. An OCR result replaces the cached text on the PdfDocument.
+    """
+    text = doc.page_text(index)
+    if len(text) >= min_chars or not ocr_available():
+        return text
+    ocr_text = ocr_page_text(doc.path, index, content_hash=content_hash)
+    if len(ocr_text) > len(text):
+        doc.set_page_text(index, ocr_text, "ocr")
+        return ocr_text
+    return text
@@ -0,0 +1,266 @@
+# glade/office.py
+import atexit
+import os
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xmlrpc.client
+from pathlib import Path
+from typing import Optional
+
+from .config import (
+    OFFICE_CONVERTER, OFFICE_WORKERS, OFFICE_BASE_PORT, OFFICE_TIMEOUT, OFFICE_START_TIMEOUT,
+    OFFICE_QUEUE_TIMEOUT, OFFICE_JOBS_PER_INSTANCE, SOFFICE_BIN, UNOSERVER_BIN,
+)
+from .log import _log
+
+OFFICE_EXTS = (".doc", ".docx", ".xls", ".xlsx", ".odt", ".ods", ".rtf")
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        conn = super().make_connection(host)
+        conn.timeout = self.timeout
+        return conn
+
+
+def _port_open(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+class OfficeInstance:
+    """
+    One long-lived `unoserver` (headless LibreOffice + XML-RPC listener) on a local port,
+    with its own profile directory so several instances can run side by side.
+    """
+
+    def __init__(self, port: int):
+        self.port = port
+        self.uno_port = port + 1000
+        self.profile = Path(tempfile.gettempdir(), f"glade-office-{port}")
+        self.proc: Optional[subprocess.Popen] = None
+        self.jobs = 0
+        self.restarts = 0
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self) -> None:
+        cmd = [
+            UNOSERVER_BIN,
+            "--interface", "127.0.0.1",
+            "--port", str(self.port),
+            "--uno-port", str(self.uno_port),
+            "--user-installation", self.profile.as_uri(),
+        ]
+        kwargs = {}
+        if os.name == "posix":
+            kwargs["start_new_session"] = True  # so stop() can kill soffice with it
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
+        deadline = time.monotonic() + OFFICE_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"unoserver on port {self.port} exited with {self.proc.returncode}")
+            if _port_open(self.port):
+                self.jobs = 0
+                _log(f"office converter ready on port {self.port}")
+                return
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"unoserver on port {self.port} did not start within {OFFICE_START_TIMEOUT}s")
+
+    def stop(self) -> None:
+        proc, self.proc = self.proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+            proc.wait(timeout=10)
+        except Exception:
+            try:
+                if os.name == "posix":
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+            except Exception:
+                pass
+
+    def restart(self) -> None:
+        self.restarts += 1
+        self.stop()
+        self.start()
+
+    def convert(self, src_path: str, out_pdf: str, timeout: float) -> None:
+        if not self.alive():
+            self.restart()
+        proxy = xmlrpc.client.ServerProxy(
+            f"http://127.0.0.1:{self.port}", allow_none=True, transport=_TimeoutTransport(timeout)
+        )
+        # unoserver: convert(inpath, indata, outpath, convert_to, filtername, ...)
+        proxy.convert(os.path.abspath(src_path), None, os.path.abspath(out_pdf), "pdf", None)
+        self.jobs += 1
+
+
+class OfficeConverterPool:
+    """
+    Warm pool of OfficeInstance processes behind a queue.
+
+    A job waits up to OFFICE_QUEUE_TIMEOUT for an idle instance, then gets OFFICE_TIMEOUT to
+    convert. An instance that crashed, timed out or errored is restarted before it goes back
+    in the queue; healthy ones are recycled after OFFICE_JOBS_PER_INSTANCE jobs.
+    """
+
+    def __init__(self, size: int = OFFICE_WORKERS, base_port: int = OFFICE_BASE_PORT):
+        self.size = max(1, size)
+        self.instances = [OfficeInstance(base_port + i) for i in range(self.size)]
+        self._idle: "queue.Queue[OfficeInstance]" = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            try:
+                for inst in self.instances:
+                    inst.start()
+                    self._idle.put(inst)
+            except Exception:
+                # Don't leak the instances that did come up; the next start() begins clean
+                self.stop()
+                while not self._idle.empty():
+                    self._idle.get_nowait()
+                raise
+            self._started = True
+            atexit.register(self.stop)
+
+    def stop(self) -> None:
+        for inst in self.instances:
+            inst.stop()
+
+    def convert(self, src_path: str, out_pdf: str, timeout: float = OFFICE_TIMEOUT) -> None:
+        self.start()
+        with self._lock:
+            self.waiting += 1
+        try:
+            inst = self._idle.get(timeout=OFFICE_QUEUE_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError("office converter queue timed out")
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        healthy = False
+        try:
+            inst.convert(src_path, out_pdf, timeout)
+            healthy = os.path.exists(out_pdf)
+            if not healthy:
+                raise RuntimeError("office conversion produced no output PDF")
+            with self._lock:
+                self.completed += 1
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            try:
+                if not healthy or not inst.alive() or inst.jobs >= OFFICE_JOBS_PER_INSTANCE:
+                    inst.restart()
+            except Exception as e:
+                _log(f"office converter restart failed on port {inst.port}: {e}")
+            self._idle.put(inst)
+
+    def stats(self) -> dict:
+        return {
+            "instances": self.size,
+            "idle": self._idle.qsize(),
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": sum(i.restarts for i in self.instances),
+        }
+
+
+def cold_convert(src_path: str, out_pdf: str, timeout: float = OFFICE_TIMEOUT) -> None:
+    """One-shot `soffice --convert-to pdf` with a throwaway profile (the slow path)."""
+    outdir = tempfile.mkdtemp(prefix="soffice_out_")
+    profile = tempfile.mkdtemp(prefix="soffice_profile_")
+    try:
+        cmd = [
+            SOFFICE_BIN, "--headless", "--norestore",
+            f"-env:UserInstallation={Path(profile).as_uri()}",
+            "--convert-to", "pdf", "--outdir", outdir, os.path.abspath(src_path),
+        ]
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout, check=False)
+        produced = Path(outdir, Path(src_path).stem + ".pdf")
+        if not produced.exists():
+            raise RuntimeError("soffice conversion produced no output PDF")
+        shutil.move(str(produced), out_pdf)
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+        shutil.rmtree(profile, ignore_errors=True)
+
+
+_pool: Optional[OfficeConverterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_office_pool() -> OfficeConverterPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OfficeConverterPool()
+    return _pool
+
+
+def _backend() -> str:
+    if OFFICE_CONVERTER != "auto":
+        return OFFICE_CONVERTER
+    if sys.platform.startswith("win"):
+        return "docx2pdf"
+    if shutil.which(UNOSERVER_BIN):
+        return "warm"
+    return "cold"
+
+
+def office_to_pdf(src_path: str, out_pdf: str, timeout: float = OFFICE_TIMEOUT) -> str:
+    backend = _backend()
+    ext = os.path.splitext(src_path)[1].lower()
+    t0 = time.perf_counter()
+    if backend == "docx2pdf" and ext in (".doc", ".docx"):
+        try:
+            from docx2pdf import convert as docx2pdf_convert
+        except Exception:
+            raise RuntimeError("docx2pdf not available (requires MS Word on Windows).")
+        docx2pdf_convert(src_path, out_pdf)
+    elif backend == "warm":
+        get_office_pool().convert(src_path, out_pdf, timeout=timeout)
+    else:
+        if not shutil.which(SOFFICE_BIN):
+            raise RuntimeError(f"No office converter available for {ext} (install LibreOffice or unoserver).")
+        cold_convert(src_path, out_pdf, timeout=timeout)
+    if not os.path.exists(out_pdf):
+        raise RuntimeError("Office convert failed (no output PDF).")
+    _log(f"office->PDF via {backend} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return out_pdf
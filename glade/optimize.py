@@ -0,0 +1,151 @@
+# glade/optimize.py
+import hashlib
+import importlib.util
+import io
+import os
+import shutil
+import time
+from typing import Optional
+
+from .config import (
+    PDF_OPTIMIZE, PDF_OPTIMIZE_MAX_DPI, PDF_OPTIMIZE_MIN_SAVINGS, PDF_OPTIMIZE_MIN_BYTES, IMAGE_JPEG_QUALITY,
+)
+
+
+def optimizer_available() -> bool:
+    return importlib.util.find_spec("pikepdf") is not None
+
+
+def _downsample_image(pikepdf, raw, page_w_in: float, page_h_in: float, max_dpi: float, quality: int) -> bool:
+    """Re-encode one image XObject as JPEG at `max_dpi` if it is clearly above it."""
+    from PIL import Image
+
+    if "/SMask" in raw or "/Mask" in raw or raw.get("/ImageMask", False):
+        return False
+    filters = raw.get("/Filter")
+    if filters is not None and str(filters) in ("/JBIG2Decode", "/CCITTFaxDecode"):
+        return False  # already tiny bilevel encodings; JPEG would be larger
+    width, height = int(raw.Width), int(raw.Height)
+    # Scans fill the page, so px / page inches approximates the rendered DPI
+    dpi = max(width / max(page_w_in, 0.1), height / max(page_h_in, 0.1))
+    if dpi <= max_dpi * 1.1:
+        return False
+
+    img = pikepdf.PdfImage(raw).as_pil_image()
+    img = img.convert("L" if img.mode in ("1", "L", "LA") else "RGB")
+    scale = max_dpi / dpi
+    img = img.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality, optimize=True)
+    raw.write(buf.getvalue(), filter=pikepdf.Name.DCTDecode)
+    raw.Width, raw.Height = img.size
+    raw.ColorSpace = pikepdf.Name.DeviceGray if img.mode == "L" else pikepdf.Name.DeviceRGB
+    raw.BitsPerComponent = 8
+    for key in ("/DecodeParms", "/Decode"):
+        if key in raw:
+            del raw[key]
+    return True
+
+
+def _dedupe_font_files(pdf, seen: dict) -> int:
+    """Point FontDescriptors with byte-identical embedded font programs at one stream."""
+    count = 0
+    for page in pdf.pages:
+        fonts = page.get("/Resources", {}).get("/Font", {})
+        for _, font in fonts.items():
+            descs = [font.get("/FontDescriptor")]
+            for desc_font in font.get("/DescendantFonts", []):
+                descs.append(desc_font.get("/FontDescriptor"))
+            for desc in descs:
+                if desc is None:
+                    continue
+                for key in ("/FontFile", "/FontFile2", "/FontFile3"):
+                    stream = desc.get(key)
+                    if stream is None:
+                        continue
+                    digest = hashlib.sha256(stream.read_raw_bytes()).hexdigest()
+                    first = seen.setdefault(digest, stream)
+                    if first.objgen != stream.objgen:
+                        desc[key] = first
+                        count += 1
+    return count
+
+
+def optimize_pdf(
+    src_path: str,
+    out_path: Optional[str] = None,
+    max_dpi: float = PDF_OPTIMIZE_MAX_DPI,
+    min_savings: float = PDF_OPTIMIZE_MIN_SAVINGS,
+    quality: int = IMAGE_JPEG_QUALITY,
+) -> dict:
+    """
+    Shrink a PDF before upload: downsample images above `max_dpi`, dedupe identical images and
+    embedded fonts, drop unreferenced resources, recompress streams into object streams and
+    linearize. Runs in a worker process (paths in, stats out).
+
+    The optimized file replaces `src_path` (or is written to `out_path`) only when it is at
+    least `min_savings` smaller; otherwise the original is kept and "applied" is False.
+    """
+    t0 = time.perf_counter()
+    before = os.path.getsize(src_path)
+    stats = {"applied": False, "bytes_before": before, "bytes_after": before, "bytes_saved": 0,
+             "images_downsampled": 0, "images_deduped": 0, "fonts_deduped": 0, "ms": 0.0, "reason": ""}
+
+    if not optimizer_available():
+        stats["reason"] = "pikepdf not installed"
+        return stats
+
+    import pikepdf
+
+    tmp_out = f"{src_path}.opt.pdf"
+    with pikepdf.open(src_path) as pdf:
+        seen_images: dict = {}
+        downsampled: set = set()
+        for page in pdf.pages:
+            box = page.mediabox
+            page_w_in = float(box[2] - box[0]) / 72.0
+            page_h_in = float(box[3] - box[1]) / 72.0
+            xobjects = page.get("/Resources", {}).get("/XObject", {})
+            for name in list(xobjects.keys()):
+                raw = xobjects[name]
+                if raw.get("/Subtype") != "/Image":
+                    continue
+                digest = hashlib.sha256(raw.read_raw_bytes()).hexdigest()
+                first = seen_images.setdefault(digest, raw)
+                if first.objgen != raw.objgen:
+                    xobjects[name] = first
+                    stats["images_deduped"] += 1
+                    continue
+                if raw.objgen in downsampled:
+                    continue
+                try:
+                    if _downsample_image(pikepdf, raw, page_w_in, page_h_in, max_dpi, quality):
+                        downsampled.add(raw.objgen)
+                        stats["images_downsampled"] += 1
+                except Exception:
+                    continue
+
+        stats["fonts_deduped"] = _dedupe_font_files(pdf, {})
+        pdf.remove_unreferenced_resources()
+        pdf.save(
+            tmp_out,
+            compress_streams=True,
+            recompress_flate=True,
+            object_stream_mode=pikepdf.ObjectStreamMode.generate,
+            linearize=True,
+        )
+
+    after = os.path.getsize(tmp_out)
+    saved = before - after
+    if before and saved / before >= min_savings:
+        shutil.move(tmp_out, out_path or src_path)
+        stats.update(applied=True, bytes_after=after, bytes_saved=saved)
+    else:
+        os.remove(tmp_out)
+        stats["reason"] = f"savings {saved} bytes below {min_savings:.0%} threshold"
+    stats["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return stats
+
+
+def should_optimize(path: str) -> bool:
+    return PDF_OPTIMIZE and os.path.getsize(path) >= PDF_OPTIMIZE_MIN_BYTES
@@ -0,0 +1,85 @@
+# glade/pagecache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def page_key(content_hash: str, index: int, kind: str = "text") -> str:
+    """Cache key for one page of a file identified by its content hash."""
+    return f"{content_hash}-p{index}-{kind}"
+
+
+class PageTextCache:
+    """
+    Thread-safe LRU of page text keyed by content hash, optionally mirrored to a directory
+    so results survive restarts (and are shared between worker processes).
+    """
+
+    def __init__(self, max_items: int = 4096, directory: Optional[str] = None):
+        self.max_items = max_items
+        self.directory = directory
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+        if self.directory:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    text = f.read()
+                self._remember(key, text)
+                with self._lock:
+                    self.hits += 1
+                return text
+            except FileNotFoundError:
+                pass
+            except Exception:
+                pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self.directory:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp, path)
+            except Exception:
+                pass
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._items[key] = text
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._items), "hits": self.hits, "misses": self.misses}
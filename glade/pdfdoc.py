@@ -0,0 +1,140 @@
+# glade/pdfdoc.py
+import os
+import uuid
+from typing import Callable, Optional, Union
+
+
+class PdfDocument:
+    """
+    A source PDF parsed at most once.
+
+    The PyPDF2 reader is created on first use and shared by every accessor. Page text,
+    page count and metadata are cached in memory. A standalone one-page PDF is only
+    written when first_page_pdf() is actually called.
+
+    Text comes from the backends in glade.extract (PDF_TEXT_BACKENDS order with fallback);
+    other engines keep their own parsed handle here via handle().
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._reader = None
+        self._page_count: Optional[int] = None
+        self._metadata: Optional[dict] = None
+        self._texts: dict[int, str] = {}
+        self._page1_path: Optional[str] = None
+        self._handles: dict = {}
+        self.text_backends: dict[int, Optional[str]] = {}
+
+    @classmethod
+    def from_analysis(cls, path: str, info: dict) -> "PdfDocument":
+        """Document pre-populated with analyze_pdf() results computed in a worker process."""
+        doc = cls(path)
+        doc._page_count = info.get("page_count")
+        doc._metadata = info.get("metadata")
+        for index, (text, backend) in (info.get("texts") or {}).items():
+            doc.set_page_text(int(index), text, backend)
+        return doc
+
+    def __repr__(self) -> str:
+        return f"PdfDocument({self.path!r})"
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            from PyPDF2 import PdfReader
+            self._reader = PdfReader(self.path)
+        return self._reader
+
+    def handle(self, name: str, factory: Callable):
+        """Per-engine parsed document, created once by `factory`."""
+        if name not in self._handles:
+            self._handles[name] = factory()
+        return self._handles[name]
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            self._page_count = len(self.reader.pages)
+        return self._page_count
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            meta = {}
+            try:
+                for k, v in (self.reader.metadata or {}).items():
+                    meta[str(k).lstrip("/")] = str(v)
+            except Exception:
+                pass
+            self._metadata = meta
+        return self._metadata
+
+    def page_text(self, index: int = 0, max_chars: Optional[int] = None) -> str:
+        """Whitespace-normalized text of one page ('' when the page has no text layer)."""
+        if index not in self._texts:
+            from .extract import extract_page_text
+            text, backend = "", None
+            if index < self.page_count:
+                text, backend = extract_page_text(self, index)
+            self._texts[index] = text
+            self.text_backends[index] = backend
+        text = self._texts[index]
+        return text[:max_chars] if max_chars else text
+
+    def set_page_text(self, index: int, text: str, backend: str) -> None:
+        """Replace cached page text with a better result from elsewhere (e.g. OCR)."""
+        self._texts[index] = text
+        self.text_backends[index] = backend
+
+    def first_page_text(self, max_chars: int = 3000) -> str:
+        return self.page_text(0, max_chars=max_chars)
+
+    def first_page_pdf(self, tmpdir: str) -> str:
+        """Write page 1 as its own PDF (once) and return the path."""
+        if self._page1_path is None:
+            from PyPDF2 import PdfWriter
+            if self.page_count == 0:
+                raise RuntimeError("Empty PDF.")
+            writer = PdfWriter()
+            writer.add_page(self.reader.pages[0])
+            out_path = os.path.join(tmpdir, f"{uuid.uuid4().hex}_page1.pdf")
+            with open(out_path, "wb") as f:
+                writer.write(f)
+            self._page1_path = out_path
+        return self._page1_path
+
+    def close(self) -> None:
+        for h in self._handles.values():
+            try:
+                h.close()
+            except Exception:
+                pass
+        self._handles.clear()
+        self._reader = None
+
+
+def analyze_pdf(path: str, pages: tuple = (0,)) -> dict:
+    """
+    Worker-process task: page count, metadata and text for `pages`, returned as plain data
+    so only the path goes in and strings come back across the process boundary.
+    """
+    doc = PdfDocument(path)
+    try:
+        count = doc.page_count
+        texts = {}
+        for i in pages:
+            if i < count:
+                texts[i] = (doc.page_text(i), doc.text_backends.get(i))
+        return {"page_count": count, "metadata": doc.metadata, "texts": texts}
+    finally:
+        doc.close()
+
+
+def first_page_pdf(path: str, tmpdir: str) -> str:
+    """Worker-process task: write page 1 of `path` as its own PDF."""
+    return PdfDocument(path).first_page_pdf(tmpdir)
+
+
+def as_pdf_document(doc: Union[str, PdfDocument]) -> PdfDocument:
+    return doc if isinstance(doc, PdfDocument) else PdfDocument(doc)
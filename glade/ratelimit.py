@@ -0,0 +1,202 @@
+# glade/ratelimit.py
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    `rate` tokens are added per second up to `capacity`. acquire() blocks the calling thread,
+    acquire_async() awaits, and both return the seconds spent waiting. Requests larger than
+    the capacity are clamped so they can always eventually be served.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, per_minute: float, burst: Optional[float] = None) -> "TokenBucket":
+        """Bucket sized from a per-minute quota; default burst is one tenth of a minute's quota."""
+        rate = float(per_minute) / 60.0
+        capacity = float(burst) if burst else max(1.0, per_minute / 10.0)
+        return cls(rate, capacity)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _reserve(self, n: float) -> float:
+        """Take `n` tokens if available; otherwise return how long to wait before retrying."""
+        n = min(float(n), self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            return (n - self._tokens) / self.rate
+
+    def try_acquire(self, n: float = 1.0) -> bool:
+        return self._reserve(n) == 0.0
+
+    def acquire(self, n: float = 1.0) -> float:
+        started = time.monotonic()
+        while True:
+            wait = self._reserve(n)
+            if wait == 0.0:
+                return time.monotonic() - started
+            time.sleep(wait)
+
+    async def acquire_async(self, n: float = 1.0) -> float:
+        started = time.monotonic()
+        while True:
+            wait = self._reserve(n)
+            if wait == 0.0:
+                return time.monotonic() - started
+            await asyncio.sleep(wait)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in a small file locked with flock, so every process on the
+    host (uvicorn workers, CLI runs) draws from the same bucket. Uses wall-clock time because
+    monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, rate: float, capacity: float, path: str):
+        super().__init__(rate, capacity)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _update(self, take: float) -> Tuple[float, float]:
+        """(tokens left, seconds to wait); takes `take` tokens only if they are all available."""
+        import fcntl
+
+        with self._lock, open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read().split()
+                now = time.time()
+                tokens, updated = (float(raw[0]), float(raw[1])) if len(raw) == 2 else (self.capacity, now)
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                wait = 0.0
+                if take:
+                    if tokens >= take:
+                        tokens -= take
+                    else:
+                        wait = (take - tokens) / self.rate
+                f.seek(0)
+                f.truncate()
+                f.write(f"{tokens!r} {now!r}")
+                return tokens, wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _reserve(self, n: float) -> float:
+        return self._update(min(float(n), self.capacity))[1]
+
+    def available(self) -> float:
+        return self._update(0.0)[0]
+
+
+class ActionLimiter:
+    """
+    One token bucket per outbound action type ("login", "search", "navigate", "upload").
+
+    throttle(action) blocks until the action may run. Waits are totalled per action and per
+    thread; a browser job runs on one thread, so job_waits() after the job is its queueing time.
+    Actions without a bucket (per-minute limit of 0) are never delayed. With `state_dir` the
+    buckets are file-backed and shared between processes (falls back to in-process buckets
+    where flock is unavailable).
+    """
+
+    def __init__(self, per_minute: dict, state_dir: Optional[str] = None):
+        self.buckets: dict[str, TokenBucket] = {}
+        shared = bool(state_dir) and importlib.util.find_spec("fcntl") is not None
+        for action, rpm in per_minute.items():
+            if rpm <= 0:
+                continue
+            bucket = TokenBucket.per_minute(rpm)
+            if shared:
+                bucket = FileTokenBucket(bucket.rate, bucket.capacity, os.path.join(state_dir, f"{action}.bucket"))
+            self.buckets[action] = bucket
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._totals: dict[str, list] = {a: [0, 0.0, 0.0] for a in self.buckets}   # count, wait_s, max_wait_s
+
+    def throttle(self, action: str) -> float:
+        bucket = self.buckets.get(action)
+        if bucket is None:
+            return 0.0
+        waited = bucket.acquire()
+        with self._lock:
+            t = self._totals[action]
+            t[0] += 1
+            t[1] += waited
+            t[2] = max(t[2], waited)
+        waits = getattr(self._local, "waits", None)
+        if waits is not None:
+            waits[action] = waits.get(action, 0.0) + waited
+        return waited
+
+    def reset_job_waits(self) -> None:
+        self._local.waits = {}
+
+    def job_waits(self) -> dict:
+        """Seconds this thread has waited per action since reset_job_waits()."""
+        return dict(getattr(self._local, "waits", None) or {})
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for action, (count, wait, max_wait) in self._totals.items():
+                bucket = self.buckets[action]
+                out[action] = {"per_min": round(bucket.rate * 60, 2), "burst": bucket.capacity,
+                               "actions": count, "wait_s": round(wait, 3), "max_wait_s": round(max_wait, 3)}
+        return out
+
+
+_glade_limiter: Optional[ActionLimiter] = None
+_glade_limiter_lock = threading.Lock()
+
+
+def glade_limiter() -> ActionLimiter:
+    """Process-wide limiter for Glade UI actions (GLADE_RATE_* settings)."""
+    global _glade_limiter
+    if _glade_limiter is None:
+        with _glade_limiter_lock:
+            if _glade_limiter is None:
+                from .config import (
+                    GLADE_RATE_LOGIN_PER_MIN, GLADE_RATE_NAVIGATE_PER_MIN, GLADE_RATE_SEARCH_PER_MIN,
+                    GLADE_RATE_STATE_DIR, GLADE_RATE_UPLOAD_PER_MIN,
+                )
+                _glade_limiter = ActionLimiter({
+                    "login": GLADE_RATE_LOGIN_PER_MIN,
+                    "search": GLADE_RATE_SEARCH_PER_MIN,
+                    "navigate": GLADE_RATE_NAVIGATE_PER_MIN,
+                    "upload": GLADE_RATE_UPLOAD_PER_MIN,
+                }, state_dir=GLADE_RATE_STATE_DIR or None)
+    return _glade_limiter
+
+
+def throttle(action: str) -> float:
+    """Wait for a Glade `action` token; returns the seconds waited."""
+    return glade_limiter().throttle(action)
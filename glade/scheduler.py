@@ -0,0 +1,92 @@
+# glade/scheduler.py
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from .config import MAX_BROWSER_CONTEXTS
+from .log import _log
+
+
+class _Ticket:
+    __slots__ = ("granted", "queued_at")
+
+    def __init__(self):
+        self.granted = threading.Event()
+        self.queued_at = time.monotonic()
+
+
+class ClientScheduler:
+    """
+    Runs browser jobs one at a time per client and up to `limit` clients at once.
+
+    Callers block in run() until their job gets a slot; the job then runs on the caller's
+    thread. Clients with queued work are served round-robin: when a slot frees up, the next
+    client in rotation gets it and goes to the back of the line, so a client with a long
+    backlog holds at most one slot and cannot starve the others.
+    """
+
+    def __init__(self, limit: int = MAX_BROWSER_CONTEXTS):
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque] = {}
+        self._ring: deque = deque()     # clients with queued tickets, in service order
+        self._busy: set = set()
+        self.completed = 0
+        self.max_wait_s = 0.0
+
+    def run(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        ticket = _Ticket()
+        with self._lock:
+            if key not in self._queues:
+                self._queues[key] = deque()
+                self._ring.append(key)
+            self._queues[key].append(ticket)
+            self._dispatch()
+        if not ticket.granted.is_set():
+            _log(f"upload for {key} queued ({len(self._busy)}/{self.limit} busy)")
+        ticket.granted.wait()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._busy.discard(key)
+                self.completed += 1
+                self._dispatch()
+
+    def set_limit(self, limit: int) -> None:
+        with self._lock:
+            self.limit = max(1, limit)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        # caller holds self._lock
+        while len(self._busy) < self.limit:
+            for _ in range(len(self._ring)):
+                key = self._ring.popleft()
+                if key in self._busy:
+                    self._ring.append(key)
+                    continue
+                queue = self._queues[key]
+                ticket = queue.popleft()
+                if queue:
+                    self._ring.append(key)
+                else:
+                    del self._queues[key]
+                self._busy.add(key)
+                self.max_wait_s = max(self.max_wait_s, time.monotonic() - ticket.queued_at)
+                ticket.granted.set()
+                break
+            else:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "active": len(self._busy),
+                "queued": sum(len(q) for q in self._queues.values()),
+                "clients_waiting": len(self._queues),
+                "completed": self.completed,
+                "max_wait_s": round(self.max_wait_s, 3),
+            }
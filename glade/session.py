@@ -0,0 +1,425 @@
+# glade/session.py
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .adaptive import StepTimer
+from .breaker import CircuitBreaker
+from .config import FLIGHT_RECORDER, GLADE_BREAKER_PARK_SECONDS, GLADE_BREAKER_SLOW_SECONDS, SESSION_STEP_RETRIES
+from .flightrec import FlightRecorder
+from .helpers import _log
+from .ratelimit import glade_limiter
+
+
+class ClientNotFound(RuntimeError):
+    pass
+
+
+def _rate_limit_queued() -> float:
+    """Seconds this thread has spent waiting for Glade rate-limit tokens in the current job."""
+    return sum(glade_limiter().job_waits().values())
+
+
+# Guards login -> client -> checklist. A missing client is a normal answer, not a Glade failure.
+glade_breaker = CircuitBreaker("glade", slow_seconds=GLADE_BREAKER_SLOW_SECONDS)
+
+
+@dataclass
+class UploadJob:
+    doc_title: str                       # AI-proposed human title (used for the FILE name)
+    upload_path: Optional[str] = None    # preferred: file on disk, handed to the browser by path
+    upload_bytes: Optional[bytes] = None
+    upload_mime: str = "application/pdf"
+    job_id: Optional[str] = None         # flight-recorder artifacts: /jobs/{job_id}/artifacts
+
+
+def safe_pdf_name(title: str) -> str:
+    t = re.sub(r"\s+", " ", (title or "").strip())
+    t = re.sub(r'[\\/:*?"<>|]+', "", t)
+    t = t[:120].rstrip(" .")
+    if not t:
+        t = "Document"
+    if not re.search(r"\.pdf$", t, re.I):
+        t = f"{t}.pdf"
+    return t
+
+
+class GladeSession:
+    """
+    One Playwright browser navigated to a client's Initial Document Checklist.
+
+    open() logs in, finds the client (email first, then name), opens Documents, enters the
+    passcode and opens the checklist once; upload() can then be called for any number of
+    documents, returning to the checklist between them. Progress is recorded as checkpoints
+    (`checkpoint`, `client_url`) so a failed step or upload resumes in the same context, and
+    retries are counted per step in `retries`. A FlightRecorder, when given, captures the
+    context and persists its artifacts on close if `error` was set (or an exception escaped).
+
+    `observer(step, seconds, ok, timeout)`, when given, is told how long each browser step took
+    (see glade.adaptive).
+    """
+
+    def __init__(self, client_email: str, client_name: str, observer: Optional[Callable] = None,
+                 recorder: Optional[FlightRecorder] = None):
+        self.client_email = client_email or ""
+        self.client_name = client_name or ""
+        self.observer = observer
+        self.recorder = recorder
+        self.error: Optional[str] = None
+        self._pw_cm = None
+        self._pw = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.uploads = 0
+        self.checkpoint: Optional[str] = None
+        self.client_url: Optional[str] = None
+        self.retries: dict[str, int] = {}
+
+    def __enter__(self) -> "GladeSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.recorder is not None and self.context is not None:
+            error = self.error or (f"{exc_type.__name__}: {exc}" if exc_type else None)
+            self.recorder.finish(ok=error is None, error=error, page=self.page, meta={
+                "client": self.client_email or self.client_name,
+                "checkpoint": self.checkpoint,
+                "retries": self.retries,
+                "uploads": self.uploads,
+            })
+        self.close()
+
+    def _launch(self) -> None:
+        from playwright.sync_api import sync_playwright
+
+        headless = os.getenv("HEADLESS", "false").lower() in ("1", "true", "yes")
+        slow_mo = int(os.getenv("SLOW_MO", "0") or "0")
+        engine = os.getenv("BROWSER_ENGINE", "chromium").lower()
+        channel = os.getenv("BROWSER_CHANNEL", "msedge")
+
+        self._pw_cm = sync_playwright()
+        p = self._pw = self._pw_cm.__enter__()
+        if engine == "chromium":
+            try:
+                self.browser = p.chromium.launch(channel=channel, headless=headless, slow_mo=slow_mo)
+            except Exception:
+                self.browser = p.chromium.launch(headless=headless, slow_mo=slow_mo)
+        elif engine == "firefox":
+            self.browser = p.firefox.launch(headless=headless, slow_mo=slow_mo)
+        else:
+            self.browser = p.webkit.launch(headless=headless, slow_mo=slow_mo)
+
+        self.context = self.browser.new_context(viewport={"width": 1400, "height": 900})
+        if self.recorder is not None:
+            self.recorder.attach(self.context)
+        self.page = self.context.new_page()
+
+    # Checkpoints in order; open() resumes after the last one reached
+    STEPS = ("login", "workflows", "client", "documents", "checklist")
+
+    def open(self, max_retries: int = SESSION_STEP_RETRIES) -> None:
+        """
+        Walk the steps from the last checkpoint to the checklist. A failed step is retried up to
+        `max_retries` times in the same browser context after rewinding to the nearest safe
+        checkpoint (the client's URL once it is known, otherwise the workflows page), instead of
+        starting over from login.
+        """
+        if self.page is None:
+            _log("starting Playwright + Glade session")
+            self._launch()
+        attempts: dict[str, int] = {}     # this call's budget; self.retries is the session total
+        while self.checkpoint != self.STEPS[-1]:
+            step = self.STEPS[self.STEPS.index(self.checkpoint) + 1 if self.checkpoint else 0]
+            try:
+                getattr(self, f"_step_{step}")()
+            except ClientNotFound:
+                raise
+            except Exception as e:
+                n = attempts[step] = attempts.get(step, 0) + 1
+                self.retries[step] = self.retries.get(step, 0) + 1
+                if n > max_retries:
+                    raise
+                _log(f"step '{step}' failed ({e}); retry {n}/{max_retries}")
+                if self.recorder is not None:
+                    self.recorder.note("step_failed", step=step, error=str(e)[:500], retry=n)
+                self._rewind()
+                continue
+            self.checkpoint = step
+            if step == "client":
+                self.client_url = self.page.url
+            _log(f"checkpoint: {step}")
+            if self.recorder is not None:
+                self.recorder.mark(step, url=self.page.url)
+
+    def _timer(self, step: str, ignore: tuple = ()) -> StepTimer:
+        # rate-limit queueing inside the step is ours, not Glade's (as for the breaker)
+        return StepTimer(self.observer, step, ignore=ignore, queued=_rate_limit_queued)
+
+    def _rewind(self) -> None:
+        """Move back to the latest checkpoint that can be re-entered directly."""
+        try:
+            if self.page is None or self.page.is_closed():
+                self.page = self.context.new_page()     # same context: cookies keep us logged in
+        except Exception:
+            self.page = self.context.new_page()
+        if self.client_url:
+            try:
+                self.page.goto(self.client_url, wait_until="domcontentloaded")
+                self.checkpoint = "client"
+                _log("resuming at the client page")
+                return
+            except Exception as e:
+                _log(f"could not re-enter client page: {e}")
+        self.checkpoint = "login" if self.checkpoint else None
+
+    def _step_login(self) -> None:
+        from .auth import fast_login
+
+        with self._timer("login"):
+            fast_login(self.page)
+            try:
+                self.page.wait_for_load_state("networkidle", timeout=5000)
+            except Exception:
+                pass
+
+    def _step_workflows(self) -> None:
+        from .navigation import open_workflows
+
+        with self._timer("workflows"):
+            open_workflows(self.page)
+
+    def _step_client(self) -> None:
+        from .navigation import search_and_open_client_by_email, search_and_open_client_by_name
+
+        # Select client: email first (TAB×2 flow), then name fallback.
+        # A client that isn't in Glade says nothing about Glade's health, so it isn't reported.
+        with self._timer("client_search", ignore=(ClientNotFound,)):
+            try:
+                _log(f"searching client by email: {self.client_email}")
+                search_and_open_client_by_email(self.page, self.client_email)
+            except Exception as e:
+                _log(f"email search failed: {e}. Trying by name: {self.client_name}")
+                try:
+                    search_and_open_client_by_name(self.page, self.client_name)
+                except Exception as e2:
+                    _log(f"name search failed: {e2}")
+                    raise ClientNotFound("Client profile not found")
+
+    def _step_documents(self) -> None:
+        from .navigation import open_documents_and_discussion_then_documents
+
+        self.page.wait_for_timeout(900)
+        with self._timer("documents"):
+            open_documents_and_discussion_then_documents(self.page)
+
+    def _step_checklist(self) -> None:
+        from .documents import enter_documents_passcode_1111, open_initial_documents_checklist
+
+        # Passcode (if present) + checklist
+        with self._timer("checklist"):
+            enter_documents_passcode_1111(self.page)
+            open_initial_documents_checklist(self.page)
+        self._dismiss_overlays()
+
+    def _dismiss_overlays(self) -> None:
+        from .navigation import _press_continue_uploading_if_present
+
+        # Dismiss any blocking "Continue Uploading" overlay
+        try:
+            _press_continue_uploading_if_present(self.page)
+        except Exception:
+            pass
+
+    def _return_to_checklist(self) -> None:
+        """Best-effort: close whatever the previous upload left open and re-open the checklist."""
+        from .documents import open_initial_documents_checklist
+
+        try:
+            self.page.keyboard.press("Escape")
+        except Exception:
+            pass
+        self._dismiss_overlays()
+        try:
+            open_initial_documents_checklist(self.page)
+        except Exception as e:
+            _log(f"could not re-open checklist between uploads: {e}")
+        self._dismiss_overlays()
+
+    @staticmethod
+    def bucket_for(job: UploadJob) -> str:
+        from .classify import classify_for_checklist, normalize_to_allowed_label
+
+        # Classifier → normalized to allowed label
+        _ignored, raw_bucket = classify_for_checklist(job.doc_title)
+        checklist_bucket = normalize_to_allowed_label(raw_bucket or job.doc_title)
+        _log(f"classifier bucket='{raw_bucket}' → normalized bucket='{checklist_bucket}'")
+        return checklist_bucket
+
+    @staticmethod
+    def _payload(job: UploadJob):
+        from .handles import DocumentHandle
+
+        # FILE name uses AI-proposed title
+        final_upload_name = safe_pdf_name(job.doc_title)
+        _log(f"using upload filename: {final_upload_name}")
+        if job.upload_path:
+            # Hard-link under the final name and pass the path: the browser reads the file
+            # itself instead of us pushing a bytes buffer through the driver pipe. The link
+            # lives in its own directory next to the source; upload_group removes it.
+            return DocumentHandle(job.upload_path).link_as(final_upload_name).path
+        return {
+            "name": final_upload_name,                     # visible file name in Glade
+            "mimeType": job.upload_mime or "application/pdf",
+            "buffer": job.upload_bytes,
+        }
+
+    @staticmethod
+    def _drop_payload(payload) -> None:
+        """Remove the hard-link directory _payload made for a path upload (the source stays)."""
+        if isinstance(payload, str):
+            shutil.rmtree(os.path.dirname(payload), ignore_errors=True)
+
+    def upload(self, job: UploadJob) -> str:
+        """Upload one document into its checklist bucket; returns the bucket used."""
+        return self.upload_group([job])
+
+    def upload_group(self, jobs: list, bucket: Optional[str] = None) -> str:
+        """
+        Upload documents that share a checklist bucket through a single file chooser
+        (set_files takes a list). Returns the bucket used.
+
+        A failed upload is retried up to SESSION_STEP_RETRIES times per call. The page can fail
+        after the files were accepted, so before each retry the checklist is checked and files
+        that appeared since the first attempt are not sent again.
+        """
+        from .documents import _upload_display_name, add_document_and_upload, files_on_page
+
+        if self.uploads:
+            self._return_to_checklist()
+
+        checklist_bucket = bucket or self.bucket_for(jobs[0])
+        payloads: list = []
+        try:
+            payloads.extend(self._payload(job) for job in jobs)
+            names = [_upload_display_name(p) for p in payloads]
+            already_there = files_on_page(self.page, names)   # same-named files from earlier uploads
+            pending = list(range(len(payloads)))
+
+            # Use the normalized BUCKET as the checklist section to upload into. A failed upload
+            # goes back to the client page and re-opens the checklist rather than a new login.
+            attempt = 0
+            while True:
+                try:
+                    batch = [payloads[i] for i in pending]
+                    with self._timer("upload"):
+                        add_document_and_upload(self.page, checklist_bucket, batch[0] if len(batch) == 1 else batch)
+                    break
+                except Exception as e:
+                    attempt += 1
+                    self.retries["upload"] = self.retries.get("upload", 0) + 1
+                    if attempt > SESSION_STEP_RETRIES or not self.client_url:
+                        raise
+                    _log(f"upload into '{checklist_bucket}' failed ({e}); retry {attempt}/{SESSION_STEP_RETRIES}")
+                    if self.recorder is not None:
+                        self.recorder.note("step_failed", step="upload", error=str(e)[:500], retry=attempt)
+                    self.checkpoint = "client"
+                    self._rewind()
+                    self.open()
+                    landed = files_on_page(self.page, [names[i] for i in pending]) - already_there
+                    if landed:
+                        _log(f"already in Glade despite the error, not re-sending: {sorted(landed)}")
+                        pending = [i for i in pending if names[i] not in landed]
+                    if not pending:
+                        break
+            self.uploads += 1
+            if self.recorder is not None:
+                self.recorder.mark("upload", bucket=checklist_bucket, files=len(jobs))
+            # No training history from here: the bucket is the classifier's own choice (even when
+            # the 'Add an item' fallback had to create it). glade.bucketmodel learns only from
+            # operator corrections.
+            _log(f"upload to Glade completed ({len(jobs)} file(s) into '{checklist_bucket}')")
+            return checklist_bucket
+        finally:
+            for payload in payloads:
+                self._drop_payload(payload)
+
+    def close(self) -> None:
+        for obj in (self.context, self.browser):
+            try:
+                if obj:
+                    obj.close()
+            except Exception:
+                pass
+        self.context = self.browser = self.page = None
+        if self._pw_cm is not None:
+            try:
+                self._pw_cm.__exit__(None, None, None)
+            except Exception:
+                pass
+            self._pw_cm = self._pw = None
+
+
+def upload_documents(client_email: str, client_name: str, jobs: list, group_by_bucket: bool = False,
+                     observer: Optional[Callable] = None) -> list:
+    """
+    Upload several documents for one client in a single browser session.
+    With group_by_bucket, documents landing in the same checklist bucket share one file chooser.
+    Returns one (success, error_message) per job, in order.
+    """
+    results: list = [None] * len(jobs)
+    if not glade_breaker.acquire(wait=GLADE_BREAKER_PARK_SECONDS):
+        _log(f"Glade circuit open; failing {len(jobs)} upload(s) for {client_email or client_name} fast")
+        return [(False, "Glade unavailable (circuit open)")] * len(jobs)
+    glade_limiter().reset_job_waits()
+    session = None
+    recorder = None
+    if FLIGHT_RECORDER:
+        ids = [job.job_id for job in jobs if job.job_id]
+        recorder = FlightRecorder(ids[0] if ids else None, aliases=tuple(ids[1:]))
+    try:
+        with GladeSession(client_email, client_name, observer=observer, recorder=recorder) as session:
+            t0 = time.monotonic()
+            opened = False
+            try:
+                session.open()
+                opened = True
+            except ClientNotFound as e:
+                opened = True
+                session.error = str(e)
+                return [(False, str(e))] * len(jobs)
+            finally:
+                # time spent queueing for rate-limit tokens is ours, not Glade's
+                elapsed = time.monotonic() - t0 - _rate_limit_queued()
+                glade_breaker.record(opened, elapsed)
+
+            if group_by_bucket:
+                groups: dict = {}
+                for i, job in enumerate(jobs):
+                    groups.setdefault(session.bucket_for(job), []).append(i)
+                batches = [(bucket, idx) for bucket, idx in groups.items()]
+            else:
+                batches = [(None, [i]) for i in range(len(jobs))]
+
+            for bucket, idx in batches:
+                try:
+                    session.upload_group([jobs[i] for i in idx], bucket=bucket)
+                    outcome = (True, None)
+                except Exception as e:
+                    _log(f"upload failed for {[jobs[i].doc_title for i in idx]}: {e}")
+                    outcome = (False, str(e))
+                    session.error = session.error or str(e)
+                for i in idx:
+                    results[i] = outcome
+    except Exception as e:
+        results = [r if r is not None else (False, str(e)) for r in results]
+    if session is not None and session.retries:
+        _log(f"step retries for {client_email or client_name}: {session.retries}")
+    waits = glade_limiter().job_waits()
+    if waits:
+        _log(f"rate-limit queueing for {client_email or client_name}: {sum(waits.values()):.1f}s "
+             + "(" + ", ".join(f"{a} {w:.1f}s" for a, w in sorted(waits.items())) + ")")
+    return results
@@ -0,0 +1,159 @@
+# glade/split.py
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from .classify import DEFAULT_LABEL, ENGINE
+from .config import MIN_NAMING_CHARS, SPLIT_MIN_MARGIN, SPLIT_MIN_SCORE, SPLIT_OCR_WORKERS, SPLIT_PAGES_PER_TASK
+from .log import _log
+from .ocr import ocr_available, ocr_page_text, page_cache
+from .pagecache import file_sha256, page_key
+from .pdfdoc import analyze_pdf
+from .workers import get_pool
+
+
+class Segment(NamedTuple):
+    start: int          # first page (0-based)
+    end: int            # last page, inclusive
+    label: str          # checklist label that opened the segment
+
+
+def page_texts(pdf_path: str, page_count: int, content_hash: Optional[str] = None) -> list[str]:
+    """
+    Text of every page. Text layers are extracted in parallel worker processes, SPLIT_PAGES_PER_TASK
+    pages per task; pages with no usable layer fall back to OCR. Both are cached by
+    (content hash, page), so re-processing the same scan reads everything from the cache.
+    """
+    content_hash = content_hash or file_sha256(pdf_path)
+    texts: list = [page_cache.get(page_key(content_hash, i)) for i in range(page_count)]
+    missing = [i for i, t in enumerate(texts) if t is None]
+    if missing:
+        step = max(1, SPLIT_PAGES_PER_TASK)
+        pool = get_pool()
+        futures = [pool.submit(analyze_pdf, pdf_path, tuple(missing[i:i + step]))
+                   for i in range(0, len(missing), step)]
+        for fut in futures:
+            for index, (text, _backend) in fut.result().get("texts", {}).items():
+                texts[int(index)] = text
+                page_cache.put(page_key(content_hash, int(index)), text)
+        _log(f"extracted text of {len(missing)}/{page_count} pages in {len(futures)} task(s)")
+
+    texts = [t or "" for t in texts]
+    short = [i for i, t in enumerate(texts) if len(t) < MIN_NAMING_CHARS]
+    if short and ocr_available():
+        with ThreadPoolExecutor(max_workers=max(1, SPLIT_OCR_WORKERS)) as ex:
+            ocr = list(ex.map(lambda i: ocr_page_text(pdf_path, i, content_hash=content_hash), short))
+        for i, text in zip(short, ocr):
+            if len(text) > len(texts[i]):
+                texts[i] = text
+    return texts
+
+
+_PAGE_NUMBER = re.compile(r"\bpage\s*(\d{1,3})\s*(?:of|/)\s*\d{1,3}\b", re.I)
+_DATE = r"\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}|[a-z]{3,9}\.?\s+\d{1,2},?\s+\d{4}"
+# The date that identifies one statement or pay stub among several of the same kind
+_PERIOD = re.compile(
+    r"\b(?:pay\s+date|pay\s+period(?:\s+(?:ending|beginning|end|start))?|period\s+(?:ending|beginning)|"
+    r"statement\s+(?:period|date)|for\s+the\s+period|closing\s+date)\s*[:\-]?\s*(?:from\s+)?(" + _DATE + r")",
+    re.I,
+)
+
+
+class _Page(NamedTuple):
+    label: Optional[str]     # confident rule label, None for continuation/unsure pages
+    number: Optional[int]    # printed "Page N of M"
+    period: Optional[str]    # pay date / statement period
+
+
+def _read_page(text: str) -> _Page:
+    scored = ENGINE.score(text)
+    confident = (scored is not None and scored.label != DEFAULT_LABEL
+                 and scored.score >= SPLIT_MIN_SCORE and scored.margin >= SPLIT_MIN_MARGIN)
+    number = _PAGE_NUMBER.search(text)
+    period = _PERIOD.search(text)
+    return _Page(
+        scored.label if confident else None,
+        int(number.group(1)) if number else None,
+        re.sub(r"\s+", " ", period.group(1)).lower() if period else None,
+    )
+
+
+def segment_pages(texts: list[str]) -> list[Segment]:
+    """
+    Group consecutive pages into documents.
+
+    A page starts a new document when it is confidently classified (rule score of at least
+    SPLIT_MIN_SCORE, leading the runner-up by SPLIT_MIN_MARGIN) with a different label, or
+    when it carries a first-page cue for another document of the same kind: "Page 1 of N",
+    or a pay date / statement period that differs from the current document's. Pages printed
+    as "Page 2 of N" or later never start a document, and unsure pages (continuations,
+    transaction lists, blank backs of scans) stay with the document before them. Leading
+    unsure pages join the first document.
+
+    A short run of another label between two runs of the same label (A-B-A) is folded back
+    into A unless the B or second A run opened on a first-page cue: a page that lists
+    utility payments is still part of the bank statement around it.
+    """
+    pages = [_read_page(t) for t in texts]
+    runs: list = []         # [start, end, label, period, opened_by_cue]
+    for i, page in enumerate(pages):
+        cur = runs[-1] if runs else None
+        if page.number is not None and page.number > 1 and cur is not None:
+            cur[1] = i
+            continue
+        first_page = page.number == 1
+        if cur is None:
+            if page.label is None:
+                continue
+            runs.append([0, i, page.label, page.period, first_page])
+            continue
+        new_label = page.label is not None and page.label != cur[2]
+        new_period = page.period is not None and cur[3] is not None and page.period != cur[3]
+        if page.label is not None and (new_label or new_period or (first_page and i > cur[0])):
+            # its own date (other than this document's) marks a separate document too
+            opened_by_cue = first_page or (page.period is not None and page.period != cur[3])
+            runs.append([i, i, page.label, page.period, opened_by_cue])
+            continue
+        cur[1] = i
+        if cur[3] is None:
+            cur[3] = page.period
+
+    merged: list = []
+    for run in runs:
+        if (len(merged) >= 2 and merged[-2][2] == run[2] and merged[-1][2] != run[2]
+                and not merged[-1][4] and not run[4]):
+            b = merged.pop()
+            merged[-1][1] = run[1]
+            _log(f"split: pages {b[0] + 1}-{b[1] + 1} ({b[2]}) kept inside {run[2]}")
+            continue
+        if merged and merged[-1][2] == run[2] and not run[4]:
+            merged[-1][1] = run[1]
+            continue
+        merged.append(run)
+
+    if not texts:
+        return []
+    if not merged:
+        return [Segment(0, len(texts) - 1, DEFAULT_LABEL)]
+    merged[0][0] = 0
+    merged[-1][1] = len(texts) - 1
+    return [Segment(start, end, label) for start, end, label, _period, _cue in merged]
+
+
+def write_segments(pdf_path: str, ranges: list, tmpdir: str) -> list[str]:
+    """Worker-process task: write each inclusive (start, end) page range of `pdf_path` as its own PDF."""
+    from PyPDF2 import PdfReader, PdfWriter
+
+    reader = PdfReader(pdf_path)
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    out = []
+    for start, end in ranges:
+        writer = PdfWriter()
+        for i in range(start, end + 1):
+            writer.add_page(reader.pages[i])
+        path = os.path.join(tmpdir, f"{stem}_p{start + 1}-{end + 1}.pdf")
+        with open(path, "wb") as f:
+            writer.write(f)
+        out.append(path)
+    return out
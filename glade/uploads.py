@@ -1,6 +1,7 @@
 from pathlib import Path
 from playwright.sync_api import Page, TimeoutError as PWTimeout
 from .helpers import _log
+from .ratelimit import throttle
 
 def ensure_sample_pdf(path: Path) -> Path:
     if not path.exists():
@@ -44,6 +45,7 @@ def upload_sample_pdf_and_confirm(page: Page, filename: str = "sample_upload.pdf
                 page.wait_for_timeout(500)  # Wait for file chooser to appear
             chooser = fc.value
             pdf = ensure_sample_pdf(Path(filename)).resolve()
+            throttle("upload")
             chooser.set_files(str(pdf))
             page.wait_for_timeout(1000)  # Wait after setting file to allow upload to start
             clicked = True
@@ -58,6 +60,7 @@ def upload_sample_pdf_and_confirm(page: Page, filename: str = "sample_upload.pdf
         if not inp.count():
             raise RuntimeError("Could not find file upload control.")
         pdf = ensure_sample_pdf(Path(filename)).resolve()
+        throttle("upload")
         inp.set_input_files(str(pdf))
         page.wait_for_timeout(1000)  # Wait after setting file to allow upload to start
 
@@ -109,8 +112,7 @@ def upload_sample_pdf_and_confirm(page: Page, filename: str = "sample_upload.pdf
     # As a fallback, always wait a little longer to ensure upload is complete
     page.wait_for_timeout(2500)
 
-    page.screenshot(path="upload_success.png", full_page=True)
-    _log("uploaded sample PDF and saved upload_success.png")
+    _log("uploaded sample PDF")
 
 
 def wait_for_upload_processing_complete(page: Page, filename: str = "sample_upload.pdf") -> None:
@@ -0,0 +1,118 @@
+# glade/workers.py
+import multiprocessing as mp
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from .config import CONVERT_WORKERS, CONVERT_TASKS_PER_CHILD, CONVERT_TIMEOUT
+
+
+class ConversionPool:
+    """
+    Process pool for CPU-heavy conversion/extraction so it stays off the request threads
+    (and away from the GIL the sync Playwright driver needs).
+
+    Tasks must be top-level functions taking file paths, not bytes, so only short strings
+    cross the process boundary. Workers are recycled after roughly `tasks_per_child` tasks
+    each to bound memory growth from PIL/PyPDF2: the executor is swapped for a fresh one
+    and the old one drains its queued work and exits. (ProcessPoolExecutor's own
+    max_tasks_per_child can deadlock on 3.11/3.12, gh-115634.) With max_workers=0 tasks
+    run inline.
+    """
+
+    def __init__(self, max_workers: int = CONVERT_WORKERS, tasks_per_child: int = CONVERT_TASKS_PER_CHILD):
+        self.max_workers = max(0, int(max_workers))
+        self.tasks_per_child = max(1, int(tasks_per_child))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._since_recycle = 0
+        self.recycles = 0
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Current executor; caller holds self._lock."""
+        if self._since_recycle >= self.tasks_per_child * self.max_workers and self._executor is not None:
+            # Old workers finish what they already have queued, then exit.
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._since_recycle = 0
+            self.recycles += 1
+        if self._executor is None:
+            # spawn keeps Playwright/driver threads and sockets out of the workers
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp.get_context("spawn"),
+            )
+        self._since_recycle += 1
+        return self._executor
+
+    def _done(self, fut: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if fut.cancelled() or fut.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if self.max_workers == 0:
+            fut: Future = Future()
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+        with self._lock:
+            fut = self._get_executor().submit(fn, *args, **kwargs)
+            self.pending += 1
+            self.submitted += 1
+        fut.add_done_callback(self._done)
+        return fut
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = CONVERT_TIMEOUT, **kwargs):
+        """Submit and wait for the result (raises the task's exception)."""
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        """Tasks submitted but not yet picked up by a worker."""
+        return max(0, self.pending - self.max_workers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "tasks_per_child": self.tasks_per_child,
+                "pending": self.pending,
+                "queue_depth": max(0, self.pending - self.max_workers),
+                "submitted": self.submitted,
+                "recycles": self.recycles,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            ex, self._executor = self._executor, None
+        if ex is not None:
+            ex.shutdown(wait=wait, cancel_futures=True)
+
+
+_pool: Optional[ConversionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConversionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConversionPool()
+    return _pool
+
+
+def run_in_pool(fn: Callable, *args, timeout: Optional[float] = CONVERT_TIMEOUT, **kwargs):
+    return get_pool().run(fn, *args, timeout=timeout, **kwargs)
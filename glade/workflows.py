@@ -2,8 +2,10 @@ import re, time
 from playwright.sync_api import Page
 from .config import WORKFLOW_URL
 from .helpers import _log, _try_click_first_match, _scroll_list
+from .ratelimit import throttle
 
 def open_workflows(page: Page) -> None:
+    throttle("navigate")
     page.goto(WORKFLOW_URL, wait_until="domcontentloaded")
     _log("on workflows page")
 
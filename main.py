@@ -13,12 +13,13 @@ from glade.documents import (
     open_initial_documents_checklist,
     open_photo_holding_ids,
 )
+from glade.flightrec import FlightRecorder
 from glade.helpers import _log
 
 HEADLESS=False
 
 def _run_sync_flow() -> None:
-    """Your existing sync Playwright flow (with step-by-step screenshots for debugging)."""
+    """Your existing sync Playwright flow (flight recorder artifacts are saved if it fails)."""
     if not USERNAME or not PASSWORD:
         raise SystemExit("Missing GLADE_USERNAME or GLADE_PASSWORD in .env")
 
@@ -26,35 +27,36 @@ def _run_sync_flow() -> None:
         # Use WebKit for Safari-like automation
         browser = p.webkit.launch(headless=HEADLESS, slow_mo=SLOW_MO)
         context = browser.new_context(viewport={"width": 1400, "height": 900})
+        recorder = FlightRecorder()
+        recorder.attach(context)
         page = context.new_page()
 
         try:
             fast_login(page)
-            page.screenshot(path="step1_after_login.png", full_page=True)
+            recorder.mark("after_login")
             open_workflows(page)
-            page.screenshot(path="step2_after_open_workflows.png", full_page=True)
+            recorder.mark("after_open_workflows")
             search_and_open_client(page, "Carlos Rodriguez")
-            page.screenshot(path="step3_after_search_client.png", full_page=True)
+            recorder.mark("after_search_client")
             open_documents_and_discussion_then_documents(page)
-            page.screenshot(path="step4_after_open_documents_tab.png", full_page=True)
+            recorder.mark("after_open_documents_tab")
             enter_documents_passcode_1111(page)
-            page.screenshot(path="step5_after_passcode.png", full_page=True)
+            recorder.mark("after_passcode")
             open_initial_documents_checklist(page)
-            page.screenshot(path="step6_after_initial_checklist.png", full_page=True)
+            recorder.mark("after_initial_checklist")
 
             # Add new checklist item (set toggles) and upload sample doc
             open_photo_holding_ids(page)  # default: "Selfie Holding DL & SS"
-            page.screenshot(path="step7_after_photo_holding_ids.png", full_page=True)
+            recorder.mark("after_photo_holding_ids")
 
             _log("Done. New document added and sample uploaded.")
+            recorder.finish(ok=True)
             page.wait_for_timeout(1500)
         except Exception as e:
             _log(f"ERROR: {e}")
-            try:
-                page.screenshot(path="error.png", full_page=True)
-                _log("Saved error.png")
-            except Exception:
-                pass
+            folder = recorder.finish(ok=False, error=str(e), page=page)
+            if folder:
+                _log(f"Saved trace, screenshot and logs to {folder}")
             raise
         finally:
             if HEADLESS:
@@ -7,21 +7,41 @@ if sys.platform.startswith("win"):
         pass
 
 import os
-import io
 import re
 import uuid
 import json
-import shutil
 import traceback
-import tempfile
-from typing import Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 from urllib.parse import urlparse, unquote
 
-import httpx
 from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 from dotenv import load_dotenv
 
+from glade.config import (
+    ADAPTIVE_CONCURRENCY, BATCH_MAX_FILES, BATCH_PREPARE_WORKERS, DEADLETTER_ENABLED, IDEMPOTENCY_WAIT_SECONDS,
+    SPLIT_MODE,
+)
+from glade.convert import IMAGE_EXTS, image_to_pdf
+from glade.office import OFFICE_EXTS, office_to_pdf
+from glade.handles import DocumentHandle, Workspace, safe_filename, sweep_stale_workspaces
+from glade.adaptive import AimdController
+from glade.breaker import CircuitBreaker
+from glade.archive import archive_kind, extract_members, zip_document_ext
+from glade.coalesce import ClientBatcher, UploadSlot
+from glade.deadletter import DeadLetterStore
+from glade.flightrec import artifact_dir, list_artifacts, new_job_id
+from glade.idempotency import IdempotencyStore, derive_key
+from glade.optimize import optimize_pdf, should_optimize
+from glade.pdfdoc import PdfDocument, analyze_pdf, as_pdf_document, first_page_pdf
+from glade.ratelimit import glade_limiter
+from glade.scheduler import ClientScheduler
+from glade.session import UploadJob, glade_breaker, upload_documents
+from glade.workers import get_pool, run_in_pool
+
 load_dotenv()
 
 # ====== CONFIG ======
@@ -32,6 +52,9 @@ DEBUG_TRACES = os.getenv("DEBUG_TRACES", "true").lower() == "true"
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5")
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))              # requests per minute quota
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))           # tokens per minute quota
+OPENAI_MAX_IN_FLIGHT = int(os.getenv("OPENAI_MAX_IN_FLIGHT", "8"))
 
 # Prefer Edge on Windows (Chromium channel), user can override
 BROWSER_ENGINE = os.getenv("BROWSER_ENGINE", "chromium").lower()  # chromium|webkit|firefox
@@ -128,7 +151,11 @@ Return **only** the filename on a single line, with no `.pdf` extension.
 
 
 # Lazily-initialized globals
-_openai_client = None
+_naming_service = None
+_naming_lock = threading.Lock()
+_idempotency = IdempotencyStore()
+_deadletters = DeadLetterStore()
+_openai_breaker = None
 
 # ====== UTILITIES ======
 def _exc_details() -> str:
@@ -148,12 +175,6 @@ def parse_name_email_from_subject(subject: str) -> Tuple[Optional[str], Optional
     email = m2.group(1) if m2 else None
     return name, email
 
-def _download_to_bytes(url: str, timeout: int = 60) -> Tuple[bytes, Optional[str]]:
-    with httpx.Client(follow_redirects=True, timeout=timeout) as client:
-        r = client.get(url)
-        r.raise_for_status()
-        return r.content, r.headers.get("content-type")
-
 def _guess_ext_from_mime(mime: Optional[str]) -> str:
     if not mime:
         return ""
@@ -178,136 +199,164 @@ def _guess_ext_from_mime(mime: Optional[str]) -> str:
 
 # ---- Conversions (lazy imports inside) ----
 def convert_any_to_pdf(tmpdir: str, in_bytes: bytes, filename: str, mime: Optional[str]) -> str:
-    print(f"[DEBUG] convert_any_to_pdf: filename={filename}, mime={mime}, size={len(in_bytes)}")
-    print(f"[DEBUG] First 16 bytes: {in_bytes[:16].hex()}")
+    """Bytes entry point for callers that already hold the payload in memory."""
+    in_path = os.path.join(tmpdir, f"in_{uuid.uuid4().hex}.bin")
+    with open(in_path, "wb") as f:
+        f.write(in_bytes)
+    return convert_handle_to_pdf(tmpdir, DocumentHandle(in_path), filename, mime)
 
-    base_name = os.path.splitext(filename)[0] or f"file_{uuid.uuid4().hex}"
+def convert_handle_to_pdf(tmpdir: str, src: DocumentHandle, filename: str, mime: Optional[str]) -> str:
+    """Convert a file already on disk; the source is renamed in place, never re-read into memory."""
+    head = src.head(16)
+    print(f"[DEBUG] convert_handle_to_pdf: filename={filename}, mime={mime}, size={src.size}")
+    print(f"[DEBUG] First 16 bytes: {head.hex()}")
+
+    base_name = os.path.splitext(safe_filename(filename, default=""))[0] or f"file_{uuid.uuid4().hex}"
     ext = (os.path.splitext(filename)[1] or _guess_ext_from_mime(mime) or "").lower()
 
     # Magic sniff if no good ext
     if not ext:
-        if in_bytes.startswith(b"%PDF"):
+        if head.startswith(b"%PDF"):
             ext = ".pdf"
             print("[DEBUG] Detected PDF from magic header")
-        elif in_bytes[:2] == b"\xff\xd8":
+        elif head[:2] == b"\xff\xd8":
             ext = ".jpg"
             print("[DEBUG] Detected JPEG from magic header")
-        elif in_bytes[:4] == b"\x89PNG":
+        elif head[:4] == b"\x89PNG":
             ext = ".png"
             print("[DEBUG] Detected PNG from magic header")
-        elif in_bytes[:2] == b"PK":
-            ext = ".docx"
-            print("[DEBUG] Detected ZIP container (assuming DOCX)")
+        elif head[:2] == b"PK":
+            ext = zip_document_ext(src.path)
+            if ext is None:
+                raise RuntimeError("ZIP archive is not a document (nested archives are not expanded)")
+            print(f"[DEBUG] Detected Office package ({ext}) from ZIP contents")
         else:
             raise RuntimeError("Unsupported file type (no extension and magic header not recognized)")
 
     src_path = os.path.join(tmpdir, base_name + ext)
-    with open(src_path, "wb") as f:
-        f.write(in_bytes)
+    if os.path.abspath(src.path) != os.path.abspath(src_path):
+        os.replace(src.path, src_path)
+        src.path = os.path.abspath(src_path)
 
     if ext == ".pdf":
         print(f"[DEBUG] Saved PDF to {src_path}")
         return src_path
 
-    if ext in (".jpg", ".jpeg", ".png", ".heic", ".tif", ".tiff", ".gif", ".bmp", ".webp"):
-        from PIL import Image
-        try:
-            import pillow_heif
-            pillow_heif.register_heif_opener()
-        except Exception:
-            pass
-        img = Image.open(io.BytesIO(in_bytes)).convert("RGB")
+    if ext in IMAGE_EXTS:
+        # Lean mode: JPEG passthrough / EXIF-aware downscale, multi-frame -> multi-page (IMAGE_PDF_MODE)
         out_pdf = os.path.join(tmpdir, base_name + ".pdf")
-        img.save(out_pdf, "PDF", resolution=200.0)
+        run_in_pool(image_to_pdf, src_path, out_pdf)
         print(f"[DEBUG] Converted image -> PDF at {out_pdf}")
         return out_pdf
 
-    if ext in (".doc", ".docx"):
-        try:
-            from docx2pdf import convert as docx2pdf_convert
-        except Exception:
-            raise RuntimeError("docx2pdf not available (requires MS Word on Windows).")
+    if ext in OFFICE_EXTS:
+        # Warm headless LibreOffice pool on Linux, docx2pdf on Windows (OFFICE_CONVERTER)
         out_pdf = os.path.join(tmpdir, base_name + ".pdf")
-        docx2pdf_convert(src_path, out_pdf)
-        if not os.path.exists(out_pdf):
-            raise RuntimeError("DOC/DOCX convert failed (no output PDF).")
-        print(f"[DEBUG] Converted Word -> PDF at {out_pdf}")
+        office_to_pdf(src_path, out_pdf)
+        print(f"[DEBUG] Converted Office document -> PDF at {out_pdf}")
         return out_pdf
 
     raise RuntimeError(f"Unsupported file type for conversion: {ext}")
 
 def pdf_first_page_only(pdf_path: str, tmpdir: str) -> str:
-    from PyPDF2 import PdfReader, PdfWriter
-    reader = PdfReader(pdf_path)
-    if len(reader.pages) == 0:
-        raise RuntimeError("Empty PDF.")
-    writer = PdfWriter()
-    writer.add_page(reader.pages[0])
-    out_path = os.path.join(tmpdir, f"{uuid.uuid4().hex}_page1.pdf")
-    with open(out_path, "wb") as f:
-        writer.write(f)
+    out_path = run_in_pool(first_page_pdf, pdf_path, tmpdir)
     print(f"[DEBUG] First-page-only PDF at {out_path}")
     return out_path
 
-def extract_text_first_page(pdf_path: str, max_chars: int = 3000) -> str:
+def extract_text_first_page(doc: Union[str, PdfDocument], max_chars: int = 3000) -> str:
     try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(pdf_path)
-        if not reader.pages:
-            return ""
-        text = reader.pages[0].extract_text() or ""
-        text = re.sub(r"\s+", " ", text).strip()
-        print(f"[DEBUG] Extracted {len(text)} chars from first page")
-        return text[:max_chars]
+        doc = as_pdf_document(doc)
+        text = doc.first_page_text(max_chars=max_chars)
+        print(f"[DEBUG] Extracted {len(text)} chars from first page (backend={doc.text_backends.get(0)})")
+        return text
     except Exception as e:
         print(f"[WARN] extract_text_first_page failed: {e}")
         return ""
 
-def _get_openai_client():
-    global _openai_client
-    if _openai_client is None and OPENAI_API_KEY:
-        try:
-            from openai import OpenAI
-            _openai_client = OpenAI(api_key=OPENAI_API_KEY)
-        except Exception:
-            _openai_client = None
-    return _openai_client
-
-def openai_name_document_from_first_page(page1_pdf_path: str) -> str:
-    client = _get_openai_client()
-    if client is None:
+def optimize_for_upload(pdf_path: str) -> Optional[dict]:
+    """Optional pre-upload shrink (recompress, dedupe, downsample, linearize); logs bytes saved."""
+    if not should_optimize(pdf_path):
+        return None
+    try:
+        stats = run_in_pool(optimize_pdf, pdf_path)
+    except Exception as e:
+        print(f"[WARN] PDF optimize failed: {e}")
+        return None
+    print(
+        f"[DEBUG] PDF optimize: applied={stats['applied']} "
+        f"{stats['bytes_before']} -> {stats['bytes_after']} bytes (saved {stats['bytes_saved']}) "
+        f"in {stats['ms']} ms {stats['reason']}".rstrip()
+    )
+    return stats
+
+def _get_openai_breaker() -> CircuitBreaker:
+    global _openai_breaker
+    if _openai_breaker is None:
+        from glade.config import OPENAI_BREAKER_SLOW_SECONDS
+        _openai_breaker = CircuitBreaker("openai", slow_seconds=OPENAI_BREAKER_SLOW_SECONDS)
+    return _openai_breaker
+
+def _get_naming_service():
+    """Shared async naming service (one AsyncOpenAI client for all request threads)."""
+    global _naming_service
+    if _naming_service is None and OPENAI_API_KEY:
+        with _naming_lock:
+            if _naming_service is None:
+                try:
+                    from glade.naming import NamingService
+                    _naming_service = NamingService(
+                        api_key=OPENAI_API_KEY,
+                        model=OPENAI_MODEL,
+                        prompt=OPENAI_NAMING_PROMPT,
+                        rpm=OPENAI_RPM,
+                        tpm=OPENAI_TPM,
+                        max_in_flight=OPENAI_MAX_IN_FLIGHT,
+                    )
+                except Exception:
+                    _naming_service = None
+    return _naming_service
+
+def openai_name_document_from_first_page(doc: Union[str, PdfDocument]) -> str:
+    service = _get_naming_service()
+    if service is None:
         print("[DEBUG] OpenAI disabled or not available; using UnrecognizableDoc")
         return "UnrecognizableDoc"
 
-    text = extract_text_first_page(page1_pdf_path, max_chars=3000) or "(No extractable text)"
+    from glade.config import MIN_NAMING_CHARS
+    from glade.ocr import ensure_page_text
+    doc = as_pdf_document(doc)
     try:
-        # Newer models require max_completion_tokens instead of max_tokens
-        resp = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You name legal intake documents succinctly."},
-                {"role": "user", "content": f"{OPENAI_NAMING_PROMPT}\n\nFirst page text:\n{text}\n"}
-            ],
-            temperature=1.0,
-            max_completion_tokens=2000,
-        )
-        title = (resp.choices[0].message.content or "").strip()
-        title = re.sub(r"[\r\n]+", " ", title).strip()
-        if not title:
-            title = "UnrecognizableDoc"
-        title = re.sub(r"[.:\-;,\s]+$", "", title).strip()
-        title = title[:120] or "UnrecognizableDoc"
-        print(f"[DEBUG] OpenAI proposed title: {title}")
-        return title
+        # Image-only first pages (photos, scans) fall back to local OCR
+        text = ensure_page_text(doc, 0, min_chars=MIN_NAMING_CHARS)[:3000]
     except Exception as e:
+        print(f"[WARN] first-page text failed: {e}")
+        text = ""
+    print(f"[DEBUG] Naming text: {len(text)} chars (backend={doc.text_backends.get(0)})")
+    if len(text) < MIN_NAMING_CHARS:
+        # Nothing for the model to read; skip the call instead of paying for UnrecognizableDoc
+        print("[DEBUG] No usable first-page text; skipping OpenAI and using UnrecognizableDoc")
+        return "UnrecognizableDoc"
+
+    breaker = _get_openai_breaker()
+    if not breaker.acquire():
+        print("[WARN] OpenAI circuit open; using UnrecognizableDoc without calling the API")
+        return "UnrecognizableDoc"
+    t0 = time.monotonic()
+    try:
+        title = service.name_sync(text)
+    except Exception as e:
+        breaker.record(False, time.monotonic() - t0, reason=f"{type(e).__name__}: {e}"[:200])
         print(f"[WARN] OpenAI naming failed: {e}")
         return "UnrecognizableDoc"
+    breaker.record(True, time.monotonic() - t0)
+    print(f"[DEBUG] OpenAI proposed title: {title}")
+    return title
 
-def ensure_doc_title(doc_name_from_zap: Optional[str], page1_pdf_path: str) -> str:
+def ensure_doc_title(doc_name_from_zap: Optional[str], doc: Union[str, PdfDocument]) -> str:
     if doc_name_from_zap and doc_name_from_zap.strip():
         print(f"[DEBUG] Using doc_name from Zap: {doc_name_from_zap.strip()}")
         return doc_name_from_zap.strip()
-    return openai_name_document_from_first_page(page1_pdf_path)
+    return openai_name_document_from_first_page(doc)
 
 
 def _launch_browser(pw):
@@ -333,211 +382,246 @@ def attempt_glade_upload(
     client_email: str,
     client_name: str,
     doc_title: str,            # AI-proposed human title (used for FILE name)
-    upload_bytes: bytes,
-    upload_filename: str,
-    upload_mime: str,
+    upload_bytes: Optional[bytes] = None,
+    upload_filename: str = "upload.pdf",
+    upload_mime: str = "application/pdf",
+    upload_path: Optional[str] = None,   # preferred: file on disk, handed to the browser by path
 ):
     """
     Returns (success, error_message). Self-contained Playwright + Glade flow.
 
-    Uses _ALLOWED_LABELS from glade.documents to choose the checklist bucket.
+    Uses the shared classification engine (glade.classify) to choose the checklist bucket.
     The uploaded FILE name still uses the AI-proposed title (sanitized .pdf).
     """
-    import os, re, difflib
-
-    def _safe_pdf_name(title: str) -> str:
-        t = re.sub(r"\s+", " ", (title or "").strip())
-        t = re.sub(r'[\\/:*?"<>|]+', "", t)
-        t = t[:120].rstrip(" .")
-        if not t:
-            t = "Document"
-        if not re.search(r"\.pdf$", t, re.I):
-            t = f"{t}.pdf"
-        return t
-
-    def _normalize_to_allowed_label(raw_label: str, allowed: list[str]) -> str:
-        """Map any classifier/raw label to one of the allowed labels."""
-        if not raw_label:
-            return "UnrecognizedDocs"
-
-        rl = raw_label.strip().lower()
-
-        # 1) Exact (case-insensitive)
-        for lab in allowed:
-            if rl == lab.lower():
-                return lab
-
-        # 2) Synonym/contains mapping
-        synonyms = {
-            "bank statement": "Bank Statements",
-            "bank statements": "Bank Statements",
-            "bank": "Bank Statements",
-            "vehicle": "Vehicle Info",
-            "vehicle info": "Vehicle Info",
-            "vehicles": "Vehicle Info",
-            "income": "Income",
-            "pay stub": "Income",
-            "pay stubs": "Income",
-            "paystub": "Income",
-            "paystubs": "Income",
-            "tax return": "Tax Returns",
-            "tax returns": "Tax Returns",
-            "lawsuit": "Lawsuits",
-            "lawsuits": "Lawsuits",
-            "lease": "Lease",
-            "mortgage": "Home/Rent Information",
-            "rent": "Home/Rent Information",
-            "credit card": "Credit Cards",
-            "credit cards": "Credit Cards",
-            "utility": "Utility",
-            "utilities": "Utility",
-            "credit counseling certificate": "Credit Counseling Certificate",
-            "home/rent information": "Home/Rent Information",
-            "identification": "Identification",
-            "retirement": "Retirement & Insurance",
-            "insurance": "Retirement & Insurance",
-            "medical": "Medical Bills",
-            "client form": "Client Forms",
-            "client forms": "Client Forms",
-            "unrecognizable": "UnrecognizedDocs",
-            "unrecognizeable": "UnrecognizedDocs",
-        }
-        for key, target in synonyms.items():
-            if key in rl:
-                for lab in allowed:
-                    if lab.lower() == target.lower():
-                        return lab
+    print("[DEBUG] Starting Playwright + Glade upload sequence...")
+    job = UploadJob(doc_title=doc_title, upload_path=upload_path, upload_bytes=upload_bytes, upload_mime=upload_mime)
+    return schedule_upload(client_email, client_name, [job])[0]
+
+def _client_key(client_email: str, client_name: str) -> str:
+    return (client_email or client_name or "").strip().lower()
+
+# Every browser session goes through here: serialized per client (two sessions on one
+# checklist race each other), clients run in parallel up to MAX_BROWSER_CONTEXTS
+_upload_scheduler = ClientScheduler()
+# ADAPTIVE_CONCURRENCY: that limit becomes a ceiling, tuned from observed browser step latency/errors
+_concurrency = AimdController(_upload_scheduler) if ADAPTIVE_CONCURRENCY else None
+
+def schedule_upload(client_email: str, client_name: str, jobs: list, group_by_bucket: bool = False) -> list:
+    key = _client_key(client_email, client_name) or f"anonymous:{uuid.uuid4().hex}"
+    kwargs = {"group_by_bucket": group_by_bucket}
+    if _concurrency is not None:
+        kwargs["observer"] = _concurrency.observe
+    return _upload_scheduler.run(key, upload_documents, client_email, client_name, jobs, **kwargs)
+
+def _run_client_batch(owner: Tuple[str, str], jobs: list) -> list:
+    client_email, client_name = owner
+    return schedule_upload(client_email, client_name, jobs)
+
+# Same-client uploads arriving within UPLOAD_BATCH_WINDOW_SECONDS share one browser session
+_upload_batcher = ClientBatcher(_run_client_batch)
+
+def reserve_upload_slot(client_email: str, client_name: str) -> Optional[UploadSlot]:
+    """Join the client's upload batch on arrival, so the window overlaps conversion and naming."""
+    key = _client_key(client_email, client_name)
+    return _upload_batcher.reserve(key, (client_email, client_name)) if key else None
+
+def upload_for_client(client_email: str, client_name: str, job: UploadJob,
+                      slot: Optional[UploadSlot] = None) -> Tuple[bool, Optional[str]]:
+    if slot is not None:
+        return slot.submit(job)
+    key = _client_key(client_email, client_name)
+    if not key:
+        return attempt_glade_upload(client_email, client_name, job.doc_title, upload_bytes=job.upload_bytes,
+                                    upload_mime=job.upload_mime, upload_path=job.upload_path)
+    return _upload_batcher.submit(key, (client_email, client_name), job)
 
-        # 3) Fuzzy closest match to any allowed label
-        best = difflib.get_close_matches(raw_label, allowed, n=1, cutoff=0.0)
-        if best:
-            return best[0]
+# ====== FASTAPI ======
+app = FastAPI()
 
-        return "UnrecognizedDocs"
+# Workspaces left behind by a crashed previous run
+sweep_stale_workspaces()
 
-    browser = None
-    context = None
+@app.get("/")
+def health():
+    breakers = {"glade": glade_breaker.stats(), "openai": _get_openai_breaker().stats()}
+    return {
+        "ok": True,
+        "degraded": any(b["state"] != "closed" for b in breakers.values()),
+        "breakers": breakers,
+        "convert_pool": get_pool().stats(),
+        "idempotency": _idempotency.stats(),
+        "upload_batches": _upload_batcher.stats(),
+        "upload_scheduler": _upload_scheduler.stats(),
+        "dead_letters": _deadletters.stats(),
+        "glade_rate_limits": glade_limiter().stats(),
+        "concurrency": _concurrency.stats() if _concurrency is not None else {
+            "current": _upload_scheduler.stats()["active"], "target": _upload_scheduler.limit, "adaptive": False,
+        },
+    }
+
+def _prepare_document(ws: Workspace, src: DocumentHandle, in_name: str, in_mime: str, doc_name: Optional[str]) -> dict:
+    """Convert, parse, name, classify and optimize one ingested document (no browser)."""
+    timings = {}
+    t0 = time.monotonic()
+    pdf_path = convert_handle_to_pdf(ws.path, src, in_name, in_mime)
+    ws.check_quota()
+    timings["convert_ms"] = _ms_since(t0)
+    print(f"[DEBUG] PDF ready at {pdf_path} (size={os.path.getsize(pdf_path)} bytes)")
+    # Parse once (in the conversion pool); page-1 text is read straight from the source
+    t0 = time.monotonic()
+    doc = PdfDocument.from_analysis(pdf_path, run_in_pool(analyze_pdf, pdf_path))
+    if doc.page_count == 0:
+        raise RuntimeError("Empty PDF.")
+    timings["parse_ms"] = _ms_since(t0)
+    print(f"[DEBUG] PDF pages={doc.page_count}")
+
+    from glade.classify import classify_for_checklist
+    t0 = time.monotonic()
+    proposed_title = ensure_doc_title(doc_name, doc)
+    _ignored, checklist_title = classify_for_checklist(proposed_title)
+    timings["name_ms"] = _ms_since(t0)
+    print(f"[DEBUG] Proposed title: '{proposed_title}', checklist title: '{checklist_title}'")
+
+    t0 = time.monotonic()
+    optimize_for_upload(pdf_path)
+    timings["optimize_ms"] = _ms_since(t0)
+    return {"pdf_path": pdf_path, "proposed_title": proposed_title, "checklist_title": checklist_title,
+            "timings": timings}
+
+def _ms_since(t0: float) -> int:
+    return int((time.monotonic() - t0) * 1000)
+
+def _dead_letter(client_email: str, client_name: str, prepared: dict, err: Optional[str],
+                 source: Optional[str], job_id: Optional[str]) -> Optional[str]:
+    """Keep a failed upload's PDF and metadata for `python -m glade.deadletter replay`."""
+    if not DEADLETTER_ENABLED:
+        return None
     try:
-        print("[DEBUG] Starting Playwright + Glade upload sequence...")
-        from playwright.sync_api import sync_playwright
-        from glade.classify import classify_for_checklist
-        from glade.auth import fast_login
-        from glade.navigation import (
-            open_workflows,
-            search_and_open_client_by_email,
-            search_and_open_client_by_name,
-            open_documents_and_discussion_then_documents,
-            _press_continue_uploading_if_present,  # NEW
-        )
-        # Import ALLOWED_LABELS from documents so we use the single source of truth
-        from glade.documents import (
-            _ALLOWED_LABELS as DOC_ALLOWED_LABELS,
-            enter_documents_passcode_1111,
-            open_initial_documents_checklist,
-            add_document_and_upload,
+        return _deadletters.put(
+            client_email, client_name, prepared["pdf_path"], prepared["proposed_title"], err or "",
+            bucket=prepared.get("checklist_title"), timings=prepared.get("timings"), source=source, job_id=job_id,
         )
+    except Exception as e:
+        print(f"[WARN] Could not dead-letter failed upload: {e}")
+        return None
 
-        headless = os.getenv("HEADLESS", "false").lower() in ("1", "true", "yes")
-        slow_mo = int(os.getenv("SLOW_MO", "0") or "0")
-        engine = os.getenv("BROWSER_ENGINE", "chromium").lower()
-        channel = os.getenv("BROWSER_CHANNEL", "msedge")
+def _prepare_split(ws: Workspace, src: DocumentHandle, in_name: str, in_mime: str, doc_name: Optional[str]) -> list:
+    """
+    Split mode: classify every page, cut the PDF where the label changes and prepare each
+    run of pages as its own document. `doc_name` is only used when nothing was split off.
+    """
+    from glade.classify import classify_for_checklist
+    from glade.split import page_texts, segment_pages, write_segments
 
-        with sync_playwright() as p:
-            # Launch
-            if engine == "chromium":
-                try:
-                    browser = p.chromium.launch(channel=channel, headless=headless, slow_mo=slow_mo)
-                except Exception:
-                    browser = p.chromium.launch(headless=headless, slow_mo=slow_mo)
-            elif engine == "firefox":
-                browser = p.firefox.launch(headless=headless, slow_mo=slow_mo)
-            else:
-                browser = p.webkit.launch(headless=headless, slow_mo=slow_mo)
-
-            context = browser.new_context(viewport={"width": 1400, "height": 900})
-            page = context.new_page()
-
-            # Login & land on workflows
-            fast_login(page)
-            try:
-                page.wait_for_load_state("networkidle", timeout=5000)
-            except Exception:
-                pass
-            open_workflows(page)
-
-            # Select client: email first (TAB×2 flow), then name fallback
-            client_found = False
-            try:
-                print(f"[DEBUG] Searching client by email: {client_email}")
-                search_and_open_client_by_email(page, client_email)
-                client_found = True
-            except Exception as e:
-                print(f"[DEBUG] Email search failed: {e}. Trying by name: {client_name}")
-                try:
-                    search_and_open_client_by_name(page, client_name)
-                    client_found = True
-                except Exception as e2:
-                    print(f"[DEBUG] Name search failed: {e2}")
-                    client_found = False
-
-            if not client_found:
-                return False, "Client profile not found"
-
-            # Documents tab
-            page.wait_for_timeout(900)
-            open_documents_and_discussion_then_documents(page)
-
-            # Passcode (if present) + checklist
-            enter_documents_passcode_1111(page)
-            open_initial_documents_checklist(page)
-
-            # NEW: Dismiss any blocking "Continue Uploading" overlay immediately
-            try:
-                if _press_continue_uploading_if_present(page):
-                    print('[DEBUG] "Continue Uploading" overlay dismissed')
-            except Exception:
-                pass
-
-            # Classifier → normalized to allowed label
-            _ignored, raw_bucket = classify_for_checklist(doc_title)
-            checklist_bucket = _normalize_to_allowed_label(raw_bucket or doc_title, list(DOC_ALLOWED_LABELS))
-            print(f"[DEBUG] Classifier bucket='{raw_bucket}' → normalized bucket='{checklist_bucket}'")
-
-            # FILE name uses AI-proposed title
-            final_upload_name = _safe_pdf_name(doc_title)
-            print(f"[DEBUG] Using upload filename: {final_upload_name}")
-
-            payload = {
-                "name": final_upload_name,                     # visible file name in Glade
-                "mimeType": upload_mime or "application/pdf",
-                "buffer": upload_bytes,
+    pdf_path = convert_handle_to_pdf(ws.path, src, in_name, in_mime)
+    ws.check_quota()
+    info = run_in_pool(analyze_pdf, pdf_path, ())
+    if info["page_count"] == 0:
+        raise RuntimeError("Empty PDF.")
+    texts = page_texts(pdf_path, info["page_count"], content_hash=src.sha256)
+    segments = segment_pages(texts)
+    print(f"[DEBUG] Split {in_name}: {info['page_count']} pages -> "
+          + ", ".join(f"{s.start + 1}-{s.end + 1} {s.label}" for s in segments))
+    if len(segments) == 1:
+        parts = [pdf_path]
+    else:
+        parts = run_in_pool(write_segments, pdf_path, [(s.start, s.end) for s in segments], ws.path)
+        ws.check_quota()
+
+    def _name(i: int) -> dict:
+        seg, part = segments[i], parts[i]
+        # Page text is already known; the part is only re-read if naming needs OCR
+        doc = PdfDocument.from_analysis(part, {
+            "page_count": seg.end - seg.start + 1,
+            "metadata": info.get("metadata"),
+            "texts": {0: (texts[seg.start], "split")},
+        })
+        proposed_title = ensure_doc_title(doc_name if len(segments) == 1 else None, doc)
+        _ignored, checklist_title = classify_for_checklist(proposed_title)
+        print(f"[DEBUG] Pages {seg.start + 1}-{seg.end + 1}: '{proposed_title}' -> '{checklist_title}'")
+        optimize_for_upload(part)
+        return {"pdf_path": part, "proposed_title": proposed_title, "checklist_title": checklist_title,
+                "pages": f"{seg.start + 1}-{seg.end + 1}"}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(parts), BATCH_PREPARE_WORKERS))) as pool:
+        return list(pool.map(_name, range(len(parts))))
+
+def _prepare_item(item: dict) -> list:
+    """Prepared documents for one ingested item (several in split mode)."""
+    args = (item["ws"], item["src"], item["in_name"], item["in_mime"], item.get("doc_name"))
+    if item.get("split"):
+        return _prepare_split(*args)
+    return [_prepare_document(*args)]
+
+def _process_ingested(
+    ws: Workspace,
+    src: DocumentHandle,
+    in_name: str,
+    in_mime: str,
+    client_email: str,
+    client_name: Optional[str],
+    doc_name: Optional[str],
+    source: str,
+    slot: Optional[UploadSlot] = None,
+) -> dict:
+    """
+    Convert + name + upload one ingested document; returns the response body. Cleans up `ws`.
+    `slot` is the upload batch place reserved when the request arrived.
+    """
+    job_id = new_job_id()
+    try:
+        prepared = _prepare_document(ws, src, in_name, in_mime, doc_name)
+        pdf_path = prepared["pdf_path"]
+        proposed_title = prepared["proposed_title"]
+        checklist_title = prepared["checklist_title"]
+
+        t0 = time.monotonic()
+        success, err = upload_for_client(
+            client_email or "",
+            client_name or "",
+            UploadJob(doc_title=proposed_title, upload_path=pdf_path, job_id=job_id),
+            slot=slot,
+        )
+        prepared["timings"]["upload_ms"] = _ms_since(t0)
+
+        if success:
+            print(f"[INFO] Uploaded to Glade as '{checklist_title}' for {client_email or client_name}")
+            return {
+                "ok": True,
+                "matched_in_glade": True,
+                "item_title": checklist_title,
+                "proposed_title": proposed_title,
+                "received_filename": os.path.basename(pdf_path),
+                "source": source,
+                "job_id": job_id,
             }
 
-            # Use the normalized BUCKET as the checklist section to upload into
-            add_document_and_upload(page, checklist_bucket, payload)
+        print(f"[WARN] Glade upload failed/not matched. Reason: {err}")
+        dead_letter_id = _dead_letter(client_email, client_name, prepared, err, source, job_id)
+        return {
+            "ok": False,
+            "matched_in_glade": False,
+            "error": "Client profile not found",
+            "detail": err or "",
+            "item_title": checklist_title,
+            "proposed_title": proposed_title,
+            "received_filename": os.path.basename(pdf_path),
+            "job_id": job_id,
+            "artifacts": f"/jobs/{job_id}/artifacts",
+            "dead_letter_id": dead_letter_id,
+        }
 
-            print("[DEBUG] Upload to Glade completed")
-            return True, None
-    except Exception as e:
-        return False, str(e)
+    except Exception:
+        err = _exc_details()
+        print("[ERROR] Pipeline failed:\n", err)
+        return {
+            "ok": False,
+            "matched_in_glade": False,
+            "error": "Client profile not found",
+            "detail": err,
+        }
     finally:
-        try:
-            if context:
-                context.close()
-        except Exception:
-            pass
-        try:
-            if browser:
-                browser.close()
-        except Exception:
-            pass
-        
-# ====== FASTAPI ======
-app = FastAPI()
-
-@app.get("/")
-def health():
-    return {"ok": True}
+        ws.cleanup()
 
 @app.post("/process-doc")
 def process_doc(
@@ -547,7 +631,9 @@ def process_doc(
     doc_name: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
     file_url: Optional[str] = Form(None),
+    split: Optional[bool] = Form(None),
     x_zap_secret: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
 ):
     # Auth
     if ZAP_SHARED_SECRET and x_zap_secret != ZAP_SHARED_SECRET:
@@ -562,7 +648,10 @@ def process_doc(
         "doc_name": doc_name,
         "file_present": bool(file),
         "file_url": file_url,
+        "split": split,
+        "idempotency_key": idempotency_key,
     }, indent=2))
+    split = SPLIT_MODE if split is None else split
 
     # Subject parse if needed
     if (not client_email or not client_name) and name_email_subject:
@@ -574,97 +663,310 @@ def process_doc(
         client_email = ""
         print("[WARN] Missing client_email; will still name but mark as not matched.")
 
-    # Read input bytes
+    # The batch window starts now; the slot is given up before any wait or path that doesn't upload through it
+    slot = reserve_upload_slot(client_email, client_name or "")
     try:
+        return _process_doc_input(client_email, client_name, doc_name, file, file_url, split, idempotency_key, slot)
+    finally:
+        if slot is not None:
+            slot.cancel()
+
+def _process_doc_input(
+    client_email: str,
+    client_name: Optional[str],
+    doc_name: Optional[str],
+    file: Optional[UploadFile],
+    file_url: Optional[str],
+    split: bool,
+    idempotency_key: Optional[str],
+    slot: Optional[UploadSlot],
+) -> JSONResponse:
+    """/process-doc after auth and client resolution: dedupe, ingest, then process."""
+    # A URL job can be keyed (and deduplicated) before downloading anything
+    key = idempotency_key.strip() if idempotency_key and idempotency_key.strip() else None
+    if key is None and file is None and file_url:
+        key = derive_key(client_email, file_url, doc_name)
+    entry, owner = (None, True)
+    if key is not None:
+        entry, owner = _idempotency.begin(key)
+        if not owner:
+            return _idempotent_response(key, entry, slot)
+
+    # Stream input to the per-request workspace (tmpfs, quota-enforced, always cleaned up).
+    # It is created inside the try so a mkdtemp failure still completes the idempotency
+    # entry instead of leaving it in flight (and retries answered 409) forever.
+    ws = None
+    try:
+        ws = Workspace(prefix="ingest_")
         if file is not None:
-            in_bytes = file.file.read()
             in_name = file.filename or "upload.bin"
             in_mime = file.content_type or "application/octet-stream"
+            src = ws.write_stream(in_name, file.file, mime=in_mime)
         elif file_url:
-            in_bytes, ctype = _download_to_bytes(file_url, timeout=120)
             parsed = urlparse(file_url)
             in_name = unquote(os.path.basename(parsed.path)) or "download.bin"
+            src, ctype = ws.download(file_url, in_name, timeout=120)
             in_mime = ctype or "application/octet-stream"
         else:
-            return JSONResponse({
+            ws.cleanup()
+            body = {
                 "ok": False, "matched_in_glade": False,
                 "error": "Client profile not found",
                 "detail": "Missing both file and file_url",
-            }, status_code=200)
+            }
+            if entry is not None:
+                _idempotency.complete(key, entry, body, ok=False)
+            return JSONResponse(body, status_code=200)
     except Exception as e:
         print(f"[ERROR] Download/read failed: {e}")
-        return JSONResponse({
+        if ws is not None:
+            ws.cleanup()
+        body = {
             "ok": False, "matched_in_glade": False,
             "error": "Client profile not found",
             "detail": f"fetch_failed: {e}",
-        }, status_code=200)
-
-    # Convert + name + upload
-    tmpdir = tempfile.mkdtemp(prefix="ingest_")
+        }
+        if entry is not None:
+            _idempotency.complete(key, entry, body, ok=False)
+        return JSONResponse(body, status_code=200)
+
+    # Binary uploads are keyed by content once they are on disk
+    if key is None:
+        key = derive_key(client_email, src.sha256, doc_name)
+        entry, owner = _idempotency.begin(key)
+        if not owner:
+            ws.cleanup()
+            return _idempotent_response(key, entry, slot)
+
+    body = {"ok": False, "matched_in_glade": False, "error": "Client profile not found", "detail": "aborted"}
     try:
-        pdf_path = convert_any_to_pdf(tmpdir, in_bytes, in_name, in_mime)
-        print(f"[DEBUG] PDF ready at {pdf_path} (size={os.path.getsize(pdf_path)} bytes)")
-        page1_pdf = pdf_first_page_only(pdf_path, tmpdir)
-
-        from glade.classify import classify_for_checklist
-        proposed_title = ensure_doc_title(doc_name, page1_pdf)
-        _ignored, checklist_title = classify_for_checklist(proposed_title)
-        print(f"[DEBUG] Proposed title: '{proposed_title}', checklist title: '{checklist_title}'")
-
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-
-        success, err = attempt_glade_upload(
-            client_email=client_email or "",
-            client_name=client_name or "",
-            doc_title=proposed_title,
-            upload_bytes=pdf_bytes,
-            upload_filename=(os.path.basename(pdf_path) or "upload.pdf"),
-            upload_mime="application/pdf",
+        kind = archive_kind(src.path, in_name, in_mime)
+        if kind is not None or split:
+            # ZIP/TAR members and split-off page runs each become their own document,
+            # uploaded in one browser session (not through the slot, so don't hold its batch)
+            if slot is not None:
+                slot.cancel()
+            results = _process_many(client_email, client_name or "", [{
+                "ws": ws, "src": src, "in_name": in_name, "in_mime": in_mime,
+                "source": in_name, "doc_name": None if kind else doc_name, "split": split,
+            }])
+            uploaded = sum(1 for r in results if r.get("ok"))
+            body = {
+                "ok": bool(results) and uploaded == len(results),
+                "matched_in_glade": uploaded > 0,
+                **({"archive": in_name} if kind else {"split": True}),
+                "uploaded": uploaded,
+                "total": len(results),
+                "results": results,
+            }
+            return JSONResponse(body, status_code=200)
+        body = _process_ingested(
+            ws, src, in_name, in_mime, client_email, client_name, doc_name,
+            source=("file:binary" if file is not None else "file:url"), slot=slot,
         )
+    finally:
+        _idempotency.complete(key, entry, body, ok=bool(body.get("ok")))
+    return JSONResponse(body, status_code=200)
+
+def _idempotent_response(key: str, entry, slot: Optional[UploadSlot] = None) -> JSONResponse:
+    """Attach to an in-flight job with the same key, or replay its stored result."""
+    # A duplicate never uploads, and the original may be in the very batch this slot is
+    # holding open, so give the slot up before waiting on it
+    if slot is not None:
+        slot.cancel()
+    print(f"[INFO] Duplicate request for idempotency key {key[:48]}; attaching to original job")
+    body = _idempotency.wait(entry, timeout=IDEMPOTENCY_WAIT_SECONDS)
+    if body is None:
+        return JSONResponse({
+            "ok": False, "matched_in_glade": False,
+            "error": "in_progress",
+            "detail": "A request with this idempotency key is still being processed",
+        }, status_code=409, headers={"Idempotent-Replayed": "false"})
+    return JSONResponse(body, status_code=200, headers={"Idempotent-Replayed": "true"})
+
+def _ingest_item(item: dict) -> None:
+    """Stream an uploaded file or URL into the item's workspace (no-op if already on disk)."""
+    if item.get("src") is not None:
+        return
+    ws = item["ws"]
+    if item.get("upload") is not None:
+        up = item["upload"]
+        item["in_name"] = up.filename or "upload.bin"
+        item["in_mime"] = up.content_type or "application/octet-stream"
+        item["src"] = ws.write_stream(item["in_name"], up.file, mime=item["in_mime"])
+    else:
+        parsed = urlparse(item["url"])
+        item["in_name"] = unquote(os.path.basename(parsed.path)) or "download.bin"
+        item["src"], ctype = ws.download(item["url"], item["in_name"], timeout=120)
+        item["in_mime"] = ctype or "application/octet-stream"
 
-        if success:
-            print(f"[INFO] Uploaded to Glade as '{checklist_title}' for {client_email or client_name}")
-            return JSONResponse({
-                "ok": True,
-                "matched_in_glade": True,
-                "item_title": checklist_title,
-                "proposed_title": proposed_title,
-                "received_filename": os.path.basename(pdf_path),
-                "source": ("file:binary" if file is not None else "file:url"),
-            }, status_code=200)
+def _expand_archive(item: dict, kind: str) -> list:
+    """One item per archive member, each in its own workspace; the archive's workspace is freed."""
+    members = []
 
-        print(f"[WARN] Glade upload failed/not matched. Reason: {err}")
-        return JSONResponse({
-            "ok": False,
-            "matched_in_glade": False,
-            "error": "Client profile not found",
-            "detail": err or "",
-            "item_title": checklist_title,
-            "proposed_title": proposed_title,
-            "received_filename": os.path.basename(pdf_path),
-        }, status_code=200)
+    def _target(member, name):
+        ws = Workspace(prefix="member_")
+        members.append({"ws": ws, "source": f"{item['source']}/{member.name}", "in_name": name,
+                        "in_mime": "application/octet-stream", "doc_name": None, "split": item.get("split")})
+        return ws.new_path(name)
 
+    try:
+        extracted = extract_members(item["src"].path, kind, _target)
     except Exception:
-        err = _exc_details()
-        print("[ERROR] Pipeline failed:\n", err)
-        return JSONResponse({
-            "ok": False,
-            "matched_in_glade": False,
-            "error": "Client profile not found",
-            "detail": err,
-        }, status_code=200)
+        for m in members:
+            m["ws"].cleanup()
+        raise
     finally:
-        try:
-            shutil.rmtree(tmpdir, ignore_errors=True)
-        except Exception:
-            pass
-
-
-
-
-
+        item["ws"].cleanup()
+    for m, (_member, path) in zip(members, extracted):
+        m["src"] = m["ws"].handle(path, name=m["in_name"])
+    print(f"[DEBUG] Archive {item['source']}: {len(members)} member(s) extracted")
+    return members
 
+def _process_many(client_email: str, client_name: str, items: list) -> list:
+    """
+    Shared by /process-batch and archive uploads: ingest every item, fan archives out into
+    their members, convert/name them concurrently, then upload everything in one browser
+    session with same-bucket documents sharing a file chooser. Returns per-document results.
+    Each item has a Workspace under "ws" (cleaned up here) plus "upload", "url" or "src".
+    """
+    results: list = []
+    ready: list = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, BATCH_PREPARE_WORKERS)) as pool:
+            # 1) ingest (downloads in parallel)
+            for item, fut in [(it, pool.submit(_ingest_item, it)) for it in items]:
+                try:
+                    fut.result()
+                except Exception as e:
+                    print(f"[ERROR] Fetch failed for {item['source']}: {e}")
+                    results.append({"source": item["source"], "ok": False, "error": "fetch_failed", "detail": str(e)})
+                    continue
+                # 2) archives fan out into members
+                kind = archive_kind(item["src"].path, item["in_name"], item["in_mime"])
+                if kind is None:
+                    ready.append(item)
+                    continue
+                try:
+                    members = _expand_archive(item, kind)
+                except Exception as e:
+                    print(f"[ERROR] Archive rejected {item['source']}: {e}")
+                    results.append({"source": item["source"], "ok": False, "error": "archive_rejected",
+                                    "detail": str(e)})
+                    continue
+                items.extend(members)   # so they are cleaned up below
+                ready.extend(members)
+
+            # 3) convert + name in parallel (split mode may yield several documents per item)
+            futures = [(item, pool.submit(_prepare_item, item)) for item in ready]
+            prepared = []
+            for item, fut in futures:
+                try:
+                    prepared.extend((item, p) for p in fut.result())
+                except Exception:
+                    err = _exc_details()
+                    print(f"[ERROR] Prepare failed for {item['source']}:\n", err)
+                    results.append({"source": item["source"], "ok": False, "error": "prepare_failed", "detail": err})
+
+        # 4) one browser session; same-bucket documents share a file chooser
+        jobs = [UploadJob(doc_title=p["proposed_title"], upload_path=p["pdf_path"], job_id=new_job_id())
+                for _, p in prepared]
+        t0 = time.monotonic()
+        outcomes = schedule_upload(client_email, client_name or "", jobs, group_by_bucket=True) if jobs else []
+        upload_ms = _ms_since(t0)
+        for (item, p), job, (success, err) in zip(prepared, jobs, outcomes):
+            dead_letter_id = None
+            if not success:
+                p.setdefault("timings", {})["upload_ms"] = upload_ms
+                dead_letter_id = _dead_letter(client_email, client_name, p, err, item["source"], job.job_id)
+            results.append({
+                "source": item["source"],
+                "ok": success,
+                "matched_in_glade": success,
+                "item_title": p["checklist_title"],
+                "proposed_title": p["proposed_title"],
+                "received_filename": os.path.basename(p["pdf_path"]),
+                **({"pages": p["pages"]} if "pages" in p else {}),
+                "job_id": job.job_id,
+                **({} if success else {"error": "Client profile not found", "detail": err or "",
+                                       "artifacts": f"/jobs/{job.job_id}/artifacts",
+                                       "dead_letter_id": dead_letter_id}),
+            })
+    finally:
+        for item in items:
+            item["ws"].cleanup()
+    return results
 
+@app.post("/process-batch")
+def process_batch(
+    client_email: Optional[str] = Form(None),
+    client_name: Optional[str] = Form(None),
+    name_email_subject: Optional[str] = Form(None),
+    files: Optional[List[UploadFile]] = File(None),
+    file_urls: Optional[List[str]] = Form(None),
+    doc_names: Optional[List[str]] = Form(None),   # optional, positional: files first, then file_urls
+    split: Optional[bool] = Form(None),
+    x_zap_secret: Optional[str] = Header(None),
+):
+    """
+    Many documents for one client in one request. Conversion and naming run concurrently;
+    the browser navigates to the client once and documents sharing a checklist bucket are
+    uploaded through one file chooser. ZIP/TAR entries are expanded into their members;
+    with `split` (default SPLIT_MODE) bundled scans are cut at classification boundaries.
+    Returns a per-document result array.
+    """
+    if ZAP_SHARED_SECRET and x_zap_secret != ZAP_SHARED_SECRET:
+        raise HTTPException(status_code=401, detail="bad secret")
 
+    if (not client_email or not client_name) and name_email_subject:
+        nm, em = parse_name_email_from_subject(name_email_subject)
+        client_name = client_name or nm
+        client_email = client_email or em
+    client_email = client_email or ""
+
+    items = [{"upload": f, "source": f.filename or "upload.bin"} for f in (files or [])]
+    items += [{"url": u, "source": u} for u in (file_urls or []) if u and u.strip()]
+    print(f"\n[DEBUG] /process-batch request: client={client_email or client_name} items={len(items)}")
+    if not items:
+        return JSONResponse({"ok": False, "error": "Missing files and file_urls", "results": []}, status_code=200)
+    if len(items) > BATCH_MAX_FILES:
+        return JSONResponse({"ok": False, "error": f"Too many files (max {BATCH_MAX_FILES})", "results": []},
+                            status_code=200)
+
+    names = list(doc_names or [])
+    for i, item in enumerate(items):
+        item["doc_name"] = (names[i].strip() or None) if i < len(names) else None
+        item["ws"] = Workspace(prefix="batch_")
+        item["split"] = SPLIT_MODE if split is None else split
+
+    results = _process_many(client_email, client_name or "", items)
+    uploaded = sum(1 for r in results if r.get("ok"))
+    print(f"[INFO] /process-batch: {uploaded}/{len(results)} uploaded for {client_email or client_name}")
+    return JSONResponse({
+        "ok": bool(results) and uploaded == len(results),
+        "uploaded": uploaded,
+        "total": len(results),
+        "results": results,
+    }, status_code=200)
+
+@app.get("/jobs/{job_id}/artifacts")
+def job_artifacts(job_id: str, x_zap_secret: Optional[str] = Header(None)):
+    """Flight-recorder files kept for a failed (or sampled) upload job."""
+    if ZAP_SHARED_SECRET and x_zap_secret != ZAP_SHARED_SECRET:
+        raise HTTPException(status_code=401, detail="bad secret")
+    files = list_artifacts(job_id)
+    if not files:
+        raise HTTPException(status_code=404, detail="no artifacts for this job")
+    return {
+        "job_id": job_id,
+        "files": [{**f, "url": f"/jobs/{job_id}/artifacts/{f['name']}"} for f in files],
+    }
 
+@app.get("/jobs/{job_id}/artifacts/{name}")
+def job_artifact_file(job_id: str, name: str, x_zap_secret: Optional[str] = Header(None)):
+    if ZAP_SHARED_SECRET and x_zap_secret != ZAP_SHARED_SECRET:
+        raise HTTPException(status_code=401, detail="bad secret")
+    folder = artifact_dir(job_id)
+    if folder is None or name not in os.listdir(folder):
+        raise HTTPException(status_code=404, detail="artifact not found")
+    return FileResponse(os.path.join(folder, name), filename=name)